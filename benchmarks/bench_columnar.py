@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_columnar.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 10:20:31 am
+"""Compare a per-entity Python loop against vectorized columnar aggregation.
+
+Computes the mean age per sex over synthetic subjects. Needs numpy.
+
+Usage:
+    python benchmarks/bench_columnar.py [n_entities]
+"""
+import sys
+import time
+
+from bench_entityfile_load import make_entities, timeit
+
+from genemede import columnar
+from genemede.core import Entity
+
+
+def loop_mean_age(ents):
+    sums, counts = {}, {}
+    for e in ents:
+        sex, age = e.properties.get("sex"), e.properties.get("age")
+        if age is not None:
+            sums[sex] = sums.get(sex, 0) + age
+            counts[sex] = counts.get(sex, 0) + 1
+    return {k: sums[k] / counts[k] for k in sums}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    ents = [Entity(item=d) for d in make_entities(n)]
+    t0 = time.perf_counter()
+    cols = columnar.to_numpy(columnar.to_columns(ents))
+    convert = time.perf_counter() - t0
+    loop = timeit(loop_mean_age, ents)
+    vec = timeit(columnar.group_stats, cols["properties.age"], cols["properties.sex"])
+    by_sex = columnar.factorize(cols["properties.sex"])
+    fact = timeit(columnar.group_stats, cols["properties.age"], by_sex)
+    print(f"entities: {n}")
+    print(f"to_columns + to_numpy (once): {convert:.3f} s")
+    print(f"python loop:                  {loop:.3f} s")
+    print(f"vectorized group_stats:       {vec:.3f} s")
+    print(f"group_stats, factorized once: {fact:.3f} s")
+    print(f"speedup:                      {loop / vec:.1f}x, {loop / fact:.1f}x factorized")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_diff.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 6:48:13 pm
+"""Time diff and three-way merge of two site copies of a synthetic file.
+
+Each copy edits 1% of the entities of the base, the two sets overlap so the
+merge has conflicts to resolve.
+
+Usage:
+    python benchmarks/bench_diff.py [n_entities]
+"""
+import copy
+import random
+import sys
+
+from bench_entityfile_load import timeit
+from synthetic import generate_entities
+
+from genemede.diff import diff, merge
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    base = [d for ents in generate_entities(n).values() for d in ents]
+    for i, d in enumerate(base):
+        d["guid"] = d["guid"] or f"dirty-{i}"
+    rng = random.Random(0)
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    for d in rng.sample(ours, n // 100):
+        d.update(name=d["name"] + " (ours)", modified_at="2024-01-01T00:00:00")
+    for d in rng.sample(theirs, n // 100):
+        d.update(name=d["name"] + " (theirs)", modified_at="2024-02-01T00:00:00")
+    d = diff(base, ours)
+    print(f"entities: {n}, modified: {len(d.modified)}, conflicts: {len(merge(base, ours, theirs).conflicts)}")
+    for name, func, args in (
+        ("diff (identical)", diff, (base, base)),
+        ("diff", diff, (base, ours)),
+        ("merge", merge, (base, ours, theirs)),
+    ):
+        print(f"{name:<20}{timeit(func, *args):>10.3f} s")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_encodings.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 11:24:09 pm
+"""Compare the size, write time and read time of the .gnmd storage encodings.
+
+Encodings whose optional package (zstandard, msgpack) is missing are skipped.
+
+Usage:
+    python benchmarks/bench_encodings.py [n_entities]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import genemede.io as io
+from bench_entityfile_load import make_entities, timeit
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    data = make_entities(n)
+    print(f"entities: {n}")
+    print(f"{'encoding':<10}{'size (MB)':>12}{'write (s)':>12}{'read (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for encoding in io.ENCODINGS:
+            try:
+                io.encode([], encoding)
+            except ImportError as e:
+                print(f"{encoding:<10}  skipped: {e}")
+                continue
+            path = io.with_encoding_suffix(Path(tmp).joinpath("synthetic"), encoding)
+            write = timeit(io.write_atomic, path, data, 4, encoding)
+            read = timeit(io.read, path)
+            size = path.stat().st_size / 1e6
+            print(f"{encoding:<10}{size:>12.2f}{write:>12.3f}{read:>12.3f}")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_entity_memory.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 11:15:40 am
+"""Compare memory and construction time of the slotted Entity with the former dict based class.
+
+Usage:
+    python benchmarks/bench_entity_memory.py [n_entities]
+"""
+import sys
+import time
+import tracemalloc
+import uuid
+
+from genemede.core import Entity
+
+
+class LegacyEntity(dict):
+    """The dict subclass Entity keeping its data in the instance __dict__ (pre slots)."""
+
+    template = Entity.template
+
+    def __init__(self, item):
+        for k, v in item.items():
+            self.__dict__.update({k: v})
+
+    def to_dict(self, squeeze=True):
+        return {k: v for k, v in self.__dict__.items() if not squeeze or v is not None}
+
+
+def make_items(n):
+    items = []
+    for i in range(n):
+        d = dict.fromkeys(Entity.template)
+        d.update(guid=str(uuid.UUID(int=i)), modified_at="2023-01-01T00:00:00", name=f"subject_{i}")
+        items.append(d)
+    return items
+
+
+def measure(cls, items):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    ents = [cls(d) for d in items]
+    build = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for e in ents:
+        e.to_dict()
+    to_dict = time.perf_counter() - t0
+    return size, build, to_dict
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = make_items(n)
+    print(f"entities: {n}")
+    for cls in (LegacyEntity, Entity):
+        size, build, to_dict = measure(cls, items)
+        print(
+            f"{cls.__name__:>13}: {size / n:7.1f} B/entity  build {build:.3f} s  to_dict {to_dict:.3f} s"
+        )
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_entityfile_load.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 10:02:11 am
+"""Compare the old two-pass EntityFile construction against the single read pipeline.
+
+Usage:
+    python benchmarks/bench_entityfile_load.py [n_entities]
+"""
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import genemede.io as io
+from genemede.core import Entity, EntityFile, is_valid_file
+
+
+def make_entities(n):
+    ents = []
+    for i in range(n):
+        d = dict.fromkeys(Entity.template)
+        d.update(
+            guid=str(uuid.UUID(int=i)),
+            modified_at="2023-01-01T00:00:00.000000",
+            name=f"subject_{i}",
+            mtype="subject",
+            properties={"sex": "male" if i % 2 else "female", "age": i % 90},
+            tags=["synthetic"],
+        )
+        ents.append(d)
+    return ents
+
+
+def two_pass_load(path):
+    """What EntityFile did before: validate by reading the file, then read it again."""
+    ents = []
+    if is_valid_file(path):
+        ents = [Entity(item=d) for d in io.read(path)]
+    return ents
+
+
+def timeit(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp).joinpath("synthetic.gnmd")
+        with open(path, "w") as f:
+            json.dump(make_entities(n), f, indent=4)
+        old = timeit(two_pass_load, path)
+        new = timeit(EntityFile, path)
+    print(f"entities: {n}")
+    print(f"two pass load:    {old:.3f} s")
+    print(f"single read load: {new:.3f} s")
+    print(f"speedup:          {old / new:.2f}x")
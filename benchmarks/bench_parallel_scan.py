@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_parallel_scan.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 2:55:37 pm
+"""Scaling of find_gnmd_files with the number of worker processes.
+
+Usage:
+    python benchmarks/bench_parallel_scan.py [n_files] [entities_per_file]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from genemede.core import Entity, find_gnmd_files
+
+
+def make_tree(root, n_files, n_entities):
+    for i in range(n_files):
+        folder = root.joinpath(f"lab_{i % 20:02d}")
+        folder.mkdir(exist_ok=True)
+        data = []
+        for j in range(n_entities):
+            d = dict.fromkeys(Entity.template)
+            d.update(guid=str(uuid.UUID(int=i * n_entities + j)), name=f"entity_{j}", mtype="subject")
+            data.append(d)
+        with open(folder.joinpath(f"file_{i:05d}.json"), "w") as f:
+            json.dump(data, f, indent=4)
+
+
+if __name__ == "__main__":
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_entities = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, 4, 8, cores} - {w for w in (2, 4, 8) if w > cores})
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, n_files, n_entities)
+        print(f"files: {n_files}  entities/file: {n_entities}  cores: {cores}")
+        base = None
+        for w in workers:
+            t0 = time.perf_counter()
+            found = find_gnmd_files(root, workers=w)
+            dt = time.perf_counter() - t0
+            base = base or dt
+            print(f"workers {w:>2}: {dt:.3f} s  speedup {base / dt:.2f}x  ({len(found)} files)")
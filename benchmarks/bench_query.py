@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_query.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 9:58:03 pm
+"""Indexed vs scan query performance on an EntityFile.
+
+Usage:
+    python benchmarks/bench_query.py [n_entities]
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from genemede.core import Entity, EntityFile
+from genemede.query import between, eq, isin
+
+QUERIES = {
+    "eq mtype": [eq("mtype", "session")],
+    "eq tag + sex": [eq("tags", "meg"), eq("properties.sex", "other")],
+    "isin + range": [isin("properties.handedness", ["left", "ambidextrous"]), between("properties.age", 30, 35)],
+}
+
+
+def make_entities(n, seed=0):
+    rng = random.Random(seed)
+    ents = []
+    for i in range(n):
+        d = dict.fromkeys(Entity.template)
+        d.update(
+            guid=str(uuid.UUID(int=i)),
+            modified_at="2023-01-01T00:00:00",
+            name=f"entity_{i}",
+            mtype=rng.choice(["subject"] * 9 + ["session"]),
+            tags=rng.sample(["cogitate", "meg", "ieeg", "fmri"], 2),
+            properties={
+                "sex": rng.choice(["female", "male", "other"]),
+                "handedness": rng.choice(["right"] * 8 + ["left", "ambidextrous"]),
+                "age": rng.randint(18, 90),
+            },
+        )
+        ents.append(d)
+    return ents
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp).joinpath("entities.json")
+        with open(path, "w") as f:
+            json.dump(make_entities(n), f)
+        ef = EntityFile(path)
+    scans = {name: best_of(lambda q=q: ef.query(*q)) for name, q in QUERIES.items()}
+    t0 = time.perf_counter()
+    for p in ("mtype", "tags", "properties.sex", "properties.handedness", "properties.age"):
+        ef.create_index(p)
+    print(f"entities: {n}  index build: {time.perf_counter() - t0:.3f} s")
+    for name, q in QUERIES.items():
+        scan, scan_out = scans[name]
+        indexed, out = best_of(lambda q=q: ef.query(*q))
+        assert len(out) == len(scan_out)
+        print(f"{name:>14}: scan {scan * 1e3:8.2f} ms  indexed {indexed * 1e3:8.2f} ms  ({len(out)} hits)")
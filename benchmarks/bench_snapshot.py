@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_snapshot.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 4:05:31 pm
+"""Loading a repository in every worker vs mapping one snapshot of it.
+
+Reports the build/open times, random lookups and full iteration, then the
+memory of fresh worker processes that each load the Repository or open the
+Snapshot and look up entities: the mapped pages are shared, so they count in
+the resident set (RSS) of every worker but only once in their proportional
+set size (PSS, Linux only).
+
+Usage:
+    python benchmarks/bench_snapshot.py [n_entities] [workers]
+"""
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_entityfile_load import timeit
+from synthetic import generate_repository
+
+from concurrent.futures import ProcessPoolExecutor
+from genemede.repository import Repository
+from genemede.snapshot import CODECS, Snapshot, build, msgpack
+
+
+def lookups(store, guids):
+    get = store.get if isinstance(store, Repository) else store.get_entity
+    for g in guids:
+        get(g)
+
+
+def worker(args):
+    kind, path, guids = args
+    store = Repository(path) if kind == "repository" else Snapshot(path)
+    lookups(store, guids)
+    mem = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f.readlines()[1:]:
+            key, value = line.split(":")
+            mem[key] = int(value.split()[0]) / 1024
+    return mem["Rss"], mem["Pss"]
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).joinpath("repo")
+        generate_repository(root, n)
+        t0 = time.perf_counter()
+        repo = Repository(root)
+        print(f"entities: {len(repo)}, Repository load: {time.perf_counter() - t0:.3f} s")
+        guids = random.Random(0).sample([e.guid for e in repo], min(10_000, len(repo)))
+        print(f"{'':<22}{'build (s)':>10}{'size (MB)':>10}{'open (ms)':>10}{'get (us)':>10}{'iter (s)':>10}")
+        t = timeit(lookups, repo, guids) / len(guids) * 1e6
+        print(f"{'Repository':<22}{'':>10}{'':>10}{'':>10}{t:>10.2f}{timeit(lambda: list(repo)):>10.3f}")
+        for codec in CODECS:
+            if codec == "msgpack" and msgpack is None:
+                print(f"snapshot ({codec})  skipped: msgpack is not installed")
+                continue
+            fpath = Path(tmp).joinpath(f"repo.{codec}.gnmd.snap")
+            t0 = time.perf_counter()
+            build(repo, fpath, codec=codec)
+            built = time.perf_counter() - t0
+            opened = timeit(lambda: Snapshot(fpath).close()) * 1e3
+            with Snapshot(fpath) as snap:
+                get = timeit(lookups, snap, guids) / len(guids) * 1e6
+                it = timeit(lambda: sum(1 for _ in snap))
+            size = fpath.stat().st_size / 1e6
+            print(f"{f'Snapshot ({codec})':<22}{built:>10.3f}{size:>10.2f}{opened:>10.3f}{get:>10.2f}{it:>10.3f}")
+        del repo
+        print(f"\nmemory of {workers} workers (MB){'RSS':>10}{'PSS':>10}")
+        for kind, path in (("repository", root), ("snapshot", Path(tmp).joinpath("repo.json.gnmd.snap"))):
+            # Spawned, forked workers would share the memory of this process
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+                mem = list(ex.map(worker, [(kind, path, guids)] * workers))
+            rss, pss = sum(m[0] for m in mem), sum(m[1] for m in mem)
+            print(f"{kind:<26}{rss:>10.0f}{pss:>10.0f}")
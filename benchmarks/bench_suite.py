@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# @File: benchmarks/bench_suite.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 5:22:47 pm
+"""Benchmark suite of the io, core and curate hot paths on a synthetic repository.
+
+A repository of the requested size is generated (see synthetic.py), then
+each benchmark is timed (best of --repeat) and the results are written as
+JSON together with the run metadata, so that runs can be compared:
+
+    python benchmarks/bench_suite.py 100k -o before.json
+    python benchmarks/bench_suite.py 100k -o after.json --compare before.json
+
+Usage:
+    python benchmarks/bench_suite.py [1k|100k|1m|N] [-o OUTPUT] [--compare BASELINE] [--repeat R]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from synthetic import PER_FILE, SIZES, generate_repository
+
+import genemede
+from genemede import io
+from genemede.catalog import CATALOG_NAME
+from genemede.core import EntityFile, find_gnmd_files, validate_gnmd_struct
+from genemede.curate import curate
+
+RESULTS_DIR = Path(__file__).parent.joinpath("results")
+
+
+def best_of(func, repeat, setup=None):
+    best = float("inf")
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        t0 = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(root: Path, files: list, repeat: int) -> dict:
+    data = [io.read(f) for f in files]
+    n = sum(len(d) for d in data)
+    sample = files[: max(1, len(files) // 10)]
+    benches = {
+        "io.read": lambda _: [io.read(f) for f in files],
+        "io.iter_read": lambda _: [sum(1 for _ in io.iter_read(f)) for f in files],
+        "validate_gnmd_struct": lambda _: [validate_gnmd_struct(d) for d in data],
+        "EntityFile.load": lambda _: [EntityFile(f) for f in files],
+        "EntityFile.load(lazy).iter": lambda _: [sum(1 for _ in EntityFile(f, lazy=True)) for f in files],
+        "find_gnmd_files": lambda _: find_gnmd_files(root),
+        # Cold: the catalog is rebuilt from scratch, warm: it is up to date
+        "find_gnmd_files(cold cache)": (
+            lambda _: find_gnmd_files(root, cache=True),
+            lambda: root.joinpath(CATALOG_NAME).unlink(missing_ok=True),
+        ),
+        "find_gnmd_files(warm cache)": (
+            lambda _: find_gnmd_files(root, cache=True),
+            lambda: find_gnmd_files(root, cache=True),
+        ),
+        # Curate a fresh copy of the data each time, it is fixed in place
+        "curate": (lambda copies: [curate(d) for d in copies], lambda: [[dict(x) for x in d] for d in data]),
+        "curate(dry_run)": lambda _: [curate(d, dry_run=True) for d in data],
+        # Save a tenth of the files, with their backups
+        "EntityFile.save": (lambda efs: [ef.save() for ef in efs], lambda: [EntityFile(f) for f in sample]),
+    }
+    results = {}
+    for name, bench in benches.items():
+        func, setup = bench if isinstance(bench, tuple) else (bench, None)
+        seconds = best_of(func, repeat, setup)
+        n_items = n if name != "EntityFile.save" else sum(len(io.read(f)) for f in sample)
+        results[name] = {"seconds": seconds, "entities": n_items, "us_per_entity": seconds / n_items * 1e6}
+        print(f"{name:<28}{seconds:>10.3f} s{results[name]['us_per_entity']:>10.2f} us/entity", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict) -> None:
+    print(f"\n{'benchmark':<28}{'baseline':>10}{'now':>10}{'ratio':>8}")
+    for name, r in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        print(f"{name:<28}{old['seconds']:>10.3f}{r['seconds']:>10.3f}{r['seconds'] / old['seconds']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("size", nargs="?", default="1k", help=f"number of entities or one of {list(SIZES)}")
+    parser.add_argument("-o", "--output", help="results file, defaults to benchmarks/results/<time>_<size>.json")
+    parser.add_argument("--compare", help="previous results file to compare with")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--per-file", type=int, default=PER_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    n = SIZES.get(args.size) or int(args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        t0 = time.perf_counter()
+        files = generate_repository(root, n, per_file=args.per_file, seed=args.seed)
+        print(f"generated {n} entities in {len(files)} files ({time.perf_counter() - t0:.1f} s)", flush=True)
+        results = run_suite(root, files, args.repeat)
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(),
+            "genemede": genemede.__version__,
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "size": args.size,
+            "n_entities": n,
+            "n_files": len(files),
+            "per_file": args.per_file,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR.joinpath(f"{datetime.now():%Y%m%dT%H%M%S}_{args.size}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"results: {output}")
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# @File: benchmarks/synthetic.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 4:40:18 pm
+"""Deterministic generator of realistic synthetic genemede repositories.
+
+Entities get the properties of their mtype schema (see `genemede.schema`):
+constrained properties take one of their levels, properties with units a
+number and the others a short text. Sessions link to a project, a lab,
+subjects, researchers and devices generated before them. A small share of
+the entities carry an empty GUID or timestamp so that curation has work.
+
+The same seed and size always give the same files, byte for byte.
+
+Usage:
+    python benchmarks/synthetic.py ROOT [n_entities] [--per-file N] [--seed S]
+"""
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from genemede import io
+from genemede.core import Entity
+from genemede.schema import get_registry, is_constraint
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PER_FILE = 1000
+# Share of the entities of each mtype, in generation order (sessions reference the others)
+MIX = {
+    "project": 0.005,
+    "lab": 0.01,
+    "researcher": 0.05,
+    "protocol": 0.02,
+    "device/meg_sensor": 0.03,
+    "device/eye_tracker_assembly": 0.02,
+    "device/desktop_computer": 0.015,
+    "setup": 0.01,
+    "subject/human": 0.34,
+    "session": 0.5,
+}
+# Share of the entities with an empty guid or modified_at, fixed by curate
+DIRTY = 0.01
+WORDS = (
+    "alpha beta visual auditory cortex left right baseline task rest pilot meg eeg fmri ieeg eye tracker "
+    "consciousness cogitate stimulus block run calibration lab room shielded amplifier trigger"
+).split()
+EPOCH = datetime(2023, 1, 1)
+
+
+def _value(rng: random.Random, spec) -> object:
+    if isinstance(spec, dict):
+        if is_constraint(spec.get("levels")):
+            return rng.choice(spec["levels"])
+        units = spec.get("units")
+        if units and "#" not in str(units):
+            return round(rng.uniform(0, 100), 2)
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def generate_entities(n: int, seed: int = 0) -> dict:
+    """
+    Generate n entities, deterministically.
+
+    Returns:
+        dict: {mtype: [entity dict, ...]} in MIX order.
+    """
+    rng = random.Random(seed)
+    registry = get_registry()
+    counts = {m: max(1, round(n * share)) for m, share in MIX.items()}
+    counts["session"] += n - sum(counts.values())
+    out = {}
+    refs = {}
+    serial = 0
+    for mtype, count in counts.items():
+        properties = registry.get(mtype)["properties"] if mtype in registry.names() else {}
+        ents = []
+        for i in range(count):
+            d = dict.fromkeys(Entity.template)
+            d["guid"] = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            d["modified_at"] = (EPOCH + timedelta(seconds=serial)).isoformat(timespec="microseconds")
+            serial += 1
+            d["name"] = f"{mtype.split('/')[-1]} {i:06d}"
+            d["description"] = " ".join(rng.choice(WORDS) for _ in range(6))
+            d["mtype"] = mtype
+            d["properties"] = {k: _value(rng, spec) for k, spec in properties.items()}
+            d["tags"] = rng.sample(WORDS, 2)
+            d["components"] = []
+            if mtype == "session":
+                d["links"] = {
+                    "project": rng.choice(refs["project"]),
+                    "lab": rng.choice(refs["lab"]),
+                    "protocol": rng.choice(refs["protocol"]),
+                    "subjects": [rng.choice(refs["subject/human"])],
+                    "researchers": rng.sample(refs["researcher"], min(2, len(refs["researcher"]))),
+                    "devices": [rng.choice(refs["device/meg_sensor"])],
+                }
+            elif mtype == "setup":
+                d["components"] = [rng.choice(refs[m]) for m in refs if m.startswith("device/")]
+            elif mtype != "project":
+                d["parent"] = rng.choice(refs["project"]) if "project" in refs else None
+            if rng.random() < DIRTY:
+                d["guid" if rng.random() < 0.5 else "modified_at"] = ""
+            ents.append(d)
+        refs[mtype] = [d["guid"] for d in ents if d["guid"]]
+        out[mtype] = ents
+    return out
+
+
+def generate_repository(
+    root: Path, n: int, per_file: int = PER_FILE, seed: int = 0, encoding: str = io.DEFAULT_ENCODING
+) -> list:
+    """
+    Write a synthetic repository of n entities under root, one folder per mtype.
+
+    Returns:
+        list[Path]: The written files.
+    """
+    root = Path(root)
+    files = []
+    for mtype, ents in generate_entities(n, seed=seed).items():
+        folder = root.joinpath(*mtype.split("/"))
+        folder.mkdir(parents=True, exist_ok=True)
+        stem = mtype.replace("/", "_")
+        for k in range(0, len(ents), per_file):
+            fpath = folder.joinpath(f"{stem}_{k // per_file:05d}.json")
+            io.write_atomic(fpath, ents[k:k + per_file], encoding=encoding)
+            files.append(fpath)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("n", nargs="?", default="1k", help=f"number of entities or one of {list(SIZES)}")
+    parser.add_argument("--per-file", type=int, default=PER_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    n = SIZES.get(args.n) or int(args.n)
+    files = generate_repository(Path(args.root), n, per_file=args.per_file, seed=args.seed)
+    print(f"{n} entities in {len(files)} files under {args.root}")
+
+
+if __name__ == "__main__":
+    main()
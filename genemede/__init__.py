@@ -2,8 +2,74 @@
 # @File: genemede/__init__.py
 # @Author: Niccolo' Bonacchi (@nbonacchi)
 # @Date: Wednesday, October 12th 2022, 4:20:56 pm
+"""GENEric MEtaData Editor.
+
+`import genemede` only defines the version: the public API of
+`genemede.core` (gnmd.Entity, gnmd.find_gnmd_files...) and the submodules
+(gnmd.io, gnmd.schema...) are imported on first access, see `__getattr__`.
+Keep it that way, tests/test_package.py enforces an import time budget.
+"""
 __version__ = "0.0.1"
-from pathlib import Path
 
-test_path = Path(__file__).parent.parent.joinpath("tests")
-from genemede.core import *
+# Public API of genemede.core, re-exported here
+_CORE = (
+    "Entity",
+    "EntityView",
+    "EntityFile",
+    "EntityIssue",
+    "ValidationReport",
+    "TEMPLATE_KEYS",
+    "validate_entity",
+    "validate_gnmd_struct",
+    "is_valid_gnmd_struct",
+    "is_valid_file",
+    "find_gnmd_files",
+)
+# genemede.import is a keyword, see importlib.import_module
+_SUBMODULES = (
+    "aio",
+    "catalog",
+    "columnar",
+    "core",
+    "curate",
+    "diff",
+    "export",
+    "graph",
+    "instrument",
+    "io",
+    "journal",
+    "parallel",
+    "paths",
+    "query",
+    "repository",
+    "schema",
+    "search",
+    "server",
+    "snapshot",
+)
+
+__all__ = ["test_path", *_CORE]
+
+
+def __getattr__(name):
+    if name in _CORE:
+        from genemede import core
+
+        value = getattr(core, name)
+    elif name in _SUBMODULES:
+        import importlib
+
+        value = importlib.import_module(f"{__name__}.{name}")
+    elif name == "test_path":
+        from pathlib import Path
+
+        value = Path(__file__).parent.parent.joinpath("tests")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cached, the next lookups do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), "test_path", *_CORE, *_SUBMODULES})
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# @File: genemede/aio.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 11:05:17 am
+"""asyncio counterparts of the blocking file operations.
+
+The file I/O runs in a bounded thread pool shared by all callers, so at most
+`MAX_FILES` files are open at the same time whatever the number of pending
+requests, and the event loop never blocks:
+
+    labs, subjects = await aio.load_many(["labs.json", "subjects.json"])
+    ef.add_entity(...)
+    await aio.save(ef)
+
+An EntityFile is not thread safe: do not edit it while one of its operations
+is pending. Saves of the same EntityFile are serialized within an event loop.
+"""
+import asyncio
+import functools
+import threading
+import typing as t
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from genemede import io
+from genemede.core import EntityFile, find_gnmd_files
+
+# Files opened concurrently by the shared executor
+MAX_FILES = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+# {event loop: {EntityFile: asyncio.Lock}}, asyncio locks belong to the loop they are first used in
+_save_locks = weakref.WeakKeyDictionary()
+
+
+def configure(max_files: int = MAX_FILES) -> None:
+    """Resize the shared executor, pending operations complete on the old one."""
+    global _executor, MAX_FILES
+    if max_files < 1:
+        raise ValueError(f"{max_files} <- max_files must be at least 1")
+    with _executor_lock:
+        old, _executor, MAX_FILES = _executor, None, max_files
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_FILES, thread_name_prefix="genemede-aio")
+        return _executor
+
+
+async def run(func: t.Callable, *args, **kwargs) -> t.Any:
+    """Run a blocking function in the shared executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def read(fpath: t.Union[str, Path]) -> t.Any:
+    """See `io.read`."""
+    return await run(io.read, fpath)
+
+
+async def create(fpath: t.Union[str, Path], data: list, encoding: str = io.DEFAULT_ENCODING) -> Path:
+    """See `io.create`."""
+    return await run(io.create, fpath, data, encoding=encoding)
+
+
+async def update(fpath: t.Union[str, Path], data: list) -> Path:
+    """See `io.update`."""
+    return await run(io.update, fpath, data)
+
+
+async def load(fpath: t.Union[str, Path], lazy: bool = False, journal: bool = False) -> EntityFile:
+    """Load an EntityFile, see `EntityFile`."""
+    return await run(EntityFile, fpath, lazy=lazy, journal=journal)
+
+
+async def load_many(
+    fpaths: t.Iterable[t.Union[str, Path]],
+    limit: t.Optional[int] = None,
+    return_exceptions: bool = False,
+    **kwargs,
+) -> t.List[EntityFile]:
+    """
+    Load many EntityFiles concurrently.
+
+    Args:
+        fpaths (Iterable): The files to load.
+        limit (int, optional): Loads of this call in flight at a time, on top
+            of the shared MAX_FILES cap. Defaults to no extra limit.
+        return_exceptions (bool, optional): Return the exception of a failed
+            load in its place instead of raising it. Defaults to False.
+        **kwargs: Passed to `load` (lazy, journal).
+
+    Returns:
+        list[EntityFile]: In the order of fpaths.
+    """
+    sem = asyncio.Semaphore(limit) if limit else None
+
+    async def one(fpath):
+        if sem is None:
+            return await load(fpath, **kwargs)
+        async with sem:
+            return await load(fpath, **kwargs)
+
+    return await asyncio.gather(*(one(f) for f in fpaths), return_exceptions=return_exceptions)
+
+
+async def save(ef: EntityFile) -> None:
+    """Save an EntityFile, see `EntityFile.save`. Saves of the same EntityFile run one at a time."""
+    locks = _save_locks.setdefault(asyncio.get_running_loop(), weakref.WeakKeyDictionary())
+    lock = locks.get(ef)
+    if lock is None:
+        lock = locks[ef] = asyncio.Lock()
+    async with lock:
+        await run(ef.save)
+
+
+async def scan(path: t.Union[str, Path], cache: bool = False) -> t.List[Path]:
+    """Find the genemede files under a folder, see `find_gnmd_files`."""
+    return await run(find_gnmd_files, path, cache=cache)
+
+
+async def load_dir(path: t.Union[str, Path], cache: bool = False, **kwargs) -> t.List[EntityFile]:
+    """Scan a folder and load all its genemede files concurrently."""
+    return await load_many(await scan(path, cache=cache), **kwargs)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# @File: genemede/catalog.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 1:10:48 pm
+"""On-disk catalog of the genemede files found under a folder.
+
+The catalog is a JSON manifest stored next to the scanned files, keyed by
+relative path. For each file it keeps the mtime, size and content hash
+together with its validity, entity count and mtypes, so that repeated scans
+only re-read the files that changed.
+
+Usage:
+    python -m genemede.catalog {scan,rebuild,verify} PATH
+"""
+import argparse
+import hashlib
+import json
+import typing as t
+from pathlib import Path
+
+from genemede import instrument, io
+from genemede.core import validate_gnmd_struct
+from genemede.parallel import pmap
+
+CATALOG_NAME = ".gnmd_catalog"
+CATALOG_VERSION = 1
+
+
+def file_digest(data: bytes) -> str:
+    """Content hash used to tell whether a file really changed."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def describe(raw: bytes) -> dict:
+    """Decode and validate the raw content of a file."""
+    try:
+        data = io.decode(raw)
+    except (ValueError, UnicodeDecodeError, OSError, EOFError):
+        return {"valid": False, "n_entities": 0, "mtypes": []}
+    valid = validate_gnmd_struct(data, fail_fast=True).valid
+    mtypes = sorted({str(d.get("mtype")) for d in data}) if valid else []
+    return {"valid": valid, "n_entities": len(data) if valid else 0, "mtypes": mtypes}
+
+
+def _refresh_entry(args: t.Tuple[Path, t.Optional[dict]]) -> dict:
+    """Re-read a changed file, decoding it only if its content hash changed."""
+    fpath, entry = args
+    st = fpath.stat()
+    raw = fpath.read_bytes()
+    digest = file_digest(raw)
+    if entry is None or entry["sha256"] != digest:
+        entry = {"sha256": digest, **describe(raw)}
+    else:
+        entry = dict(entry)
+    entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+    return entry
+
+
+class Catalog(object):
+    """Catalog of the genemede files under root, persisted in root/.gnmd_catalog
+
+    Args:
+        root (str): Folder to scan.
+        fpath (str, optional): Where to store the manifest. Defaults to root/.gnmd_catalog
+    """
+
+    def __init__(self, root: t.Union[str, Path], fpath: t.Optional[t.Union[str, Path]] = None):
+        self.root = Path(root)
+        self.fpath = Path(fpath) if fpath is not None else self.root.joinpath(CATALOG_NAME)
+        self.entries = {}
+        if self.fpath.exists():
+            try:
+                with open(self.fpath, "r") as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == CATALOG_VERSION:
+                    self.entries = manifest["files"]
+            except (ValueError, KeyError) as e:
+                print(f"Warning: ignoring corrupt catalog {self.fpath} -> {e}")
+
+    def candidates(self) -> t.List[Path]:
+        return io.candidate_files(self.root)
+
+    def scan(self, workers: t.Optional[int] = None, chunksize: t.Optional[int] = None) -> t.List[Path]:
+        """
+        Update the catalog and return the valid genemede files under root.
+
+        Files whose mtime and size did not change are not opened. Files that
+        were touched but whose content hash did not change are not decoded.
+
+        Args:
+            workers (int, optional): Re-read changed files in a pool of
+                processes, -1 uses all cores. Defaults to None (serial).
+            chunksize (int, optional): Files sent to a worker at a time.
+        """
+        files = self.candidates()
+        keys = [f.relative_to(self.root).as_posix() for f in files]
+        stale = []
+        for f, key in zip(files, keys):
+            st = f.stat()
+            entry = self.entries.get(key)
+            if entry is None or entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                stale.append((f, entry))
+        instrument.count("catalog.files_unchanged", len(files) - len(stale))
+        refreshed = pmap(_refresh_entry, stale, workers=workers, chunksize=chunksize)
+        entries = {key: self.entries.get(key) for key in keys}
+        for (f, _), entry in zip(stale, refreshed):
+            entries[f.relative_to(self.root).as_posix()] = entry
+        self.entries = entries
+        self.save()
+        return [f for f, key in zip(files, keys) if entries[key]["valid"]]
+
+    def rebuild(self, workers: t.Optional[int] = None, chunksize: t.Optional[int] = None) -> t.List[Path]:
+        """Forget everything and re-read every file."""
+        self.entries = {}
+        return self.scan(workers=workers, chunksize=chunksize)
+
+    def verify(self) -> t.List[str]:
+        """
+        Re-hash every catalogued file, regardless of its mtime.
+
+        Returns:
+            list: Relative paths that are missing or whose content no longer
+                matches the catalog (e.g. rewritten with a preserved mtime).
+        """
+        stale = []
+        for key, entry in self.entries.items():
+            f = self.root.joinpath(key)
+            if not f.exists() or file_digest(f.read_bytes()) != entry["sha256"]:
+                stale.append(key)
+        return stale
+
+    def save(self) -> None:
+        manifest = {"version": CATALOG_VERSION, "files": self.entries}
+        try:
+            io.write_atomic(self.fpath, manifest, indent=None)
+        except OSError as e:
+            print(f"Warning: could not write catalog {self.fpath} -> {e}")
+
+    def __getitem__(self, fpath):
+        return self.entries[Path(fpath).resolve().relative_to(self.root.resolve()).as_posix()]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="genemede.catalog", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["scan", "rebuild", "verify"])
+    parser.add_argument("path")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="processes, -1 for all cores")
+    args = parser.parse_args(argv)
+    catalog = Catalog(args.path)
+    if args.command == "verify":
+        stale = catalog.verify()
+        for key in stale:
+            print(f"stale: {key}")
+        print(f"{len(catalog) - len(stale)}/{len(catalog)} catalogued files up to date")
+        return 1 if stale else 0
+    scan = catalog.rebuild if args.command == "rebuild" else catalog.scan
+    files = scan(workers=args.workers)
+    print(f"{len(files)} valid genemede files out of {len(catalog)} catalogued")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# @File: genemede/columnar.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 9:12:40 am
+"""Columnar export and import of entities for analytics.
+
+`to_columns` turns entities (an EntityFile, a Repository or a query result)
+into one column per field, nested `properties` being flattened by dotted path:
+
+    cols = to_columns(repo.query(eq("mtype", "subject")))
+    cols["properties.age"], cols["properties.sex"]
+
+Columns are lists, `to_numpy` converts them to NumPy arrays (numbers and
+booleans get native dtypes, missing numbers are NaN) and `to_arrow` /
+`write_parquet` to a pyarrow Table / Parquet file. Both packages are
+optional. `from_columns` rebuilds the entities, properties whose value is
+None are dropped on the way back.
+"""
+import json
+import math
+import numbers
+import typing as t
+from operator import attrgetter, itemgetter
+from pathlib import Path
+
+from genemede.core import Entity
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Fields whose nested dicts are flattened into dotted columns
+FLATTEN = ("properties",)
+
+
+def _require(module, name: str):
+    if module is None:
+        raise ImportError(f"{name} <- not installed, needed for this columnar conversion")
+    return module
+
+
+def flatten(d: dict, prefix: str = "") -> dict:
+    """{"a": {"b": 1}, "c": 2} -> {"a.b": 1, "c": 2}, empty dicts are kept as values."""
+    out = {}
+    stack = [(prefix, d)]
+    while stack:
+        p, node = stack.pop()
+        for k, v in node.items():
+            key = f"{p}.{k}" if p else k
+            if isinstance(v, dict) and v:
+                stack.append((key, v))
+            else:
+                out[key] = v
+    return out
+
+
+def unflatten(flat: t.Mapping[str, t.Any]) -> dict:
+    """{"a.b": 1, "c": 2} -> {"a": {"b": 1}, "c": 2}"""
+    out = {}
+    for key, v in flat.items():
+        *parents, leaf = key.split(".")
+        node = out
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = v
+    return out
+
+
+def to_columns(entities: t.Iterable[t.Any], flat: t.Sequence[str] = FLATTEN) -> t.Dict[str, list]:
+    """
+    Turn entities into columns.
+
+    Args:
+        entities (Iterable): Entities or entity dicts.
+        flat (Sequence[str], optional): Fields whose dicts are flattened into
+            "<field>.<dotted path>" columns. Defaults to ("properties",).
+
+    Returns:
+        dict: {column name: list of values}, None where an entity has no value.
+    """
+    ents = entities if isinstance(entities, list) else list(entities)
+    # Attribute access is the fast path, item access also works for dicts
+    getter = attrgetter if all(type(e) is Entity for e in ents) else itemgetter
+    columns = {f: list(map(getter(f), ents)) for f in Entity.template if f not in flat}
+    nested = {}  # dotted column -> list, padded with None up to the current row
+
+    def column(name, n):
+        col = nested.get(name)
+        if col is None:
+            col = nested[name] = []
+        if len(col) < n:
+            col.extend([None] * (n - len(col)))
+        return col
+
+    for f in flat:
+        top = {}  # key -> column, saves building the dotted names
+        for n, value in enumerate(map(getter(f), ents)):
+            if type(value) is not dict:
+                continue
+            for k, v in value.items():
+                if type(v) is dict and v:
+                    for key, vv in flatten(v, f"{f}.{k}").items():
+                        column(key, n).append(vv)
+                    continue
+                col = top.get(k)
+                if col is None:
+                    col = top[k] = column(f"{f}.{k}", n)
+                elif len(col) < n:
+                    col.extend([None] * (n - len(col)))
+                col.append(v)
+    for col in nested.values():
+        col.extend([None] * (len(ents) - len(col)))
+    columns.update(nested)
+    return columns
+
+
+def n_rows(columns: t.Mapping[str, t.Sequence]) -> int:
+    return len(next(iter(columns.values()), ()))
+
+
+def _is_nan(v) -> bool:
+    return isinstance(v, float) and math.isnan(v)
+
+
+def _pylist(col) -> list:
+    col = col.tolist() if hasattr(col, "tolist") else list(col)
+    return [None if _is_nan(v) else v for v in col]
+
+
+def from_columns(columns: t.Mapping[str, t.Sequence]) -> t.List[Entity]:
+    """
+    Rebuild entities from columns made by `to_columns` (or `to_numpy`, `from_arrow`).
+
+    Dotted columns are nested back into their field, None and NaN values
+    are left out of the nested dicts.
+    """
+    cols = {k: _pylist(v) for k, v in columns.items()}
+    plain = [k for k in cols if k in Entity.template]
+    nested = [k for k in cols if k not in Entity.template]
+    ents = []
+    for i in range(n_rows(cols)):
+        item = dict.fromkeys(Entity.template)
+        for k in plain:
+            item[k] = cols[k][i]
+        values = {k: cols[k][i] for k in nested if cols[k][i] is not None}
+        for field, d in unflatten(values).items():
+            if field not in Entity.template:
+                raise KeyError(f"{field} <- column does not belong to an Entity field")
+            item[field] = {**(item[field] or {}), **d}
+        for field in FLATTEN:
+            if field not in cols and item[field] is None:
+                item[field] = {}
+        ents.append(Entity(item=item))
+    return ents
+
+
+def as_array(values: t.Sequence):
+    """
+    NumPy array of a column.
+
+    Booleans, integers and strings keep a native dtype, numbers with missing
+    values become float64 with NaN, anything else an object array.
+    """
+    _require(np, "numpy")
+    types = set(map(type, values))
+    has_none = type(None) in types
+    types.discard(type(None))
+    if types and not has_none and types <= {bool, str, int}:
+        if len(types) == 1:
+            return np.array(values, dtype=types.pop() if types != {int} else np.int64)
+    if types and all(issubclass(c, numbers.Real) and not issubclass(c, bool) for c in types):
+        # numpy turns None into NaN for float dtypes
+        return np.array(values, dtype=np.float64)
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+def to_numpy(columns: t.Mapping[str, t.Sequence]) -> t.Dict[str, t.Any]:
+    """Convert every column to a NumPy array, see `as_array`."""
+    return {k: as_array(v) for k, v in columns.items()}
+
+
+def to_arrow(columns: t.Mapping[str, t.Sequence]):
+    """
+    Convert columns to a pyarrow Table.
+
+    Columns arrow cannot type (mixed types, lists of dicts...) are stored as
+    their JSON text.
+    """
+    _require(pa, "pyarrow")
+    arrays = {}
+    for k, v in columns.items():
+        v = _pylist(v)
+        try:
+            arrays[k] = pa.array(v)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[k] = pa.array([None if x is None else json.dumps(x) for x in v], type=pa.string())
+    return pa.table(arrays)
+
+
+def from_arrow(table) -> t.Dict[str, list]:
+    """Columns of a pyarrow Table."""
+    return table.to_pydict()
+
+
+def write_parquet(columns: t.Mapping[str, t.Sequence], fpath: t.Union[str, Path]) -> None:
+    """Write columns to a Parquet file."""
+    _require(pq, "pyarrow")
+    pq.write_table(to_arrow(columns), str(fpath))
+
+
+def read_parquet(fpath: t.Union[str, Path]) -> t.Dict[str, list]:
+    """Read the columns of a Parquet file."""
+    _require(pq, "pyarrow")
+    return from_arrow(pq.read_table(str(fpath)))
+
+
+def _keys(column):
+    """String array of a grouping column, missing values as the empty string."""
+    if isinstance(column, np.ndarray) and column.dtype.kind in "biuU":
+        return column.astype(str)
+    if not isinstance(column, np.ndarray) or column.dtype.kind == "O":
+        column = as_array(list(column))
+        if column.dtype.kind in "biuU":
+            return column.astype(str)
+    return np.array(["" if v is None or _is_nan(v) else str(v) for v in column.tolist()], dtype=str)
+
+
+def factorize(column: t.Sequence) -> t.Tuple[t.Any, t.Any]:
+    """
+    Encode a grouping column as (sorted distinct values, code of each row).
+
+    Sorting the values is the costly part of grouping, factorize a column
+    once to run many aggregations over it, see `group_stats`.
+    """
+    _require(np, "numpy")
+    return np.unique(_keys(column), return_inverse=True)
+
+
+def value_counts(column: t.Sequence) -> t.Dict[str, int]:
+    """Number of entities per value of a column, missing values counted under ""."""
+    _require(np, "numpy")
+    uniq, counts = np.unique(_keys(column), return_counts=True)
+    return dict(zip(uniq.tolist(), counts.tolist()))
+
+
+def group_stats(values: t.Sequence, by: t.Optional[t.Sequence] = None) -> t.Dict[str, t.Any]:
+    """
+    Vectorized count, sum, mean, min and max of a numeric column.
+
+    Args:
+        values (Sequence): Numeric column, missing values (None/NaN) are ignored.
+        by (Sequence or tuple, optional): Column to group by, or its
+            `factorize` result. Defaults to a single group.
+
+    Returns:
+        dict: {"key", "count", "sum", "mean", "min", "max"} arrays, one item per group.
+    """
+    _require(np, "numpy")
+    x = values if isinstance(values, np.ndarray) and values.dtype.kind in "biuf" else as_array(list(values))
+    x = x.astype(np.float64)
+    if by is None:
+        keys, inv = np.array([""]), np.zeros(len(x), dtype=np.intp)
+    elif isinstance(by, tuple):
+        keys, inv = by
+    else:
+        keys, inv = factorize(by)
+    ok = ~np.isnan(x)
+    x, inv = x[ok], inv[ok]
+    n = len(keys)
+    count = np.bincount(inv, minlength=n)
+    total = np.bincount(inv, weights=x, minlength=n)
+    lo = np.full(n, np.inf)
+    hi = np.full(n, -np.inf)
+    np.minimum.at(lo, inv, x)
+    np.maximum.at(hi, inv, x)
+    empty = count == 0
+    lo[empty] = hi[empty] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return {"key": keys, "count": count, "sum": total, "mean": mean, "min": lo, "max": hi}
@@ -2,17 +2,28 @@
 # @File: nico/api.py
 # @Author: Niccolo' Bonacchi (@nbonacchi)
 # @Date: Friday, July 15th 2022, 12:44:55 pm
-import json
-import random
 import typing as t
 import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
 
+import genemede.instrument as instrument
 import genemede.io as io
+import genemede.query as query
+from genemede.parallel import pmap
 
 
-class Entity(dict):
+class Entity(object):
+    """A GNMD entity with one fixed slot per `Entity.template` key.
+
+    Entities are compact: there is no per-instance `__dict__`, only the slots
+    generated from the template. Attribute access (`e.guid`), item access
+    (`e["guid"]`) and `to_dict`/`view` expose the same values.
+    """
+
     template = {
         "guid": str,
         "modified_at": str,
@@ -26,6 +37,8 @@ class Entity(dict):
         "custom": list,
         "tags": list,
     }
+    __slots__ = tuple(template)
+    __hash__ = None  # mutable, compared by value
 
     def __init__(self, item=None):
         """
@@ -39,40 +52,62 @@ class Entity(dict):
             None
         """
         if item is None:
-            for k in self.template:
-                self.__dict__.update({k: None})
+            for k in self.__slots__:
+                setattr(self, k, None)
         else:
             self.from_dict(item)
-        # Add automatic GUID generation and datetime timestamp
+        # Add automatic GUID generation and modified_at timestamp
         if not self.guid:
             self.guid = str(uuid.uuid4())
-        if not self.datetime:
-            self.datetime = datetime.now().isoformat()  # type: ignore
+        if not self.modified_at:
+            self.modified_at = datetime.now().isoformat()  # type: ignore
 
     def __repr__(self):
-        return str(self.__dict__)
+        return str(self.to_dict(squeeze=False))
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(self.to_dict(squeeze=False))
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        if not isinstance(other, Entity):
+            return NotImplemented
+        return _slot_values(self) == _slot_values(other)
+
+    def __getitem__(self, key):
+        if key not in self.template:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.template:
+            raise KeyError(f"{key} <- not in template")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.template
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def keys(self):
+        return self.template.keys()
 
     def from_dict(self, item: dict) -> None:
         """
         Check if item is a dict, if any key in the item is not in the template
         and if all item keys are in the template. If no errors are raised the item
-        matches the entity template, we can add the item's key value to the object's __dict__
+        matches the entity template, we can set the item's values on the object's slots
         """
         if not isinstance(item, dict):
             raise TypeError(f"{item} <- not a dict")
-        if any([k not in self.template for k in item.keys()]):
-            raise KeyError(f"{item} <- does not match template")
-        if not all([k in item.keys() for k in self.template.keys()]):
+        if item.keys() != TEMPLATE_KEYS:
             raise KeyError(f"{item} <- does not match template")
 
         for k, v in item.items():
-            self.__dict__.update({k: v})
+            setattr(self, k, v)
 
     def to_dict(self, squeeze=True):
         """
@@ -86,9 +121,57 @@ class Entity(dict):
             dict: A dictionary of the object's attributes.
         """
         if squeeze:
-            return {k: v for k, v in self.__dict__.items() if v is not None}
+            return {k: v for k, v in zip(self.__slots__, _slot_values(self)) if v is not None}
         else:
-            return {k: v for k, v in self.__dict__.items()}
+            return dict(zip(self.__slots__, _slot_values(self)))
+
+    def view(self, squeeze=True) -> "EntityView":
+        """
+        Zero-copy, read-only mapping over the object's attributes.
+
+        Unlike `to_dict` no dictionary is built, values are read from the
+        Entity on access so the view always reflects its current state.
+
+        Args:
+            squeeze (bool, optional): If True, hide attributes whose value is None.
+                Defaults to True.
+        """
+        return EntityView(self, squeeze=squeeze)
+
+
+# Fetches all slot values in one C call, in template order
+_slot_values = attrgetter(*Entity.__slots__)
+
+
+class EntityView(Mapping):
+    """Read-only live mapping over the slots of an Entity, see `Entity.view`."""
+
+    __slots__ = ("_ent", "_squeeze")
+
+    def __init__(self, ent: Entity, squeeze: bool = True):
+        self._ent = ent
+        self._squeeze = squeeze
+
+    def __getitem__(self, key):
+        if key not in Entity.template:
+            raise KeyError(key)
+        value = getattr(self._ent, key)
+        if value is None and self._squeeze:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        if not self._squeeze:
+            return iter(Entity.__slots__)
+        return (k for k in Entity.__slots__ if getattr(self._ent, k) is not None)
+
+    def __len__(self):
+        if not self._squeeze:
+            return len(Entity.__slots__)
+        return sum(getattr(self._ent, k) is not None for k in Entity.__slots__)
+
+    def __repr__(self):
+        return f"EntityView({dict(self)})"
 
 
 class EntityFile(object):
@@ -99,30 +182,270 @@ class EntityFile(object):
 
     Args:
         path (str): Path to a json/gnmd file.
+        lazy (bool, optional): Do not load the file, stream its Entities on
+            demand when iterating instead. Defaults to False.
+        journal (bool, optional): Record edits in an append-only journal next
+            to the file (see `genemede.journal`) so that `save` costs O(change)
+            instead of rewriting the file. Defaults to False.
     """
 
-    def __init__(self, path, lazy=False):
+    def __init__(self, path, lazy=False, journal=False):
         self.path = Path(path)
+        self.lazy = lazy
         self.ents = []
+        self._by_guid = {}
+        # guid -> increasing rank in ents, so that query results keep the file order
+        self._order = {}
+        # Secondary indexes by path, see create_index
+        self.indexes = {}
+        # Pending (op, guid, data) edits since the last save
+        self._changes = []
+        # Whether GUIDs generated on load still have to be written to the base
+        self._new_guids = False
+        # Called as hook(entity_file, changes) after each save, e.g. by genemede.search
+        self.save_hooks = []
+        self.journal = None
+        if journal:
+            from genemede.journal import Journal
+
+            self.journal = Journal(self.path)
         if not self.path.exists():
             print(f"Warning: {self.path} does not exist")
             return
-        elif not is_valid_file(self.path):
-            print(f"Error: {self.path} is not a valid genemede file")
         elif not lazy:
-            self.load()
+            # Read and parse the file once, the same payload is validated and loaded
+            data = io.read(self.path)
+            if not is_valid_gnmd_struct(data):
+                print(f"Error: {self.path} is not a valid genemede file")
+                return
+            self.load(data)
+
+    def load(self, data=None):
+        """Build the Entities from already parsed data, reading the file if not given."""
+        if data is None:
+            data = io.read(self.path)
+        if self.journal is not None:
+            if len(self.journal):
+                data = self.journal.replay(base=data)
+            # Journal records refer to GUIDs, generated ones must reach the base
+            self._new_guids = any(not d.get("guid") for d in data)
+        with instrument.timer("core.entities"):
+            self.ents.extend(Entity(item=d) for d in data)
+        instrument.count("core.entities_built", len(data))
+        self.lazy = False
+        self.reindex()
+
+    def reindex(self) -> None:
+        """Rebuild the GUID and secondary indexes, needed only if `ents` was modified directly."""
+        self._by_guid = {e.guid: e for e in self.ents}
+        self._order = {e.guid: i for i, e in enumerate(self.ents)}
+        for path in self.indexes:
+            self.indexes[path] = query.Index(path, self.ents)
+
+    def create_index(self, path: str) -> "query.Index":
+        """
+        Create (or return) a secondary index on the value at a dotted path.
+
+        Indexes, e.g. on "mtype", "tags", "parent" or "properties.sex", are
+        kept up to date by add_entity/update_entity/remove_entity and used by
+        `query` when a predicate addresses the same path.
+        """
+        self._ensure_loaded()
+        if path not in self.indexes:
+            self.indexes[path] = query.Index(path, self.ents)
+        return self.indexes[path]
+
+    def drop_index(self, path: str) -> None:
+        self.indexes.pop(path, None)
+
+    def query(self, *predicates: "query.Predicate") -> t.List[Entity]:
+        """
+        Return the Entities matching all predicates, see `genemede.query`.
+
+        Predicates on indexed paths are answered from the indexes, otherwise
+        the entities are scanned (streamed from disk for lazy files).
+        """
+        if self.lazy and not self.indexes:
+            return query.run(predicates, self.iter_entities())
+        self._ensure_loaded()
+        return query.run(predicates, self.ents, self.indexes, self._by_guid, self._order)
+
+    def _ensure_loaded(self):
+        if self.lazy:
+            self.lazy = False
+            if self.path.exists():
+                self.load()
+
+    def get_entity(self, guid: str, default=None) -> t.Optional[Entity]:
+        """Return the Entity with the given GUID in O(1), or default if not found."""
+        self._ensure_loaded()
+        return self._by_guid.get(guid, default)
+
+    def add_entity(self, entity: t.Union[Entity, dict]) -> Entity:
+        """
+        Append an Entity (or a template matching dict) to the file.
+
+        Raises:
+            KeyError: If an Entity with the same GUID is already in the file.
+        """
+        self._ensure_loaded()
+        if not isinstance(entity, Entity):
+            entity = Entity(item=entity)
+        if entity.guid in self._by_guid:
+            raise KeyError(f"{entity.guid} <- already in {self.path}")
+        # Ranks only need to increase, removals leave gaps
+        self._order[entity.guid] = self._order[self.ents[-1].guid] + 1 if self.ents else 0
+        self.ents.append(entity)
+        self._by_guid[entity.guid] = entity
+        for index in self.indexes.values():
+            index.add(entity)
+        self._changes.append(("add", entity.guid, entity.to_dict(squeeze=False)))
+        return entity
+
+    def update_entity(self, entity: t.Union[Entity, dict]) -> Entity:
+        """
+        Copy the values of entity onto the stored Entity with the same GUID.
+
+        The stored object is updated in place so references to it (and the
+        index) stay valid, its modified_at timestamp is refreshed.
+
+        Raises:
+            KeyError: If no Entity with that GUID is in the file.
+        """
+        self._ensure_loaded()
+        if not isinstance(entity, Entity):
+            entity = Entity(item=entity)
+        stored = self._by_guid.get(entity.guid)
+        if stored is None:
+            raise KeyError(f"{entity.guid} <- not in {self.path}")
+        if stored is entity:
+            # Modified in place, the changed fields are unknown
+            delta = entity.to_dict(squeeze=False)
+        else:
+            delta = {}
+            for k in Entity.__slots__:
+                v = getattr(entity, k)
+                if getattr(stored, k) != v:
+                    delta[k] = v
+                    setattr(stored, k, v)
+        stored.modified_at = delta["modified_at"] = datetime.now().isoformat()
+        for index in self.indexes.values():
+            index.update(stored)
+        self._changes.append(("update", stored.guid, delta))
+        return stored
+
+    def remove_entity(self, guid: str) -> Entity:
+        """
+        Remove and return the Entity with the given GUID.
+
+        Raises:
+            KeyError: If no Entity with that GUID is in the file.
+        """
+        self._ensure_loaded()
+        entity = self._by_guid.pop(guid)
+        del self._order[guid]
+        for index in self.indexes.values():
+            index.remove(guid)
+        # Identity search, Entity.__eq__ compares values
+        self.ents.pop(next(i for i, e in enumerate(self.ents) if e is entity))
+        self._changes.append(("delete", guid, None))
+        return entity
+
+    def __contains__(self, guid):
+        self._ensure_loaded()
+        return guid in self._by_guid
+
+    def iter_entities(self) -> t.Iterator["Entity"]:
+        """
+        Iterate over the Entities of the file.
+
+        Lazy files are streamed from disk one element at a time with bounded
+        memory, each element is validated against the template when built.
+
+        Raises:
+            KeyError: If a streamed element does not match the Entity template.
+        """
+        if not self.lazy:
+            yield from self.ents
+            return
+        if not self.path.exists():
+            return
+        if self.journal is not None and len(self.journal):
+            # Journaled edits need the whole base to be replayed
+            self._ensure_loaded()
+            yield from self.ents
+            return
+        counted = instrument.enabled
+        for d in io.iter_read(self.path):
+            if counted:
+                instrument.count("core.entities_built")
+            yield Entity(item=d)
 
-    def load(self):
-        data = io.read(self.path)
-        for d in data:
-            self.ents.append(Entity(item=d))
+    def __iter__(self):
+        return self.iter_entities()
 
     def save(self):
-        io.create(self.path, self.ents)
+        """
+        Write the pending edits to disk.
+
+        Journaled files only append the edits made since the last save, and
+        are compacted once the journal holds `journal.COMPACT_EVERY` records,
+        or on the first save if GUIDs were generated on load.
+        Other files are rewritten atomically (see `io.update`), retiring any
+        journal left next to them (see `Journal.detach`).
+
+        The saved (op, guid, data) edits are then passed to the `save_hooks`.
+        """
+        self.write_snapshot(self.snapshot())
+
+    def snapshot(self) -> "SaveSnapshot":
+        """
+        Take the pending edits, with a copy of the entities if `save` has to write them all.
+
+        The only step of `save` reading the entities, so that a caller sharing
+        the EntityFile between threads can hold its lock for this step only
+        and write the snapshot outside of it (see `genemede.server`).
+        """
+        from genemede.journal import COMPACT_EVERY
+
+        snap = SaveSnapshot(changes=self._changes)
+        self._changes = []
+        if self.journal is not None and self.path.exists():
+            if self._new_guids:
+                # Write the generated GUIDs to the base before any record refers to them
+                snap.append = False
+                self._new_guids = False
+            elif len(self.journal) + len(snap.changes) < COMPACT_EVERY:
+                return snap
+        else:
+            self._ensure_loaded()
+        snap.data = [e.to_dict(squeeze=False) for e in self.ents]
+        return snap
+
+    def write_snapshot(self, snap: "SaveSnapshot") -> None:
+        """Write a `snapshot` taken by this EntityFile, see `save`."""
+        from genemede.journal import Journal
+
+        if self.journal is not None and self.path.exists():
+            if snap.append:
+                self.journal.extend(snap.changes)
+            if snap.data is not None:
+                self.journal.compact(snap.data)
+        else:
+            if self.path.exists():
+                bak = io.update(self.path, snap.data)
+            else:
+                bak = None
+                io.create(self.path, snap.data)
+            (self.journal if self.journal is not None else Journal(self.path)).detach(bak)
+        for hook in self.save_hooks:
+            hook(self, snap.changes)
 
     def update(self, data):  # Use EntityFile.write
-        with open(self.path, "w") as f:
-            json.dump(data, f, indent=4)
+        from genemede.journal import Journal
+
+        io.write_atomic(self.path, data)
+        (self.journal if self.journal is not None else Journal(self.path)).detach()
 
     def delete(self):
         self.path.unlink()
@@ -137,6 +460,120 @@ class EntityFile(object):
         return str(self.path)
 
 
+TEMPLATE_KEYS = frozenset(Entity.template)
+
+
+@dataclass
+class SaveSnapshot:
+    """What `EntityFile.save` writes, see `EntityFile.snapshot`.
+
+    Args:
+        changes (list): The (op, guid, data) edits since the previous snapshot.
+        data (list, optional): The entity dicts, when the whole file (or
+            journal base) is rewritten.
+        append (bool): Whether the changes are appended to the journal.
+    """
+
+    changes: list = field(default_factory=list)
+    data: t.Optional[list] = None
+    append: bool = True
+
+
+@dataclass
+class EntityIssue:
+    """A single problem found while validating one putative entity.
+
+    Args:
+        index (int): Position of the offending item in the validated list.
+        message (str): Human readable description of the problem.
+        missing (frozenset): Template keys absent from the item.
+        unknown (frozenset): Item keys that are not part of the template.
+    """
+
+    index: int
+    message: str
+    missing: frozenset = frozenset()
+    unknown: frozenset = frozenset()
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating a putative GNMD structure.
+
+    Evaluates to True when no issues were found so it can be used directly
+    in boolean context.
+    """
+
+    n_items: int = 0
+    issues: list = field(default_factory=list)
+    error: t.Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and not self.issues
+
+    @property
+    def bad_indices(self) -> list:
+        return [i.index for i in self.issues]
+
+    def __bool__(self):
+        return self.valid
+
+
+def validate_entity(item: t.Any, index: int = 0) -> t.Optional[EntityIssue]:
+    """
+    Check a single putative entity against the `Entity.template` keys.
+
+    Args:
+        item: A dict or an Entity.
+        index (int): Position of the item, reported back in the issue.
+
+    Returns:
+        None if the item is valid, an EntityIssue otherwise.
+    """
+    if isinstance(item, Entity):
+        return None
+    if not isinstance(item, dict):
+        return EntityIssue(index, f"item is a {type(item).__name__}, not a dict or Entity")
+    keys = item.keys()
+    if keys == TEMPLATE_KEYS:
+        return None
+    return EntityIssue(
+        index,
+        "keys do not match the Entity template",
+        missing=TEMPLATE_KEYS - keys,
+        unknown=frozenset(keys - TEMPLATE_KEYS),
+    )
+
+
+@instrument.timed("core.validate")
+def validate_gnmd_struct(data: t.Any, fail_fast: bool = False) -> ValidationReport:
+    """
+    Validate a putative GNMD structure in a single pass.
+
+    Each item is checked once against the precomputed `TEMPLATE_KEYS`, which
+    is equivalent to (and deterministic unlike) checking that all items share
+    the same keys and that those keys match the template.
+
+    Args:
+        data: A list of dicts or Entities.
+        fail_fast (bool, optional): Stop at the first offending item. Defaults to False.
+
+    Returns:
+        ValidationReport: The offending indices with their missing/unknown keys.
+    """
+    if not isinstance(data, list):
+        return ValidationReport(error=f"data is a {type(data).__name__}, not a list")
+    report = ValidationReport(n_items=len(data))
+    for i, item in enumerate(data):
+        issue = validate_entity(item, i)
+        if issue is not None:
+            report.issues.append(issue)
+            if fail_fast:
+                break
+    return report
+
+
 def is_valid_gnmd_struct(data: t.Union[list[dict], list[Entity]]) -> bool:
     """
     Check whether the given data is a valid GNMD structure.
@@ -146,44 +583,20 @@ def is_valid_gnmd_struct(data: t.Union[list[dict], list[Entity]]) -> bool:
       (i.e., instances of the `Entity` class).
 
     Returns:
-    - A boolean indicating whether the data is valid, i.e.,
-      whether it meets the following criteria:
-      1. It is a list.
-      2. All its elements are either dictionaries or entities.
-      3. All its dictionaries/entities have the same set of keys.
-      4. All its dictionaries/entities have the same number of keys.
-      5. All its dictionaries/entities have the same keys as the `Entity.template`.
+    - A boolean indicating whether the data is valid, i.e., whether it is a
+      list and all its dictionaries/entities have the same keys as the
+      `Entity.template`. Use `validate_gnmd_struct` for the detailed report.
     """
-    out = True
-    # Check that it is a list of dicts
-    if not isinstance(data, list):
-        print(f"Error: The data is not a list")
-        out = False
-    if not (
-        all([isinstance(d, dict) for d in data]) or all([isinstance(d, Entity) for d in data])
-    ):
-        print(f"Error: The data is not a list of dicts or a list of Entities")
-        out = False
-    random_item = random.choice(data)
-    # Check if all dicts have the same number of keys
-    if not all([len(d) == len(random_item) for d in data]):
-        print(f"Error: The data is not a list of dicts with same length")
-        out = False
-    # and that they match
-    if not all([all([k in d.keys() for k in random_item.keys()]) for d in data]):
-        print(f"Error: The data is not a list of dicts with same keys")
-        out = False
-    # Now that they are all the 'same' we can check with the random_item keysmatch the template's
-    if not len(random_item) == len(Entity.template):
-        print(f"Error: The putative entity items are not the same length as the template")
-        out = False
-    if not all([k in Entity.template.keys() for k in random_item.keys()]):
-        print(f"Error: Found unknown keys in putative entities")
-        out = False
-    if not all([k in random_item.keys() for k in Entity.template.keys()]):
-        print(f"Error: Missing keys in putative entity")
-        out = False
-    return out
+    report = validate_gnmd_struct(data, fail_fast=True)
+    if report.error is not None:
+        print(f"Error: {report.error}")
+    elif report.issues:
+        issue = report.issues[0]
+        print(
+            f"Error: item {issue.index}: {issue.message}"
+            f" (missing: {sorted(issue.missing)}, unknown: {sorted(issue.unknown)})"
+        )
+    return report.valid
 
 
 def is_valid_file(fpath):
@@ -204,19 +617,37 @@ def is_valid_file(fpath):
         return False
 
 
-def find_gnmd_files(path: t.Union[str, Path]) -> t.List[t.Union[str, Path]]:
+def find_gnmd_files(
+    path: t.Union[str, Path],
+    cache: bool = False,
+    workers: t.Optional[int] = None,
+    chunksize: t.Optional[int] = None,
+) -> t.List[t.Union[str, Path]]:
     """
-    Return a list of all .json files in the given path that are valid genemede files.
+    Return a list of all the json/gnmd files in the given path that are valid genemede files.
+
+    Files of every storage encoding are found and backups are skipped, see
+    `io.candidate_files`.
 
     Args:
         path (Union[str, Path]): The path to search for .gnmd files.
+        cache (bool, optional): Use (and update) the on-disk catalog stored in
+            the searched folder, so only files changed since the last scan are
+            read. See `genemede.catalog`. Defaults to False.
+        workers (int, optional): Validate files in a pool of processes, -1 uses
+            all cores. Defaults to None (serial).
+        chunksize (int, optional): Files sent to a worker at a time.
 
     Returns:
-        A list of all .gnmd files in the given path.
+        A sorted list of all .gnmd files in the given path, in the same order for any number of workers.
     """
     path = Path(path)
-    files = []
-    for f in path.rglob("*.json"):  # XXX: .gnmd.json IMPLEMENT!!
-        if is_valid_file(f):
-            files.append(f)
-    return files
+    if cache:
+        from genemede.catalog import Catalog
+
+        return Catalog(path).scan(workers=workers, chunksize=chunksize)
+    candidates = io.candidate_files(path)
+    valid = pmap(is_valid_file, candidates, workers=workers, chunksize=chunksize)
+    instrument.count("core.files_scanned", len(candidates))
+    instrument.count("core.files_skipped", valid.count(False))
+    return [f for f, ok in zip(candidates, valid) if ok]
@@ -4,51 +4,170 @@
 # @Date: Thursday, June 15th 2023, 11:13:44 am
 
 
+import re
+import typing as t
 import uuid
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
 
 import genemede as gnmd
-from genemede import io
+from genemede import instrument, io
+from genemede.parallel import pmap
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+# Entity.template key holding the entity timestamp
+TIMESTAMP_KEY = "modified_at"
+# Canonical (hyphenated or not) UUID strings, as accepted by uuid.UUID
+GUID_RE = re.compile(r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}")
+# ISO 8601 timestamps as written by Entity (datetime.isoformat) and DATETIME_FORMAT, with an optional
+# UTC offset. Only a prefilter, the days of the month are checked by date.fromisoformat
+DATETIME_RE = re.compile(
+    r"\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])T([01]\d|2[0-3]):[0-5]\d:[0-5]\d(\.\d{1,6})?"
+    r"(Z|[+-]([01]\d|2[0-3]):[0-5]\d)?"
+)
+FIXES = ("missing_keys", "guids", "datetimes")
+
+
+@dataclass
+class Change:
+    """A value changed (or to be changed, in dry run) by the curation engine."""
+
+    index: int
+    key: str
+    old: t.Any
+    new: t.Any
+
+
+@dataclass
+class CurationReport:
+    """Structured diff of a curation run.
+
+    Args:
+        n_items (int): Number of curated items.
+        dry_run (bool): Whether the changes were only computed, not applied.
+        changes (list[Change]): Every changed value, in item order.
+    """
+
+    n_items: int = 0
+    dry_run: bool = False
+    changes: list = field(default_factory=list)
+
+    def summary(self) -> dict:
+        """Number of changes per key."""
+        out = {}
+        for c in self.changes:
+            out[c.key] = out.get(c.key, 0) + 1
+        return out
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+
+def _column(data: list, key: str) -> list:
+    return [d[key] if key in d else None for d in data]
+
+
+def invalid_guids(values: t.Iterable) -> t.List[int]:
+    """Indices of the values that are not GUID strings."""
+    match = GUID_RE.fullmatch
+    return [i for i, v in enumerate(values) if type(v) is not str or match(v) is None]
+
+
+def _is_datetime(value: t.Any) -> bool:
+    if type(value) is not str or DATETIME_RE.fullmatch(value) is None:
+        return False
+    try:
+        # Rejects the impossible dates the regex lets through, e.g. 2023-02-31
+        date.fromisoformat(value[:10])
+    except ValueError:
+        return False
+    return True
+
+
+def invalid_datetimes(values: t.Iterable) -> t.List[int]:
+    """Indices of the values that are not ISO 8601 timestamp strings."""
+    return [i for i, v in enumerate(values) if not _is_datetime(v)]
+
+
+@instrument.timed("curate")
+def curate(
+    data: list[dict], fixes: t.Iterable[str] = FIXES, dry_run: bool = False
+) -> CurationReport:
+    """
+    Apply the curation fixes to a list of dicts (or Entities) in one pass.
+
+    Whole columns (guids, timestamps) are checked first with precompiled
+    regexes, then every fix is applied to each offending item in a single
+    pass over the data. New timestamps are shared by the whole batch.
+
+    Args:
+        data (list[dict]): The items to fix, modified in place unless dry_run.
+        fixes (Iterable[str], optional): Any of "missing_keys", "guids" and
+            "datetimes". Defaults to all of them.
+        dry_run (bool, optional): Only report the changes. Defaults to False.
+
+    Raises:
+        TypeError: If an item is not a dict or an Entity.
+        ValueError: If an unknown fix is requested.
+
+    Returns:
+        CurationReport: The changed values.
+    """
+    fixes = set(fixes)
+    if fixes - set(FIXES):
+        raise ValueError(f"{sorted(fixes - set(FIXES))} <- unknown fixes, expected any of {FIXES}")
+    for i, d in enumerate(data):
+        if not isinstance(d, (dict, gnmd.Entity)):
+            raise TypeError(f"item {i}: {d} <- not a dict or Entity")
+
+    todo = {}  # index -> [(key, new)]
+    if "missing_keys" in fixes:
+        for i, d in enumerate(data):
+            missing = [k for k in gnmd.Entity.template if k not in d]
+            if missing:
+                todo.setdefault(i, []).extend((k, None) for k in missing)
+    if "guids" in fixes:
+        for i in invalid_guids(_column(data, "guid")):
+            todo.setdefault(i, []).append(("guid", str(uuid.uuid4())))
+    if "datetimes" in fixes:
+        now = datetime.now().strftime(DATETIME_FORMAT)
+        for i in invalid_datetimes(_column(data, TIMESTAMP_KEY)):
+            todo.setdefault(i, []).append((TIMESTAMP_KEY, now))
+
+    report = CurationReport(n_items=len(data), dry_run=dry_run)
+    for i in sorted(todo):
+        d = data[i]
+        # Later fixes of the same key (e.g. a missing guid) override earlier ones
+        new_values = dict(todo[i])
+        for k, new in new_values.items():
+            report.changes.append(Change(i, k, d[k] if k in d else None, new))
+            if not dry_run:
+                d[k] = new
+    instrument.count("curate.changes", len(report.changes))
+    return report
 
 
 def fix_entity_missing_keys(data: list[dict]) -> list[dict]:
     """
     Fixes the missing keys in a list of dicts or entities.
     """
-    for d in data:
-        for ek in gnmd.Entity.template:
-            if ek not in d:
-                d[ek] = None
-
+    curate(data, fixes=["missing_keys"])
     return data
 
 
 def fix_guids(data: list[dict]) -> list[dict]:
-    """Fixes the guids of all the entities in the EntityFile
-
-    Args:
-        dry_run (bool, optional): Do everything except changing the values. Defaults to True.
-    """
-    for d in data:
-        # Check if guid is valid
-        try:
-            uuid.UUID(d["guid"])
-        except BaseException as x:
-            d["guid"] = str(uuid.uuid4())
-            # print(f"fix_guids(): Created GUID for {d["name"]} -> current: {d["guid"]}")
+    """Fixes the guids of all the entities in the EntityFile, see `curate`"""
+    curate(data, fixes=["guids"])
     return data
 
 
 def fix_datetimes(data: list[dict]) -> list[dict]:
-    """Fixes the datetimes of all the entities in the EntityFile"""
-    for d in data:
-        # Fix invalid datetimes
-        try:
-            datetime.strptime(d["datetime"], "%Y-%m-%dT%H:%M:%S.%f")
-        except BaseException as x:
-            d["datetime"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-            # print(f"fix_datetimes: Created datetime for {d["name"]} -> {d["datetime"]}" )
+    """Fixes the modified_at timestamps of all the entities in the EntityFile, see `curate`"""
+    curate(data, fixes=["datetimes"])
     return data
 
 
@@ -61,43 +180,51 @@ def fix_entity_missing_keys_file(fpath: Path) -> None:
     io.update(fpath, fixed_data)
 
 
-def try_fix_file(fpath: str | Path) -> None:
+def try_fix_file(fpath: str | Path, dry_run: bool = False) -> bool:
     """
-    Tries to fix common issues with a file.
+    Tries to fix common issues with a file, in a single curation pass.
+
+    The file is only rewritten when something changed.
+
+    Returns:
+        bool: True if the file could be read, curated and updated.
     """
     try:
         data = io.read(fpath)
-        fixed_data = data[:]
-    except BaseException as e:
-        print("-->", fpath, "-->", e)
-    try:
-        fixed_data = fix_entity_missing_keys(data)
-    except BaseException as e:
-        print("-->", fpath, "-->", e)
-    try:
-        fixed_data = fix_guids(fixed_data)
-    except BaseException as e:
-        print("-->", fpath, "-->", e)
-    try:
-        fixed_data = fix_datetimes(fixed_data)
-    except BaseException as e:
-        print("-->", fpath, "-->", e)
-    try:
-        io.update(fpath, fixed_data)
-    except BaseException as e:
+        report = curate(data, dry_run=dry_run)
+        if report and not dry_run:
+            io.update(fpath, data)
+    except (OSError, ValueError, TypeError) as e:
         print("-->", fpath, "-->", e)
+        return False
+    if report:
+        print("-->", fpath, "-->", report.summary())
+    return True
+
+
+def try_fix_files(
+    files: list[str | Path], workers: int | None = None, chunksize: int | None = None
+) -> list[bool]:
+    """
+    Tries to fix common issues with many files, optionally in a pool of processes.
+
+    Args:
+        files (list): Paths of the files to fix.
+        workers (int, optional): Number of processes, -1 uses all cores. Defaults to None (serial).
+        chunksize (int, optional): Files sent to a worker at a time.
+
+    Returns:
+        list[bool]: The `try_fix_file` result of each file, in the same order as files.
+    """
+    return pmap(try_fix_file, files, workers=workers, chunksize=chunksize)
 
 
 if __name__ == "__main__":
     fpath = "/home/nico/Projects/COGITATE/GENEMEDE/genemede/tests/fixtures/metadata_databases/devices.json"
     fpath = "/home/nico/Projects/COGITATE/GENEMEDE/genemede/tests/fixtures/metadata_descriptors/"
-    files = gnmd.find_gnmd_files(fpath)
+    files = gnmd.find_gnmd_files(fpath, workers=-1)
     print(files)
-    for f in files:
-        try:
-            try_fix_file(f)
-        except BaseException as e:
-            print("-->", f, "-->", e)
+    print(try_fix_files(files, workers=-1))
 
     # gnmd.is_valid_file(fpath)
     # data = io.read(fpath)
@@ -2,9 +2,164 @@
 # @File: genemede/export.py
 # @Author: Niccolo' Bonacchi (@nbonacchi)
 # @Date: Monday, July 10th 2023, 4:21:56 pm
+import functools
+import json
+import re
+import tempfile
+import typing as t
+from pathlib import Path
 
+from genemede.paths import MISSING, compile_path
 
 bids_mapping = {
     "InstitutionName": "*properties.institute",
     "InstitutionAddress": "*properties.contact_address",
 }
+
+participants_mapping = {
+    "age": "*properties.age",
+    "sex": "*properties.sex",
+    "handedness": "*properties.handedness",
+}
+
+NA = "n/a"
+# Where an entity may carry its own bids mapping block
+_own_mapping_getters = (compile_path("bids"), compile_path("custom.bids"))
+_name = compile_path("name")
+_guid = compile_path("guid")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_items(items: t.Tuple[t.Tuple[str, str], ...]) -> t.Tuple[t.Tuple[str, t.Callable], ...]:
+    return tuple((key, compile_path(path)) for key, path in items)
+
+
+def compile_mapping(mapping: dict) -> t.Tuple[t.Tuple[str, t.Callable], ...]:
+    """
+    Compile a {bids key: "*path"} mapping into (key, accessor) pairs.
+
+    Compiled mappings are cached, entities sharing the same mapping block
+    never parse its paths again.
+    """
+    return _compile_items(tuple(mapping.items()))
+
+
+def entity_mapping(entity: t.Any, default: dict) -> dict:
+    """The entity's own bids mapping block if it has one, else default."""
+    for get in _own_mapping_getters:
+        own = get(entity)
+        if own:
+            return own
+    return default
+
+
+def apply_mapping(entity: t.Any, mapping: dict) -> dict:
+    """Evaluate a mapping on an entity, skipping the paths it does not have."""
+    out = {}
+    for key, get in compile_mapping(mapping):
+        value = get(entity)
+        if value is not MISSING:
+            out[key] = value
+    return out
+
+
+def participant_label(entity: t.Any) -> str:
+    """BIDS label (alphanumeric only) from the entity name, or its guid if nameless."""
+    for get in (_name, _guid):
+        label = re.sub(r"[^a-zA-Z0-9]", "", str(get(entity) or ""))
+        if label:
+            return label
+    raise ValueError(f"{entity} <- no name or guid to build a BIDS label from")
+
+
+def tsv_value(value: t.Any) -> str:
+    if value is None or value is MISSING or value == "":
+        return NA
+    if isinstance(value, (list, tuple)):
+        return ",".join(tsv_value(v) for v in value)
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    return re.sub(r"[\t\r\n]+", " ", str(value))
+
+
+def export_participants(
+    entities: t.Iterable[t.Any],
+    outdir: t.Union[str, Path],
+    mapping: dict = participants_mapping,
+    sidecars: bool = False,
+) -> Path:
+    """
+    Write BIDS participants.tsv/participants.json for subject entities.
+
+    Entities are streamed through once: each one is evaluated with its own
+    bids block if it has one (see `entity_mapping`) or mapping otherwise,
+    through compiled and cached accessors, and its row is written out right
+    away: only the participant ids are kept in memory.
+
+    Args:
+        entities (Iterable): Subject Entities or dicts, e.g. a lazy EntityFile.
+        outdir (Union[str, Path]): The BIDS dataset root.
+        mapping (dict, optional): {column: "*path"} used for entities without
+            their own bids block. Defaults to participants_mapping.
+        sidecars (bool, optional): Also write the mapped values of each
+            subject to sub-<label>/sub-<label>.json. Defaults to False.
+
+    Raises:
+        ValueError: If two subjects map to the same participant_id.
+
+    Returns:
+        Path: The path of participants.tsv.
+    """
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    columns = {"participant_id": "Participant identifier"}
+    pids = set()
+    # Rows are written as they are produced, with the columns known so far:
+    # columns only ever get appended, so earlier rows are padded at the end
+    with tempfile.TemporaryFile("w+", dir=outdir) as body:
+        for entity in entities:
+            own = entity_mapping(entity, mapping)
+            for key, path in own.items():
+                columns.setdefault(key, f"genemede {path}")
+            values = apply_mapping(entity, own)
+            pid = f"sub-{participant_label(entity)}"
+            if pid in pids:
+                raise ValueError(f"{pid} <- duplicated participant_id")
+            pids.add(pid)
+            row = [tsv_value(values.get(k, MISSING)) for k in columns if k != "participant_id"]
+            body.write("\t".join([pid] + row) + "\n")
+            if sidecars:
+                write_sidecar(values, outdir.joinpath(pid, f"{pid}.json"))
+
+        fpath = outdir.joinpath("participants.tsv")
+        body.seek(0)
+        with open(fpath, "w") as f:
+            f.write("\t".join(columns) + "\n")
+            for line in body:
+                # tsv_value strips tabs, a row's tabs separate its columns
+                missing = len(columns) - 1 - line.count("\t")
+                f.write(line[:-1] + f"\t{NA}" * missing + "\n")
+    with open(outdir.joinpath("participants.json"), "w") as f:
+        json.dump({k: {"Description": v} for k, v in columns.items()}, f, indent=4)
+    return fpath
+
+
+def write_sidecar(values: dict, fpath: t.Union[str, Path]) -> Path:
+    """Write already mapped values as a BIDS JSON sidecar."""
+    fpath = Path(fpath)
+    fpath.parent.mkdir(parents=True, exist_ok=True)
+    with open(fpath, "w") as f:
+        json.dump(values, f, indent=4)
+    return fpath
+
+
+def export_sidecar(entity: t.Any, fpath: t.Union[str, Path], mapping: dict = bids_mapping) -> Path:
+    """
+    Write the BIDS JSON sidecar of one entity, e.g. InstitutionName from a lab.
+
+    Args:
+        entity: An Entity or dict.
+        fpath (Union[str, Path]): The sidecar path.
+        mapping (dict, optional): {bids key: "*path"}. Defaults to bids_mapping.
+    """
+    return write_sidecar(apply_mapping(entity, mapping), fpath)
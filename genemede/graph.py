@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# @File: genemede/graph.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 10:31:26 pm
+"""Relationship graph between entities.
+
+An entity references other entities by GUID through its `parent`,
+`components` and `links`. Strings starting with "*" are mapping placeholders
+(e.g. "*guid.projects.json"), not references. `links` are free form (e.g.
+{"project": guid, "subjects": [guid, ...], "note": "..."}), only the strings
+nested in them that are GUIDs count.
+
+`parent` and `links` point from an entity up to the one it belongs to,
+`components` point down from a container to its parts, so the hierarchy
+edges of `components` are reversed: a component is under its container like
+a child under its parent.
+
+The graph is built once as adjacency lists in both directions, so that
+closures (e.g. every session under a project), cycle and dangling reference
+detection run in time linear in the size of the graph.
+"""
+import typing as t
+
+from genemede.curate import GUID_RE
+
+REFERENCE_FIELDS = ("parent", "components", "links")
+# Reference fields listing the parts of an entity rather than what it belongs to
+DOWN_FIELDS = ("components",)
+
+
+def iter_references(entity: t.Any) -> t.Iterator[t.Tuple[str, str]]:
+    """Yield the (field, guid) references of an entity, in order."""
+    is_guid = GUID_RE.fullmatch
+    for field in REFERENCE_FIELDS:
+        stack = [entity[field]]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, str):
+                if value and not value.startswith("*") and (field != "links" or is_guid(value)):
+                    yield field, value
+            elif isinstance(value, dict):
+                stack.extend(reversed(list(value.values())))
+            elif isinstance(value, list):
+                stack.extend(reversed(value))
+
+
+def _hierarchy(guid: str, refs: t.Iterable[t.Tuple[str, str]]) -> t.Iterator[t.Tuple[str, str]]:
+    """The (child, parent) edges of the references of guid."""
+    for field, target in refs:
+        yield (target, guid) if field in DOWN_FIELDS else (guid, target)
+
+
+def _add_edge(adjacency: dict, a: str, b: str) -> None:
+    targets = adjacency.setdefault(a, {})
+    targets[b] = targets.get(b, 0) + 1
+
+
+def _drop_edge(adjacency: dict, a: str, b: str) -> None:
+    targets = adjacency[a]
+    targets[b] -= 1
+    if not targets[b]:
+        del targets[b]
+    if not targets:
+        del adjacency[a]
+
+
+class EntityGraph(object):
+    """Adjacency-list graph of the references between entities.
+
+    Args:
+        entities (Iterable): Entities (or dicts), e.g. a Repository.
+    """
+
+    def __init__(self, entities: t.Iterable[t.Any] = ()):
+        self.nodes = {}
+        self.out = {}  # guid -> [(field, target guid)]
+        self.into = {}  # guid -> {source guid: n references}
+        self.up = {}  # child guid -> {parent guid: n edges}
+        self.down = {}  # parent guid -> {child guid: n edges}
+        for e in entities:
+            self.add(e)
+
+    def add(self, entity: t.Any) -> None:
+        """Add (or replace) an entity and its references."""
+        guid = entity["guid"]
+        if guid in self.nodes:
+            self._unlink(guid)
+        self.nodes[guid] = entity
+        refs = list(iter_references(entity))
+        self.out[guid] = refs
+        for _, target in refs:
+            _add_edge(self.into, target, guid)
+        for child, parent in _hierarchy(guid, refs):
+            _add_edge(self.up, child, parent)
+            _add_edge(self.down, parent, child)
+
+    update = add
+
+    def remove(self, guid: str) -> None:
+        """Remove an entity, references to it become dangling."""
+        self._unlink(guid)
+        del self.nodes[guid]
+
+    def _unlink(self, guid):
+        refs = self.out.pop(guid, ())
+        for _, target in refs:
+            _drop_edge(self.into, target, guid)
+        for child, parent in _hierarchy(guid, refs):
+            _drop_edge(self.up, child, parent)
+            _drop_edge(self.down, parent, child)
+
+    def get(self, guid: str, default=None):
+        return self.nodes.get(guid, default)
+
+    def resolve_many(self, guids: t.Iterable[str]) -> list:
+        """The entities of many GUIDs at once, None for the unknown ones."""
+        nodes = self.nodes
+        return [nodes.get(g) for g in guids]
+
+    def references(self, guid: str, field: t.Optional[str] = None) -> list:
+        """The entities referenced by guid (optionally through one field only)."""
+        return [self.nodes.get(g) for f, g in self.out.get(guid, ()) if field is None or f == field]
+
+    def referrers(self, guid: str) -> list:
+        """The entities referencing guid."""
+        return [self.nodes[g] for g in self.into.get(guid, ())]
+
+    def _closure(self, guid: str, adjacency: t.Callable[[str], t.Iterable[str]]) -> t.List[str]:
+        seen = {guid}
+        order = []
+        stack = [guid]
+        while stack:
+            for g in adjacency(stack.pop()):
+                if g not in seen:
+                    seen.add(g)
+                    order.append(g)
+                    stack.append(g)
+        return order
+
+    def descendants(self, guid: str, mtype: t.Optional[str] = None) -> list:
+        """
+        Entities under guid directly or transitively.
+
+        For example every session (and whatever references those sessions)
+        under a project, or the components of a container.
+
+        Args:
+            guid (str): The root entity.
+            mtype (str, optional): Only return entities of this mtype.
+        """
+        guids = self._closure(guid, lambda g: self.down.get(g, ()))
+        ents = (self.nodes[g] for g in guids if g in self.nodes)
+        return [e for e in ents if mtype is None or e["mtype"] == mtype]
+
+    def ancestors(self, guid: str) -> list:
+        """Entities guid is under directly or transitively (unknown GUIDs excluded)."""
+        guids = self._closure(guid, lambda g: self.up.get(g, ()))
+        return [self.nodes[g] for g in guids if g in self.nodes]
+
+    def dangling(self) -> t.List[t.Tuple[str, str, str]]:
+        """(source guid, field, missing guid) of every reference to an unknown entity."""
+        return [
+            (source, field, target)
+            for source, refs in self.out.items()
+            for field, target in refs
+            if target not in self.nodes
+        ]
+
+    def cycles(self) -> t.List[t.List[str]]:
+        """
+        Hierarchy cycles, each as the list of GUIDs from child to parent along it.
+
+        Iterative depth first search, every cycle is reported through at
+        least one of its back edges.
+        """
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = dict.fromkeys(self.nodes, WHITE)
+        found = []
+        for root in self.nodes:
+            if color[root] != WHITE:
+                continue
+            path = [root]
+            color[root] = GREY
+            iters = [iter(self.up.get(root, ()))]
+            while iters:
+                try:
+                    nxt = next(iters[-1])
+                except StopIteration:
+                    color[path.pop()] = BLACK
+                    iters.pop()
+                    continue
+                state = color.get(nxt)
+                if state == GREY:
+                    found.append(path[path.index(nxt):] + [nxt])
+                elif state == WHITE:
+                    color[nxt] = GREY
+                    path.append(nxt)
+                    iters.append(iter(self.up.get(nxt, ())))
+        return found
+
+    def __contains__(self, guid):
+        return guid in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
@@ -2,3 +2,352 @@
 # @File: genemede/import.py
 # @Author: Niccolo' Bonacchi (@nbonacchi)
 # @Date: Monday, July 10th 2023, 4:21:56 pm
+"""Streaming bulk import of CSV/TSV tables and legacy JSON exports.
+
+Rows are read one at a time, mapped onto `Entity.template` (columns not
+mapped explicitly go to `properties`), curated in chunks (missing GUIDs and
+timestamps assigned per batch, see `curate`), validated and appended to the
+output JSON array, so memory stays bounded whatever the size of the source
+(except for the GUIDs kept to reject duplicates, see `import_file`).
+Rows that cannot be imported are written to a JSON lines reject file with
+the reason instead of aborting the run.
+
+The module name is a keyword, import it with
+`importlib.import_module("genemede.import")`.
+
+Usage:
+    python -m genemede.import SOURCE OUTPUT [--mtype MTYPE] [--map COLUMN=TARGET ...]
+"""
+import argparse
+import copy
+import csv
+import json
+import os
+import tempfile
+import time
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from genemede import io
+from genemede.core import Entity, validate_gnmd_struct
+from genemede.curate import curate, invalid_guids
+from genemede.schema import get_registry
+
+CHUNK_SIZE = 1000
+# Keys of the legacy exports (see tests/fixtures/metadata_databases) that were renamed
+LEGACY_MAPPING = {"datetime": "modified_at", "resources": "links", "bids": "custom.bids"}
+# Where source columns without a mapping go: under properties, under custom, or nowhere
+UNMAPPED = ("properties", "custom", "drop")
+REJECT_SUFFIX = ".rejects.jsonl"
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import run."""
+
+    n_rows: int = 0
+    n_imported: int = 0
+    n_rejected: int = 0
+    seconds: float = 0.0
+    output: t.Optional[Path] = None
+    rejects: t.Optional[Path] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.n_rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.n_imported}/{self.n_rows} rows imported into {self.output}, {self.n_rejected} rejected"
+            f" ({self.seconds:.2f} s, {self.rows_per_second:.0f} rows/s)"
+        )
+
+
+def iter_rows(fpath: t.Union[str, Path], delimiter: t.Optional[str] = None) -> t.Iterator[t.Any]:
+    """
+    Stream the rows of a source file.
+
+    .csv and .tsv files (or any file when a delimiter is given) yield one dict
+    per line, empty cells being left out; other files are read as a JSON array
+    (see `io.iter_read`).
+    """
+    fpath = Path(fpath)
+    if delimiter is None:
+        delimiter = {".csv": ",", ".tsv": "\t"}.get(fpath.suffix.lower())
+    if delimiter is None:
+        yield from io.iter_read(fpath)
+        return
+    with open(fpath, "r", newline="") as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield {k: v for k, v in row.items() if k and v not in ("", None)}
+
+
+def check_mapping(mapping: t.Mapping[str, str]) -> None:
+    """
+    Raises:
+        ValueError: If a target is not an Entity field or a dotted path into one.
+    """
+    for column, target in mapping.items():
+        if target.split(".")[0] not in Entity.template:
+            raise ValueError(f"{column}={target} <- target is not an Entity field")
+
+
+def _set(item: dict, target: str, value: t.Any) -> None:
+    field, *path = target.split(".")
+    if not path:
+        if isinstance(value, dict):
+            # Copied, the source row is kept intact for the reject file
+            item[field] = {**item[field], **value} if isinstance(item[field], dict) else dict(value)
+        else:
+            item[field] = value
+        return
+    node = item[field] if isinstance(item[field], dict) else {}
+    item[field] = node
+    for k in path[:-1]:
+        node = node.setdefault(k, {})
+        if not isinstance(node, dict):
+            raise ValueError(f"{target} <- {k} is not a dict")
+    node[path[-1]] = value
+
+
+def map_row(
+    row: t.Any,
+    mapping: t.Mapping[str, str],
+    defaults: t.Optional[t.Mapping[str, t.Any]] = None,
+    unmapped: str = "properties",
+) -> dict:
+    """
+    Build an entity dict from a source row.
+
+    Args:
+        row (dict): The source row.
+        mapping (dict): {column: target}, a target being an Entity field
+            ("name") or a dotted path into one ("properties.age"). Columns
+            named after an Entity field map onto it implicitly.
+        defaults (dict, optional): {target: value} set before the row values, e.g. {"mtype": "subject"}.
+        unmapped (str, optional): One of UNMAPPED. Defaults to "properties".
+
+    Raises:
+        TypeError: If the row is not a dict.
+        ValueError: If a value cannot be set at its target.
+    """
+    if not isinstance(row, dict):
+        raise TypeError(f"row is a {type(row).__name__}, not a dict")
+    item = dict.fromkeys(Entity.template)
+    for target, value in copy.deepcopy(defaults or {}).items():
+        _set(item, target, value)
+    for column, value in row.items():
+        target = mapping.get(column)
+        if target is None:
+            if column in Entity.template:
+                target = column
+            elif unmapped == "drop":
+                continue
+            else:
+                target = f"{unmapped}.{column}"
+        _set(item, target, value)
+    return item
+
+
+class JsonArrayWriter(object):
+    """Write a JSON array one chunk at a time, atomically replacing fpath on close.
+
+    The output is byte for byte what `io.write_atomic` writes for the whole list.
+
+    Args:
+        fpath (str): The output file.
+        indent (int, optional): JSON indentation. Defaults to 4.
+    """
+
+    def __init__(self, fpath: t.Union[str, Path], indent: t.Optional[int] = 4):
+        self.fpath = Path(fpath)
+        self.indent = indent
+        self.n = 0
+        fd, self._tmp = tempfile.mkstemp(dir=self.fpath.parent, prefix=f".{self.fpath.name}.", suffix=".tmp")
+        self._f = os.fdopen(fd, "w")
+        self._f.write("[")
+
+    def write(self, items: t.Sequence[t.Any]) -> None:
+        if not items:
+            return
+        # Encode the chunk at once and strip its brackets
+        if self.indent is None:
+            self._f.write((", " if self.n else "") + json.dumps(items)[1:-1])
+        else:
+            self._f.write(("," if self.n else "") + json.dumps(items, indent=self.indent)[1:-2])
+        self.n += len(items)
+
+    def close(self) -> None:
+        self._f.write("\n]" if self.n and self.indent is not None else "]")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        os.chmod(self._tmp, io.new_file_mode())
+        os.replace(self._tmp, self.fpath)
+
+    def abort(self) -> None:
+        self._f.close()
+        Path(self._tmp).unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def import_file(
+    source: t.Union[str, Path],
+    output: t.Union[str, Path],
+    mapping: t.Optional[t.Mapping[str, str]] = None,
+    defaults: t.Optional[t.Mapping[str, t.Any]] = None,
+    unmapped: str = "properties",
+    rejects: t.Optional[t.Union[str, Path]] = None,
+    chunk_size: int = CHUNK_SIZE,
+    delimiter: t.Optional[str] = None,
+    check_properties: bool = False,
+    check_duplicates: bool = True,
+) -> ImportReport:
+    """
+    Import a CSV/TSV or JSON source into a new genemede file.
+
+    Args:
+        source (str): The source file, see `iter_rows`.
+        output (str): The genemede file to create.
+        mapping (dict, optional): {column: target}, see `map_row`. Defaults
+            to LEGACY_MAPPING for JSON sources.
+        defaults (dict, optional): {target: value} of every entity, e.g. {"mtype": "subject"}.
+        unmapped (str, optional): One of UNMAPPED. Defaults to "properties".
+        rejects (str, optional): JSON lines file of the rejected rows, as
+            {"row", "reason", "data"}. Defaults to <output>.rejects.jsonl,
+            only created if a row is rejected.
+        chunk_size (int, optional): Rows curated, validated and written at a time.
+        delimiter (str, optional): Force reading the source as a delimited table.
+        check_properties (bool, optional): Also reject rows whose property
+            values are not allowed by their mtype schema (see
+            `SchemaRegistry.validate`). Defaults to False.
+        check_duplicates (bool, optional): Reject rows whose GUID was already
+            imported. The imported GUIDs are kept in memory for that, about
+            100 bytes per row; disable it for constant memory when the source
+            GUIDs are known to be unique or are all generated. Defaults to True.
+
+    Raises:
+        FileExistsError: If the output already exists.
+        ValueError: If the mapping or unmapped are invalid.
+
+    Returns:
+        ImportReport: Row counts and throughput.
+    """
+    source, output = Path(source), Path(output)
+    if output.exists():
+        raise FileExistsError(f"{output} already exists")
+    if unmapped not in UNMAPPED:
+        raise ValueError(f"{unmapped} <- expected one of {UNMAPPED}")
+    if mapping is None:
+        is_table = delimiter is not None or source.suffix.lower() in (".csv", ".tsv")
+        mapping = {} if is_table else LEGACY_MAPPING
+    check_mapping(mapping)
+    check_mapping({target: target for target in defaults or {}})
+    rejects = Path(rejects) if rejects is not None else output.with_name(output.name + REJECT_SUFFIX)
+
+    report = ImportReport(output=output)
+    seen = set()
+    reject_file = None
+
+    def reject(row_number, reason, data):
+        nonlocal reject_file
+        if reject_file is None:
+            reject_file = open(rejects, "w")
+            report.rejects = rejects
+        reject_file.write(json.dumps({"row": row_number, "reason": reason, "data": data}, default=str) + "\n")
+        report.n_rejected += 1
+
+    def flush(chunk, writer):
+        items = [item for _, item, _ in chunk]
+        # Other rows may reference a source GUID that is not a UUID (e.g. legacy "1"),
+        # replacing it would break those references, only missing GUIDs are generated
+        guids = [item.get("guid") for item in items]
+        bad = {i: f"guid {guids[i]!r} <- not a GUID" for i in invalid_guids(guids) if guids[i] not in (None, "")}
+        # Batch GUIDs and timestamps, one shared timestamp per chunk
+        curate(items, fixes=("guids", "datetimes"))
+        for i in validate_gnmd_struct(items).bad_indices:
+            bad.setdefault(i, "keys do not match the Entity template")
+        if check_properties:
+            for issue in get_registry().validate(items):
+                bad.setdefault(issue.index, f"properties.{issue.key}={issue.value!r} {issue.message}")
+        good = []
+        for i, (n, item, row) in enumerate(chunk):
+            if i in bad:
+                reject(n, bad[i], row)
+            elif item["guid"] in seen:
+                reject(n, f"duplicate guid {item['guid']}", row)
+            else:
+                if check_duplicates:
+                    seen.add(item["guid"])
+                good.append(item)
+        writer.write(good)
+        report.n_imported += len(good)
+
+    t0 = time.perf_counter()
+    try:
+        with JsonArrayWriter(output) as writer:
+            chunk = []
+            for n, row in enumerate(iter_rows(source, delimiter=delimiter)):
+                report.n_rows += 1
+                try:
+                    chunk.append((n, map_row(row, mapping, defaults, unmapped), row))
+                except (TypeError, ValueError) as e:
+                    reject(n, str(e), row)
+                if len(chunk) >= chunk_size:
+                    flush(chunk, writer)
+                    chunk = []
+            flush(chunk, writer)
+    finally:
+        if reject_file is not None:
+            reject_file.close()
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="genemede.import", description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="csv, tsv or json file")
+    parser.add_argument("output", help="genemede file to create")
+    parser.add_argument("--mtype", help="mtype of the imported entities")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUMN=TARGET", help="e.g. age=properties.age")
+    parser.add_argument("--unmapped", choices=UNMAPPED, default="properties")
+    parser.add_argument("--rejects", help="reject file, defaults to OUTPUT.rejects.jsonl")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--delimiter", help="read the source as a table with this delimiter")
+    parser.add_argument("--check-properties", action="store_true", help="reject values not allowed by the mtype")
+    parser.add_argument(
+        "--no-duplicate-check", action="store_true", help="do not keep the GUIDs in memory to reject duplicates"
+    )
+    args = parser.parse_args(argv)
+    mapping = None
+    if args.map:
+        mapping = dict(m.split("=", 1) for m in args.map)
+    report = import_file(
+        args.source,
+        args.output,
+        mapping=mapping,
+        defaults={"mtype": args.mtype} if args.mtype else None,
+        unmapped=args.unmapped,
+        rejects=args.rejects,
+        chunk_size=args.chunk_size,
+        delimiter=args.delimiter,
+        check_properties=args.check_properties,
+        check_duplicates=not args.no_duplicate_check,
+    )
+    print(report)
+    if report.rejects is not None:
+        print(f"rejected rows: {report.rejects}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# @File: genemede/instrument.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 6:30:05 pm
+"""Timers and counters around the io, core and curate hot paths.
+
+Instrumentation is off by default and then costs a flag check per call.
+Switch it on for the whole process with the GENEMEDE_INSTRUMENT=1
+environment variable (GENEMEDE_TRACE=<file> also writes trace events at
+exit), or for a block of code:
+
+    with instrumented(trace="ingest.trace.json") as stats:
+        repo = Repository("data/")
+    print(stats)
+    stats.timers["io.read.decode"]  # [calls, seconds]
+    stats.counters["io.bytes_read"]
+
+Trace files use the Chrome trace event format (chrome://tracing, Perfetto).
+Work done in other processes (e.g. `find_gnmd_files(workers=...)`) is not
+recorded.
+"""
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+ENV_VAR = "GENEMEDE_INSTRUMENT"
+TRACE_ENV_VAR = "GENEMEDE_TRACE"
+
+enabled = False
+_trace = None  # list of trace events while tracing
+_lock = threading.Lock()
+
+
+class Stats(object):
+    """Accumulated timers ({name: [calls, seconds]}) and counters ({name: total})."""
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with _lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+
+    def add(self, name: str, n: int = 1) -> None:
+        with _lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self) -> None:
+        with _lock:
+            self.timers = {}
+            self.counters = {}
+
+    def snapshot(self) -> dict:
+        """A JSON serializable copy of the stats."""
+        with _lock:
+            return {
+                "timers": {k: {"calls": c, "seconds": s} for k, (c, s) in self.timers.items()},
+                "counters": dict(self.counters),
+            }
+
+    def __str__(self):
+        lines = [f"{'timer':<32}{'calls':>10}{'seconds':>12}"]
+        for name, (calls, seconds) in sorted(self.timers.items()):
+            lines.append(f"{name:<32}{calls:>10}{seconds:>12.4f}")
+        lines.append(f"{'counter':<32}{'total':>10}")
+        for name, total in sorted(self.counters.items()):
+            lines.append(f"{name:<32}{total:>10}")
+        return "\n".join(lines)
+
+
+STATS = Stats()
+
+
+class _Timer(object):
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        STATS.record(self.name, t1 - self.t0)
+        if _trace is not None:
+            _trace.append(
+                {
+                    "name": self.name,
+                    "ph": "X",
+                    "ts": self.t0 * 1e6,
+                    "dur": (t1 - self.t0) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+
+_NULL = contextlib.nullcontext()
+
+
+def timer(name: str):
+    """Context manager timing a stage, a shared no-op when disabled."""
+    if not enabled:
+        return _NULL
+    return _Timer(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a counter, if enabled."""
+    if enabled:
+        STATS.add(name, n)
+
+
+def timed(name: str) -> t.Callable:
+    """Decorator timing every call of a function, if enabled."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable(trace: bool = False) -> None:
+    global enabled, _trace
+    enabled = True
+    if trace and _trace is None:
+        _trace = []
+
+
+def disable() -> None:
+    global enabled, _trace
+    enabled = False
+    _trace = None
+
+
+def write_trace(fpath: t.Union[str, Path]) -> None:
+    """Write the trace events recorded so far, see `enable(trace=True)`."""
+    with open(fpath, "w") as f:
+        json.dump({"traceEvents": list(_trace or []), "displayTimeUnit": "ms"}, f)
+
+
+@contextlib.contextmanager
+def instrumented(
+    reset: bool = True,
+    profile: t.Optional[t.Union[str, Path]] = None,
+    trace: t.Optional[t.Union[str, Path]] = None,
+) -> t.Iterator[Stats]:
+    """
+    Enable the instrumentation within a block, restoring the previous state after it.
+
+    Args:
+        reset (bool, optional): Start from empty stats. Defaults to True.
+        profile (str, optional): Also run cProfile and dump its stats to this
+            file (see `pstats`).
+        trace (str, optional): Also write the trace events of the block to this file.
+
+    Yields:
+        Stats: The live stats object.
+    """
+    global enabled, _trace
+    previous = enabled, _trace
+    if reset:
+        STATS.reset()
+    enabled = True
+    if trace is not None:
+        _trace = []
+    profiler = cProfile.Profile() if profile is not None else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield STATS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(profile))
+        if trace is not None:
+            write_trace(trace)
+        enabled, _trace = previous
+
+
+if os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes", "on"):
+    enable(trace=bool(os.environ.get(TRACE_ENV_VAR)))
+    if os.environ.get(TRACE_ENV_VAR):
+        atexit.register(write_trace, os.environ[TRACE_ENV_VAR])
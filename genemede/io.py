@@ -5,28 +5,168 @@
 
 # Implement generic CRUD functions for *.gnmd files
 
+import gzip
 import json
+import os
+import re
 import shutil
+import sys
+import tempfile
 import typing as t
 from datetime import datetime
+from io import TextIOWrapper
 from pathlib import Path
 
+from genemede import instrument
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # TODO: Consider adding a .gnmd folder to user home directory to store genemede files and backups
 
+# Number of _bak_ files kept per file by update(), None keeps them all
+BACKUP_RETENTION = 10
+# ioctl request to clone a file's extents (copy-on-write) on btrfs/xfs/...
+FICLONE = 0x40049409
+
+# Storage encodings, zstd and binary need the optional zstandard and msgpack packages
+ENCODINGS = ("pretty", "compact", "gzip", "zstd", "binary")
+DEFAULT_ENCODING = "pretty"
+SUFFIXES = {"gzip": ".gnmd.gz", "zstd": ".gnmd.zst"}
+# Names of the files looked for in folders, whatever their encoding (see candidate_files)
+FILE_SUFFIXES = (".json", ".gnmd", *SUFFIXES.values())
+# The timestamp `backup` inserts in the name of a backup
+BACKUP_TS_FORMAT = "%Y-%m-%dT%H_%M_%S.%f"
+BACKUP_RE = re.compile(r"_bak_\d{4}-\d\d-\d\dT\d\d_\d\d_\d\d\.\d{6}")
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+BINARY_MAGIC = b"GNMD\x00MP1"
+# Bytes read by encoding_of to tell pretty from compact JSON
+HEAD_SIZE = 1024
+# JSON strings, the closing quote may lie past the head, and the whitespace allowed between tokens
+JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"?', re.DOTALL)
+JSON_SPACE = re.compile(rb"[ \t\n\r]")
+
+
+def _require(module, name: str, encoding: str):
+    if module is None:
+        raise ImportError(f"{encoding} <- encoding needs the optional {name} package")
+    return module
+
+
+def encode(data: t.Any, encoding: str = DEFAULT_ENCODING) -> bytes:
+    """
+    Serialize data in one of the storage ENCODINGS.
+
+    pretty is the historical indented JSON, compact drops all the whitespace,
+    gzip and zstd compress compact JSON and binary is a msgpack payload behind
+    a genemede header.
+
+    Raises:
+        ValueError: If the encoding is unknown.
+        ImportError: If the encoding needs a package that is not installed.
+    """
+    if encoding == "pretty":
+        return json.dumps(data, indent=4).encode()
+    if encoding not in ENCODINGS:
+        raise ValueError(f"{encoding} <- unknown encoding, use one of {ENCODINGS}")
+    if encoding == "binary":
+        return BINARY_MAGIC + _require(msgpack, "msgpack", encoding).packb(data)
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    if encoding == "gzip":
+        # mtime=0 so the same data always gives the same bytes (see catalog hashes)
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        return _require(zstandard, "zstandard", encoding).ZstdCompressor().compress(raw)
+    return raw
+
+
+def detect(head: bytes) -> str:
+    """Return the encoding of a file from its first bytes."""
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    if head.startswith(BINARY_MAGIC):
+        return "binary"
+    # encode writes compact JSON without any whitespace out of strings, any
+    # other JSON (pretty, or foreign one line JSON) is left pretty
+    return "pretty" if JSON_SPACE.search(JSON_STRING.sub(b"", head)) else "compact"
+
+
+def decode(raw: bytes) -> t.Any:
+    """Deserialize the content of a file in any of the storage ENCODINGS."""
+    encoding = detect(raw[:16])
+    if encoding == "binary":
+        return _require(msgpack, "msgpack", encoding).unpackb(raw[len(BINARY_MAGIC):])
+    if encoding == "gzip":
+        raw = gzip.decompress(raw)
+    elif encoding == "zstd":
+        raw = _require(zstandard, "zstandard", encoding).ZstdDecompressor().decompressobj().decompress(raw)
+    return json.loads(raw)
+
+
+def encoding_of(fpath: t.Union[str, Path]) -> str:
+    """Return the encoding of an existing file."""
+    with open(fpath, "rb") as f:
+        return detect(f.read(HEAD_SIZE))
+
+
+def is_backup(fpath: t.Union[str, Path]) -> bool:
+    """Whether fpath is named like a backup made by `backup`."""
+    return BACKUP_RE.search(Path(fpath).name) is not None
+
+
+def candidate_files(root: t.Union[str, Path]) -> t.List[Path]:
+    """
+    Return the files under root with one of the FILE_SUFFIXES, sorted, in a single walk of the tree.
 
-def create(fpath: t.Union[str, Path], data: list[dict]) -> None:
+    Backups (see `is_backup`) are valid genemede files too, but hold stale
+    copies of the entities: they are left out.
+    """
+    return sorted(
+        f for f in Path(root).rglob("*") if f.name.endswith(FILE_SUFFIXES) and not is_backup(f) and f.is_file()
+    )
+
+
+def with_encoding_suffix(fpath: t.Union[str, Path], encoding: str = DEFAULT_ENCODING) -> Path:
+    """Return fpath with the suffix of the encoding, e.g. x.gnmd.gz for gzip."""
+    fpath = Path(fpath)
+    suffix = SUFFIXES.get(encoding, ".gnmd")
+    if fpath.name.endswith(suffix):
+        return fpath
+    name = fpath.name
+    for s in list(SUFFIXES.values()) + [".gnmd"]:
+        if name.endswith(s):
+            name = name[: -len(s)]
+            break
+    else:
+        name = fpath.with_suffix("").name
+    return fpath.with_name(name + suffix)
+
+
+@instrument.timed("io.create")
+def create(fpath: t.Union[str, Path], data: list[dict], encoding: str = DEFAULT_ENCODING) -> Path:
     """
     Creates a new file with the given file path and writes the given data to it in JSON format.
 
     Args:
         fpath (Union[str, Path]): The path of the file to create.
         data (list[dict]): The data to write to the file in JSON format.
+        encoding (str, optional): One of ENCODINGS. gzip and zstd files get a
+            .gnmd.gz / .gnmd.zst suffix. Defaults to "pretty".
 
     Raises:
         FileExistsError: If the file already exists at the given path.
 
     Returns:
-        None
+        Path: The path of the created file.
     """
     fpath = Path(fpath)
     # If fpath is folder, ask for name
@@ -34,23 +174,97 @@ def create(fpath: t.Union[str, Path], data: list[dict]) -> None:
         print(f"Warning: {fpath} is folder -> creating a new file with same name")
         fpath.joinpath(fpath.name + ".gnmd").mkdir(parents=True, exist_ok=True)
 
-    # If fpath extension is not 'gnmd', change it to gnmd
-    if fpath.suffix != ".gnmd":
-        print(f"Warning: {fpath} extension is not '.gnmd' -> changing extension to '.gnmd'")
-        fpath = fpath.with_suffix(".gnmd")
+    # If fpath extension is not 'gnmd' (or 'gnmd.gz'...), change it
+    target = with_encoding_suffix(fpath, encoding)
+    if target != fpath:
+        print(f"Warning: {fpath} extension is not '{SUFFIXES.get(encoding, '.gnmd')}' -> changing it")
+        fpath = target
 
     if fpath.exists():
         raise FileExistsError(f"{fpath} already exists")
         return
 
-    with open(fpath, "w") as f:
-        json.dump(data, f, indent=4)
+    write_atomic(fpath, data, encoding=encoding)
+    return fpath
+
+
+def write_atomic(
+    fpath: t.Union[str, Path], data: t.Any, indent: t.Optional[int] = 4, encoding: t.Optional[str] = None
+) -> None:
+    """
+    Write data as JSON to fpath atomically.
+
+    The data is written to a temporary file in the same directory, flushed to
+    disk and renamed over fpath, so concurrent readers always see either the
+    old or the new content and never a missing or partially written file.
+
+    Args:
+        fpath (Union[str, Path]): The path of the file to write.
+        data: The data to write to the file in JSON format.
+        indent (int, optional): JSON indentation. Defaults to 4.
+        encoding (str, optional): One of ENCODINGS, overrides indent.
+
+    Returns:
+        None
+    """
+    fpath = Path(fpath)
+    with instrument.timer("io.write.encode"):
+        payload = json.dumps(data, indent=indent).encode() if encoding is None else encode(data, encoding)
+    instrument.count("io.bytes_written", len(payload))
+    with instrument.timer("io.write.disk"):
+        fd, tmp = tempfile.mkstemp(dir=fpath.parent, prefix=f".{fpath.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            if fpath.exists():
+                shutil.copymode(fpath, tmp)
+            else:
+                os.chmod(tmp, new_file_mode())
+            os.replace(tmp, fpath)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        fsync_dir(fpath.parent)
+
+
+def _read_umask() -> int:
+    # os.umask can only read the mask by setting it, for every thread at once
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import, while no other thread writes files
+UMASK = _read_umask()
+
+
+def new_file_mode() -> int:
+    """Permission bits open() gives a new file, 0o666 less the process umask (as read at import)."""
+    return 0o666 & ~UMASK
+
+
+def fsync_dir(path: Path) -> None:
+    """Persist a rename by syncing its directory, where the platform allows it."""
+    if sys.platform == "win32":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def read(fpath: t.Union[str, Path]) -> ...:
     """
     Read a JSON file and return its contents as a Python object.
 
+    The encoding (see ENCODINGS) is detected from the content, so pretty,
+    compact, compressed and binary files all load the same way.
+
     Args:
         fpath: A string or Path object representing the path of the file to read.
 
@@ -62,51 +276,222 @@ def read(fpath: t.Union[str, Path]) -> ...:
         JSONDecodeError: If the file does not contain valid JSON data.
         UnicodeDecodeError: If the file is not encoded in UTF-8.
     """
-    with open(fpath, "r") as f:
-        return json.load(f)
+    with instrument.timer("io.read.disk"):
+        with open(fpath, "rb") as f:
+            raw = f.read()
+    instrument.count("io.bytes_read", len(raw))
+    with instrument.timer("io.read.decode"):
+        return decode(raw)
+
+
+def _open_text(fpath: t.Union[str, Path], encoding: str) -> t.IO[str]:
+    """Open a JSON file of any text based encoding as a decompressing text stream."""
+    if encoding == "gzip":
+        return gzip.open(fpath, "rt")
+    if encoding == "zstd":
+        dctx = _require(zstandard, "zstandard", encoding).ZstdDecompressor()
+        return TextIOWrapper(dctx.stream_reader(open(fpath, "rb"), closefd=True))
+    return open(fpath, "r")
 
 
-def backup(fpath: t.Union[str, Path]) -> None:
-    """Backup fpath by copying it and appending _bak_datetime
+def iter_read(fpath: t.Union[str, Path], chunk_size: int = 1 << 16) -> t.Iterator[t.Any]:
+    """
+    Lazily iterate over the elements of a JSON file whose top level is an array.
 
-    This function creates a backup of a file by copying it and appending the
-    current date and time to its name. The backup file is saved in the same
-    directory as the original file.
+    The file is read in chunks and each element is decoded as soon as it is
+    complete, so memory is bounded by the chunk size plus the largest element
+    instead of the whole object graph. Compressed files are decompressed on the
+    fly, binary files cannot be streamed and are decoded at once.
+
+    Args:
+        fpath: A string or Path object representing the path of the file to read.
+        chunk_size (int, optional): Number of characters read at a time. Defaults to 64k.
+
+    Yields:
+        The Python object of each top level array element, in file order.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        JSONDecodeError: If the file does not contain a valid JSON array.
+    """
+    encoding = encoding_of(fpath)
+    instrument.count("io.files_streamed")
+    if encoding == "binary":
+        yield from read(fpath)
+        return
+    decoder = json.JSONDecoder()
+    with _open_text(fpath, encoding) as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill(min_size=chunk_size):
+            nonlocal buf, pos, eof
+            # Drop what was already consumed before growing the buffer
+            buf = buf[pos:]
+            pos = 0
+            chunk = f.read(max(min_size, chunk_size))
+            if not chunk:
+                eof = True
+            buf += chunk
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\n\r":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "[":
+            raise json.JSONDecodeError("Expecting a top level array", buf, pos)
+        pos += 1
+        skip_ws()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        while True:
+            skip_ws()
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A value touching the end of the buffer (e.g. a number) may be truncated
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                # Grow geometrically so large elements are not re-decoded quadratically
+                fill(len(buf) - pos)
+                continue
+            yield item
+            pos = end
+            skip_ws()
+            if pos >= len(buf):
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            if buf[pos] == "]":
+                return
+            if buf[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+
+
+@instrument.timed("io.backup")
+def backup(fpath: t.Union[str, Path]) -> Path:
+    """Backup fpath by linking it to a name with _bak_datetime appended
+
+    This function creates a backup of a file by hard linking (or reflinking,
+    or as a last resort copying) it to a new name with the current date and
+    time appended. The backup file is saved in the same directory as the
+    original file.
+
+    A hard link costs no copy and is safe because genemede never modifies a
+    file in place: `update` writes a new file and renames it over the old one,
+    leaving the linked backup with the previous content.
 
     Args:
         fpath (str or Path): The path to the file to be backed up.
 
     Returns:
-        None
+        Path: The path of the backup file.
     """
     fpath = Path(fpath)
     fpath_bak = fpath.parent.joinpath(
-        fpath.stem + "_bak_" + datetime.now().strftime("%Y-%m-%dT%H_%M_%S.%f") + fpath.suffix
+        fpath.stem + "_bak_" + datetime.now().strftime(BACKUP_TS_FORMAT) + fpath.suffix
     )
     fpath_bak.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(fpath, fpath_bak)
+    _clone(fpath, fpath_bak)
+    return fpath_bak
+
+
+def _clone(src: Path, dst: Path) -> None:
+    """Hard link src to dst, falling back to a reflink and then to a copy."""
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fs, open(dst, "wb") as fd:
+                fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            dst.unlink(missing_ok=True)
+    shutil.copy2(src, dst)
+
+
+def list_backups(fpath: t.Union[str, Path]) -> t.List[Path]:
+    """Return the backups of fpath, oldest first."""
+    fpath = Path(fpath)
+    # The timestamp format sorts chronologically
+    return sorted(fpath.parent.glob(f"{fpath.stem}_bak_*{fpath.suffix}"))
 
 
-def update(fpath: t.Union[Path, str], data):
+def prune_backups(fpath: t.Union[str, Path], keep: t.Optional[int] = BACKUP_RETENTION) -> t.List[Path]:
+    """
+    Delete the oldest backups of fpath, keeping the `keep` most recent ones.
+
+    Args:
+        fpath (Union[str, Path]): The path of the backed up file.
+        keep (int, optional): Number of backups to keep, None keeps all of them.
+            Defaults to BACKUP_RETENTION.
+
+    Returns:
+        list: The deleted backup paths.
+    """
+    if keep is None:
+        return []
+    backups = list_backups(fpath)
+    removed = backups[: max(len(backups) - keep, 0)]
+    for f in removed:
+        f.unlink()
+    return removed
+
+
+def update(
+    fpath: t.Union[Path, str],
+    data,
+    keep_backups: t.Optional[int] = BACKUP_RETENTION,
+    encoding: t.Optional[str] = None,
+) -> Path:
     """
     Update the file at the given path with the given data, creating a backup
     first.
 
+    The file is replaced atomically (see `write_atomic`) so it never stops
+    existing, and old backups beyond `keep_backups` are pruned.
+
     Args:
         fpath: the path of the file to update
         data: the data to write to the file
+        keep_backups (int, optional): Number of backups to keep, None keeps
+            all of them. Defaults to BACKUP_RETENTION.
+        encoding (str, optional): One of ENCODINGS. Defaults to the
+            encoding of the current file.
 
     Raises:
         FileNotFoundError: if the file at the given path does not exist
 
     Returns:
-        None
+        Path: The path of the backup of the previous content.
     """
+    fpath = Path(fpath)
     if not fpath.exists():
         raise FileNotFoundError(f"{fpath} does not exist")
         return
-    delete(fpath)
-    create(fpath, data)
+    if encoding is None:
+        encoding = encoding_of(fpath)
+    fpath_bak = backup(fpath)
+    write_atomic(fpath, data, encoding=encoding)
+    prune_backups(fpath, keep=keep_backups)
+    return fpath_bak
 
 
 def delete(fpath: t.Union[str, Path]) -> None:
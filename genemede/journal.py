@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# @File: genemede/journal.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 4:02:55 pm
+"""Append-only change log of entity edits stored next to a genemede file.
+
+Each line of `<file>.journal` is a JSON record of one edit:
+
+    {"seq": 3, "ts": "2026-10-18T16:02:55.123456", "op": "update", "guid": "...", "data": {"name": "new"}}
+
+where `op` is "add" (data is the whole entity), "update" (data holds only the
+changed fields) or "delete" (no data). Editing an entity therefore costs
+O(change) instead of rewriting and backing up the whole file. Compaction
+folds the journal into the base file; the replaced base is kept as a (hard
+linked) backup together with the journal that was applied on top of it, so
+`replay(until=...)` can rebuild any state within the backup retention.
+"""
+import json
+import os
+import typing as t
+from datetime import datetime
+from pathlib import Path
+
+from genemede import io
+
+JOURNAL_SUFFIX = ".journal"
+# Compact the journal into the base file once it holds this many records
+COMPACT_EVERY = 1000
+BACKUP_TS_FORMAT = io.BACKUP_TS_FORMAT
+
+
+def journal_path(fpath: t.Union[str, Path]) -> Path:
+    fpath = Path(fpath)
+    return fpath.with_name(fpath.name + JOURNAL_SUFFIX)
+
+
+def apply(state: dict, record: dict) -> None:
+    """
+    Apply one journal record to a {guid: entity dict} state, in place.
+
+    Raises:
+        KeyError: If an update or delete refers to a GUID not in the state,
+            i.e. the journal does not belong to this base.
+        ValueError: If the operation is unknown.
+    """
+    op, guid = record["op"], record["guid"]
+    if op not in ("add", "update", "delete"):
+        raise ValueError(f"{op} <- unknown journal operation")
+    if op != "add" and guid not in state:
+        raise KeyError(f"{guid} <- {op} of an entity not in the journal base (record {record.get('seq')})")
+    if op == "add":
+        state[guid] = dict(record["data"])
+    elif op == "update":
+        state[guid] = {**state[guid], **record["data"]}
+    else:
+        del state[guid]
+
+
+def read_records(jpath: t.Union[str, Path]) -> t.Iterator[dict]:
+    """Iterate over the records of a journal file, ignoring a torn last line."""
+    jpath = Path(jpath)
+    if not jpath.exists():
+        return
+    with open(jpath, "r") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Interrupted append, the record was never acknowledged
+                return
+            yield json.loads(line)
+
+
+class Journal(object):
+    """Journal of the edits made to the genemede file at fpath.
+
+    Args:
+        fpath (str): Path of the base json/gnmd file.
+    """
+
+    def __init__(self, fpath: t.Union[str, Path]):
+        self.fpath = Path(fpath)
+        self.path = journal_path(self.fpath)
+        self._n = None
+        self._seq = None
+
+    def _scan(self):
+        n, seq = 0, 0
+        for r in read_records(self.path):
+            n, seq = n + 1, r["seq"]
+        self._n, self._seq = n, seq
+
+    def __len__(self):
+        if self._n is None:
+            self._scan()
+        return self._n
+
+    def records(self) -> t.Iterator[dict]:
+        return read_records(self.path)
+
+    def append(self, op: str, guid: str, data: t.Optional[dict] = None) -> dict:
+        return self.extend([(op, guid, data)])[0]
+
+    def extend(self, ops: t.Iterable[t.Tuple[str, str, t.Optional[dict]]]) -> t.List[dict]:
+        """
+        Durably append (op, guid, data) edits to the journal.
+
+        Returns:
+            list: The written records.
+        """
+        if self._n is None:
+            self._scan()
+        ts = datetime.now().isoformat()
+        records = []
+        for op, guid, data in ops:
+            if op not in ("add", "update", "delete"):
+                raise ValueError(f"{op} <- unknown journal operation")
+            self._seq += 1
+            records.append({"seq": self._seq, "ts": ts, "op": op, "guid": guid, "data": data})
+        if not records:
+            return records
+        self._drop_torn_tail()
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._n += len(records)
+        return records
+
+    def _drop_torn_tail(self):
+        """Truncate an interrupted last record so that new ones start on a fresh line."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Torn records are short, only the tail needs reading
+            pos = size
+            while pos > 0:
+                step = min(pos, 1 << 16)
+                f.seek(pos - step)
+                nl = f.read(step).rfind(b"\n")
+                if nl >= 0:
+                    f.truncate(pos - step + nl + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+
+    def segments(self) -> t.List[t.Tuple[Path, Path, t.Optional[datetime]]]:
+        """
+        History segments, oldest first, as (base, journal, end) tuples.
+
+        A segment is a base file and the journal applied on top of it, `end`
+        being the time it was compacted (None for the current segment).
+        """
+        segs = []
+        for bak in io.list_backups(self.fpath):
+            if journal_path(bak).exists():
+                ts = bak.stem[len(self.fpath.stem) + len("_bak_"):]
+                segs.append((bak, journal_path(bak), datetime.strptime(ts, BACKUP_TS_FORMAT)))
+        segs.append((self.fpath, self.path, None))
+        return segs
+
+    def replay(
+        self,
+        base: t.Optional[list] = None,
+        until: t.Optional[t.Union[str, datetime]] = None,
+    ) -> t.List[dict]:
+        """
+        Rebuild the entities by applying the journal to its base file.
+
+        Args:
+            base (list, optional): Already parsed content of the base file.
+                Defaults to reading it.
+            until (str or datetime, optional): Rebuild the state as of this
+                time instead of the current one, possibly from an older
+                segment (see `segments`).
+
+        Returns:
+            list[dict]: The entities in file order.
+        """
+        if until is None:
+            records = self.records()
+        else:
+            until = datetime.fromisoformat(until) if isinstance(until, str) else until
+            fbase, jpath, _ = next(s for s in self.segments() if s[2] is None or s[2] > until)
+            if fbase != self.fpath:
+                base = None
+            if base is None and fbase.exists():
+                base = io.read(fbase)
+            records = (r for r in read_records(jpath) if datetime.fromisoformat(r["ts"]) <= until)
+        if base is None:
+            base = io.read(self.fpath) if self.fpath.exists() else []
+        # Entities without a GUID cannot be referred to by a record, they are
+        # keyed by position so that they do not collapse into one
+        state = {d.get("guid") or i: d for i, d in enumerate(base)}
+        for r in records:
+            apply(state, r)
+        return list(state.values())
+
+    def compact(self, data: t.Optional[list] = None, keep_backups: t.Optional[int] = io.BACKUP_RETENTION) -> list:
+        """
+        Fold the journal into the base file.
+
+        The old base is backed up (hard linked) and the journal is moved next
+        to that backup so the history stays replayable.
+
+        Args:
+            data (list, optional): The current state if already known, e.g.
+                from a loaded EntityFile. Defaults to replaying the journal.
+            keep_backups (int, optional): Backup retention, see `io.update`.
+
+        Returns:
+            list: The compacted data.
+        """
+        if data is None:
+            data = self.replay()
+        if not self.fpath.exists():
+            io.write_atomic(self.fpath, data)
+        else:
+            bak = io.update(self.fpath, data, keep_backups=None)
+            self.detach(bak)
+            io.prune_backups(self.fpath, keep=keep_backups)
+            # Journals whose base backup was pruned cannot be replayed anymore
+            for j in self.fpath.parent.glob(f"{self.fpath.stem}_bak_*{self.fpath.suffix}{JOURNAL_SUFFIX}"):
+                if not j.with_suffix("").exists():
+                    j.unlink()
+        self.detach()
+        return data
+
+    def detach(self, bak: t.Optional[Path] = None) -> None:
+        """
+        Retire the journal once the base file was rewritten with its edits or without them.
+
+        Args:
+            bak (Path, optional): Backup of the base the journal applies to,
+                the journal is moved next to it so the history stays
+                replayable. Defaults to removing the journal.
+        """
+        if bak is not None and self.path.exists():
+            os.replace(self.path, journal_path(bak))
+        self.path.unlink(missing_ok=True)
+        self._n = 0
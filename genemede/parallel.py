@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# @File: genemede/parallel.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 2:20:13 pm
+import os
+import typing as t
+
+
+def n_workers(workers: t.Optional[int]) -> int:
+    """Number of processes to use: None -> 1 (serial), -1 -> all cores."""
+    if workers is None:
+        return 1
+    if workers < 0:
+        return os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def pmap(
+    func: t.Callable,
+    items: t.Iterable,
+    workers: t.Optional[int] = None,
+    chunksize: t.Optional[int] = None,
+) -> list:
+    """
+    Apply func to every item, optionally in a pool of processes.
+
+    Results are returned in the same order as items, exactly as the serial
+    path would return them.
+
+    Args:
+        func (Callable): A picklable (module level) function of one argument.
+        items (Iterable): The arguments.
+        workers (int, optional): Number of processes, None runs serially in
+            this process and -1 uses all cores. Defaults to None.
+        chunksize (int, optional): Items sent to a worker at a time. Defaults
+            to splitting the items in ~4 chunks per worker.
+
+    Returns:
+        list: [func(item) for item in items]
+    """
+    items = list(items)
+    workers = min(n_workers(workers), len(items))
+    if workers <= 1:
+        return [func(x) for x in items]
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    # Imported here, multiprocessing is slow to import and seldom needed
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(func, items, chunksize=chunksize))
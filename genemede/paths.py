@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# @File: genemede/paths.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 6:10:27 pm
+"""Compiled accessors for the dotted entity paths used in mappings, e.g. "*properties.institute"."""
+import functools
+import typing as t
+
+# Returned by accessors when the path does not exist in an entity
+MISSING = type("Missing", (), {"__repr__": lambda self: "MISSING", "__bool__": lambda self: False})()
+
+
+def split_path(path: str) -> t.Tuple[str, ...]:
+    """"*properties.institute" -> ("properties", "institute")"""
+    return tuple(path[1:].split(".") if path.startswith("*") else path.split("."))
+
+
+@functools.lru_cache(maxsize=None)
+def compile_path(path: str) -> t.Callable[[t.Any], t.Any]:
+    """
+    Compile a dotted path into an accessor function, parsed once and cached.
+
+    The leading "*" marking a path in the mapping syntax is optional. The
+    accessor works on dicts and Entities alike and returns MISSING when any
+    key along the path does not exist.
+
+    Args:
+        path (str): e.g. "*properties.institute" or "properties.sex".
+
+    Returns:
+        Callable: accessor(entity) -> value or MISSING
+    """
+    keys = split_path(path)
+    if len(keys) == 1:
+        (key,) = keys
+
+        def get(obj):
+            try:
+                return obj[key]
+            except (KeyError, IndexError, TypeError):
+                return MISSING
+
+    else:
+
+        def get(obj):
+            try:
+                for k in keys:
+                    obj = obj[k]
+            except (KeyError, IndexError, TypeError):
+                return MISSING
+            return obj
+
+    get.__qualname__ = get.__name__ = f"get[{path}]"
+    return get
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# @File: genemede/query.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 8:40:12 pm
+"""Predicates, secondary indexes and a small query planner over entities.
+
+Predicates address entity values by dotted path ("mtype", "tags",
+"properties.sex"). When the value at a path is a list (e.g. tags) a predicate
+matches if any of its items matches.
+
+    ef.create_index("mtype")
+    ef.query(eq("mtype", "subject"), isin("properties.sex", ["male", "other"]), between("properties.age", 18, 30))
+
+Indexed predicates are answered from the indexes, starting from the most
+selective one, the remaining ones are checked on the candidates only. Without
+any usable index the query falls back to a scan.
+"""
+import abc
+import bisect
+import numbers
+import typing as t
+
+from genemede.paths import MISSING, compile_path
+
+
+def _items(value) -> tuple:
+    if value is MISSING:
+        return ()
+    return tuple(value) if isinstance(value, list) else (value,)
+
+
+def _kind(value) -> t.Optional[type]:
+    """Comparable family of a value for range lookups, None if not orderable."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, numbers.Real):
+        return numbers.Real
+    if isinstance(value, str):
+        return str
+    return None
+
+
+class Predicate(abc.ABC):
+    """Base predicate on the value at `path`, see `eq`, `isin` and `between`."""
+
+    op = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self.get = compile_path(path)
+
+    @abc.abstractmethod
+    def test(self, value) -> bool:
+        """Whether a single value (a list item for list values) matches."""
+
+    def __call__(self, entity) -> bool:
+        return any(self.test(v) for v in _items(self.get(entity)))
+
+    @abc.abstractmethod
+    def lookup(self, index: "Index") -> t.Set[str]:
+        """The GUIDs of the entities the index says match."""
+
+    def __repr__(self):
+        return f"{self.op}({self.path!r}, {self._args()})"
+
+
+class Eq(Predicate):
+    op = "eq"
+
+    def __init__(self, path: str, value):
+        super().__init__(path)
+        self.value = value
+
+    def test(self, value) -> bool:
+        return value == self.value
+
+    def lookup(self, index):
+        try:
+            return index.values.get(self.value, set())
+        except TypeError:
+            return set()  # unhashable values are never indexed
+
+    def _args(self):
+        return repr(self.value)
+
+
+class IsIn(Predicate):
+    op = "isin"
+
+    def __init__(self, path: str, values: t.Iterable):
+        super().__init__(path)
+        self.values = list(values)
+        try:
+            self._set = frozenset(self.values)
+        except TypeError:
+            self._set = None
+
+    def test(self, value) -> bool:
+        if self._set is not None:
+            try:
+                return value in self._set
+            except TypeError:
+                return False
+        return value in self.values
+
+    def lookup(self, index):
+        out = set()
+        for v in self.values:
+            try:
+                out |= index.values.get(v, set())
+            except TypeError:
+                continue
+        return out
+
+    def _args(self):
+        return repr(self.values)
+
+
+class Between(Predicate):
+    op = "between"
+
+    def __init__(self, path: str, lo=None, hi=None, inclusive: bool = True):
+        super().__init__(path)
+        if lo is None and hi is None:
+            raise ValueError("between() needs at least one of lo and hi")
+        self.lo, self.hi, self.inclusive = lo, hi, inclusive
+        self.kind = _kind(lo if lo is not None else hi)
+        if self.kind is None:
+            raise TypeError(f"{lo!r}, {hi!r} <- ranges need numbers or strings")
+
+    def test(self, value) -> bool:
+        if _kind(value) is not self.kind:
+            return False
+        if self.inclusive:
+            return (self.lo is None or value >= self.lo) and (self.hi is None or value <= self.hi)
+        return (self.lo is None or value > self.lo) and (self.hi is None or value < self.hi)
+
+    def lookup(self, index):
+        keys = index.sorted_keys(self.kind)
+        if self.lo is None:
+            start = 0
+        else:
+            start = (bisect.bisect_left if self.inclusive else bisect.bisect_right)(keys, self.lo)
+        if self.hi is None:
+            stop = len(keys)
+        else:
+            stop = (bisect.bisect_right if self.inclusive else bisect.bisect_left)(keys, self.hi)
+        out = set()
+        for k in keys[start:stop]:
+            out |= index.values[k]
+        return out
+
+    def _args(self):
+        return f"{self.lo!r}, {self.hi!r}"
+
+
+def eq(path: str, value) -> Eq:
+    """Value at path equals value."""
+    return Eq(path, value)
+
+
+def isin(path: str, values: t.Iterable) -> IsIn:
+    """Value at path is one of values."""
+    return IsIn(path, values)
+
+
+def between(path: str, lo=None, hi=None, inclusive: bool = True) -> Between:
+    """lo <= value at path <= hi, either bound may be None (open)."""
+    return Between(path, lo, hi, inclusive)
+
+
+class Index(object):
+    """Secondary index of the GUIDs of entities by the value(s) at `path`.
+
+    Args:
+        path (str): Dotted path of the indexed value, e.g. "properties.sex".
+    """
+
+    def __init__(self, path: str, entities: t.Iterable = ()):
+        self.path = path
+        self.get = compile_path(path)
+        self.values = {}  # value -> set of guids
+        self._keys_of = {}  # guid -> indexed values, to remove without the old entity
+        self._sorted = {}
+        for e in entities:
+            self.add(e)
+
+    def add(self, entity) -> None:
+        if entity.guid in self._keys_of:
+            self.remove(entity.guid)
+        keys = []
+        for v in _items(self.get(entity)):
+            try:
+                self.values.setdefault(v, set()).add(entity.guid)
+            except TypeError:
+                continue  # unhashable values (dicts) can only be scanned
+            keys.append(v)
+        self._keys_of[entity.guid] = keys
+        self._sorted = {}
+
+    def remove(self, guid: str) -> None:
+        for v in self._keys_of.pop(guid, ()):
+            guids = self.values[v]
+            guids.discard(guid)
+            if not guids:
+                del self.values[v]
+        self._sorted = {}
+
+    def update(self, entity) -> None:
+        self.remove(entity.guid)
+        self.add(entity)
+
+    def sorted_keys(self, kind: type) -> list:
+        """Indexed values of one comparable kind, sorted, cached until the next change."""
+        keys = self._sorted.get(kind)
+        if keys is None:
+            keys = self._sorted[kind] = sorted(k for k in self.values if _kind(k) is kind)
+        return keys
+
+    def __len__(self):
+        return len(self._keys_of)
+
+    def __repr__(self):
+        return f"Index({self.path!r}, {len(self.values)} values)"
+
+
+def plan(predicates: t.Sequence[Predicate], indexes: t.Dict[str, Index]) -> t.Tuple[list, list]:
+    """
+    Split predicates into the ones answered by an index and the ones to check.
+
+    Returns:
+        tuple: ([(predicate, candidate guids)] most selective first, [remaining predicates])
+    """
+    indexed, rest = [], []
+    for p in predicates:
+        index = indexes.get(p.path)
+        if index is None:
+            rest.append(p)
+        else:
+            indexed.append((p, p.lookup(index)))
+    indexed.sort(key=lambda pc: len(pc[1]))
+    return indexed, rest
+
+
+def run(
+    predicates: t.Sequence[Predicate],
+    entities: t.Iterable,
+    indexes: t.Optional[t.Dict[str, Index]] = None,
+    by_guid: t.Optional[t.Mapping] = None,
+    order: t.Optional[t.Mapping[str, int]] = None,
+) -> list:
+    """
+    Evaluate the conjunction of predicates, using the indexes when possible.
+
+    Args:
+        predicates (Sequence[Predicate]): All must match.
+        entities (Iterable): The entities to scan when no index applies.
+        indexes (dict, optional): {path: Index} over the same entities.
+        by_guid (Mapping, optional): guid -> entity, required with indexes.
+        order (Mapping, optional): guid -> rank of the entity in entities,
+            required with indexes.
+
+    Returns:
+        list: The matching entities, in entity order.
+    """
+    indexed, rest = plan(predicates, indexes or {})
+    if not indexed:
+        return [e for e in entities if all(p(e) for p in rest)]
+    candidates = set(indexed[0][1])
+    for _, guids in indexed[1:]:
+        candidates &= guids
+        if not candidates:
+            break
+    # Sets iterate in hash order, which depends on the process for strings
+    found = (by_guid[g] for g in sorted(candidates, key=order.__getitem__))
+    return [e for e in found if all(p(e) for p in rest)]
+
+
+def explain(predicates: t.Sequence[Predicate], indexes: t.Dict[str, Index]) -> str:
+    """Human readable plan of a query."""
+    indexed, rest = plan(predicates, indexes)
+    lines = [f"index {p!r} -> {len(c)} candidates" for p, c in indexed]
+    lines += [f"{'filter' if indexed else 'scan'} {p!r}" for p in rest]
+    return "\n".join(lines) or "scan all"
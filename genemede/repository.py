@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# @File: genemede/repository.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 12:05:31 pm
+import typing as t
+from pathlib import Path
+
+from genemede.core import Entity, EntityFile, find_gnmd_files
+from genemede.graph import EntityGraph
+from genemede.query import Predicate
+
+
+class Repository(object):
+    """Repository loads every genemede file found under a folder and keeps a
+    GUID index spanning all of them, so that resolving references between
+    entities (e.g. a session's project, subjects, lab...) is a hash lookup.
+
+    Edits should go through the Repository methods so both the file and the
+    repository indexes stay up to date.
+
+    Args:
+        path (str): Path to the folder containing the json/gnmd files.
+        cache (bool, optional): Discover files through the on-disk catalog. Defaults to False.
+    """
+
+    def __init__(self, path: t.Union[str, Path], cache: bool = False):
+        self.path = Path(path)
+        self.cache = cache
+        self.files = {}
+        self._file_of = {}
+        self._index_paths = []
+        self._graph = None
+        self.load()
+
+    def load(self) -> None:
+        """Add the genemede files under path, backups excluded (see `find_gnmd_files`)."""
+        for f in find_gnmd_files(self.path, cache=self.cache):
+            self.add_file(f)
+
+    def add_file(self, fpath: t.Union[str, Path, EntityFile]) -> EntityFile:
+        """Add a file (or an already loaded EntityFile) and index its entities."""
+        ef = fpath if isinstance(fpath, EntityFile) else EntityFile(fpath)
+        for path in self._index_paths:
+            ef.create_index(path)
+        self.files[ef.path] = ef
+        for e in ef:
+            self._file_of[e.guid] = ef
+            if self._graph is not None:
+                self._graph.add(e)
+        return ef
+
+    def remove_file(self, fpath: t.Union[str, Path]) -> EntityFile:
+        """Drop a file and its entities from the repository, the file on disk is left as is."""
+        ef = self.files.pop(Path(fpath))
+        for e in ef:
+            if self._file_of.get(e.guid) is ef:
+                del self._file_of[e.guid]
+                if self._graph is not None:
+                    self._graph.remove(e.guid)
+        return ef
+
+    def reload_file(self, fpath: t.Union[str, Path]) -> EntityFile:
+        """Re-read a file edited outside the repository, its unsaved edits are lost."""
+        fpath = Path(fpath)
+        if fpath in self.files:
+            self.remove_file(fpath)
+        return self.add_file(fpath)
+
+    def reindex(self) -> None:
+        """Rebuild the repository index, needed only if files were edited directly."""
+        self._file_of = {}
+        for ef in self.files.values():
+            ef.reindex()
+            for e in ef:
+                self._file_of[e.guid] = ef
+        self._graph = None
+
+    def get(self, guid: str, default=None) -> t.Optional[Entity]:
+        """Return the Entity with the given GUID from any file, or default if not found."""
+        ef = self._file_of.get(guid)
+        if ef is None:
+            return default
+        return ef.get_entity(guid, default)
+
+    def file_of(self, guid: str) -> t.Optional[EntityFile]:
+        """Return the EntityFile holding the given GUID, or None."""
+        return self._file_of.get(guid)
+
+    def add_entity(self, entity: t.Union[Entity, dict], fpath: t.Union[str, Path]) -> Entity:
+        """
+        Add an entity to the repository file at fpath.
+
+        Raises:
+            KeyError: If the GUID is already in the repository or fpath is not one of its files.
+        """
+        ef = self.files[Path(fpath)]
+        if not isinstance(entity, Entity):
+            entity = Entity(item=entity)
+        if entity.guid in self._file_of:
+            raise KeyError(f"{entity.guid} <- already in {self._file_of[entity.guid]}")
+        ef.add_entity(entity)
+        self._file_of[entity.guid] = ef
+        if self._graph is not None:
+            self._graph.add(entity)
+        return entity
+
+    def update_entity(self, entity: t.Union[Entity, dict]) -> Entity:
+        """Update the stored entity with the same GUID, wherever it lives."""
+        guid = entity.guid if isinstance(entity, Entity) else entity["guid"]
+        if guid not in self._file_of:
+            raise KeyError(f"{guid} <- not in {self.path}")
+        stored = self._file_of[guid].update_entity(entity)
+        if self._graph is not None:
+            self._graph.update(stored)
+        return stored
+
+    def remove_entity(self, guid: str) -> Entity:
+        """Remove and return the entity with the given GUID."""
+        entity = self._file_of.pop(guid).remove_entity(guid)
+        if self._graph is not None:
+            self._graph.remove(guid)
+        return entity
+
+    def graph(self) -> EntityGraph:
+        """
+        The relationship graph of all the entities, see `genemede.graph`.
+
+        Built on first use, then kept up to date by the Repository edit methods.
+        """
+        if self._graph is None:
+            self._graph = EntityGraph(self)
+        return self._graph
+
+    def resolve(self, ref: t.Any) -> t.Any:
+        """
+        Resolve GUID references to Entities.
+
+        Strings are looked up in the index and replaced by their Entity,
+        lists and dicts (e.g. {"project": guid, "subjects": [guid, ...]}) are
+        resolved recursively. Anything that is not a known GUID is returned as is.
+        """
+        if isinstance(ref, str):
+            return self.get(ref, ref)
+        if isinstance(ref, list):
+            return [self.resolve(r) for r in ref]
+        if isinstance(ref, dict):
+            return {k: self.resolve(v) for k, v in ref.items()}
+        return ref
+
+    def resolve_links(self, entity: Entity) -> t.Any:
+        """Resolve the `links` of an entity, e.g. a session's project, subjects, lab..."""
+        return self.resolve(entity.links)
+
+    def create_index(self, path: str) -> None:
+        """Create a secondary index on path in every file, see `EntityFile.create_index`."""
+        if path not in self._index_paths:
+            self._index_paths.append(path)
+        for ef in self.files.values():
+            ef.create_index(path)
+
+    def query(self, *predicates: Predicate) -> t.List[Entity]:
+        """Return the entities of all files matching all predicates, see `genemede.query`."""
+        out = []
+        for ef in self.files.values():
+            out.extend(ef.query(*predicates))
+        return out
+
+    def __contains__(self, guid):
+        return guid in self._file_of
+
+    def __len__(self):
+        return len(self._file_of)
+
+    def __iter__(self):
+        for ef in self.files.values():
+            yield from ef
+
+    def __repr__(self):
+        return str(self.path)
+
+    def __str__(self):
+        return str(self.path)
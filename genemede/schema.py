@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# @File: genemede/schema.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 7:20:44 pm
+"""Registry of the mtype schemas defined in the genemede/mtypes tree.
+
+Each json file of the tree (except the `_properties` folders) holds one or
+more mtype definitions. A definition may declare a `parent` mtype and a list
+of `components`, names of `_properties/<component>.json` fragments found in
+its folder or any folder above it. The registry resolves both into a flat
+per-mtype schema, e.g. subject/human/cogitate gets the properties of subject,
+human, the epilepsy, visual and mpi fragments and its own.
+
+Definitions are addressed by qualified name (their folder path, e.g.
+"subject/human/cogitate") or by short name when it is unique ("human").
+"""
+import json
+import time
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+MTYPES_PATH = Path(__file__).parent.joinpath("mtypes")
+PROPERTIES_DIR = "_properties"
+
+
+@dataclass
+class PropertyIssue:
+    """A property value that does not satisfy its mtype schema."""
+
+    index: int
+    key: str
+    value: t.Any
+    message: str
+
+
+def is_constraint(levels: t.Any) -> bool:
+    """
+    Whether a property's `levels` restrict its values.
+
+    Only non-empty lists of plain strings do: references to other files
+    ("labs.gnmd", ["name one of experimenters.json"]) and placeholders
+    (["#TODO"]) are documentation, not constraints.
+    """
+    if not isinstance(levels, list) or not levels:
+        return False
+    for lv in levels:
+        if not isinstance(lv, str) or lv.startswith("#") or ".json" in lv or ".gnmd" in lv:
+            return False
+    return True
+
+
+class Validator(object):
+    """Compiled checks of the property values of one flattened mtype schema.
+
+    Args:
+        schema (dict): A flattened schema, see `SchemaRegistry.get`.
+    """
+
+    def __init__(self, schema: dict):
+        self.name = schema["qualified"]
+        self.known = frozenset(schema["properties"])
+        self.levels = {
+            k: frozenset(spec["levels"])
+            for k, spec in schema["properties"].items()
+            if isinstance(spec, dict) and is_constraint(spec.get("levels"))
+        }
+
+    def check(self, properties: t.Any, index: int = 0, strict: bool = False) -> t.List[PropertyIssue]:
+        """Check the properties dict of one entity, see `SchemaRegistry.validate`."""
+        issues = []
+        if not isinstance(properties, dict):
+            return issues
+        for k, allowed in self.levels.items():
+            value = properties.get(k)
+            if value is None or value == "":
+                continue
+            for v in value if isinstance(value, list) else (value,):
+                if v not in allowed and str(v) not in allowed:
+                    issues.append(PropertyIssue(index, k, v, f"not one of the {self.name} levels"))
+        if strict:
+            for k in properties.keys() - self.known:
+                issues.append(PropertyIssue(index, k, properties[k], f"not a {self.name} property"))
+        return issues
+
+
+class SchemaRegistry(object):
+    """Loads the mtypes tree once and memoizes the flattened schemas.
+
+    The tree is reloaded when any of its files is added, removed or modified,
+    checked at most every `ttl` seconds.
+
+    Args:
+        root (str, optional): The mtypes folder. Defaults to genemede/mtypes.
+        ttl (float, optional): Seconds between mtime checks. Defaults to 1.
+    """
+
+    def __init__(self, root: t.Union[str, Path] = MTYPES_PATH, ttl: float = 1.0):
+        self.root = Path(root)
+        self.ttl = ttl
+        self._stamp = None
+        self._checked = 0.0
+        self._load()
+
+    def _files(self) -> t.List[Path]:
+        return sorted(self.root.rglob("*.json"))
+
+    def _mtimes(self, files) -> tuple:
+        return tuple((f, f.stat().st_mtime_ns) for f in files)
+
+    def _load(self):
+        files = self._files()
+        self._stamp = self._mtimes(files)
+        self._checked = time.monotonic()
+        self._definitions = {}
+        self._fragments = {}
+        self._by_name = {}
+        self._flat = {}
+        self._validators = {}
+        for f in files:
+            rel = f.relative_to(self.root)
+            with open(f, "r") as fp:
+                content = json.load(fp)
+            if PROPERTIES_DIR in rel.parts:
+                self._fragments[rel.parent.parent.joinpath(f.stem).as_posix()] = content
+                continue
+            for d in content if isinstance(content, list) else [content]:
+                name = d.get("name") or d.get("mtype")
+                if not name:
+                    continue
+                parts = list(rel.parent.parts)
+                qualified = "/".join(parts if parts and parts[-1] == name else parts + [name])
+                if qualified in self._definitions:
+                    print(f"Warning: {f} redefines mtype {qualified}")
+                self._definitions[qualified] = dict(d, _file=str(rel))
+                self._by_name.setdefault(name, []).append(qualified)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.ttl:
+            return
+        self._checked = now
+        try:
+            if self._mtimes(self._files()) == self._stamp:
+                return
+        except FileNotFoundError:
+            pass  # a file vanished while scanning
+        self._load()
+
+    def names(self) -> t.List[str]:
+        """Qualified names of all the mtypes."""
+        self._refresh()
+        return list(self._definitions)
+
+    def qualify(self, name: str) -> str:
+        """
+        Return the qualified name of an mtype.
+
+        Raises:
+            KeyError: If the name is unknown or ambiguous.
+        """
+        self._refresh()
+        if name in self._definitions:
+            return name
+        candidates = self._by_name.get(name, [])
+        if len(candidates) != 1:
+            what = "ambiguous, use one of " + str(candidates) if candidates else "unknown"
+            raise KeyError(f"{name} <- {what} mtype")
+        return candidates[0]
+
+    def _resolve_parent(self, qualified: str, parent: str) -> str:
+        # Prefer the enclosing folders, e.g. subject/human/cogitate -> subject/human
+        parts = qualified.split("/")[:-1]
+        while parts:
+            if parts[-1] == parent:
+                return "/".join(parts)
+            parts.pop()
+        return self.qualify(parent)
+
+    def _fragment(self, qualified: str, component: str) -> dict:
+        parts = qualified.split("/")
+        while True:
+            key = "/".join(parts + [component]) if parts else component
+            if key in self._fragments:
+                return self._fragments[key]
+            if not parts:
+                raise KeyError(f"{component} <- no {PROPERTIES_DIR} fragment found for {qualified}")
+            parts.pop()
+
+    def get(self, name: str) -> dict:
+        """
+        Return the flattened schema of an mtype, memoized.
+
+        Returns:
+            dict: qualified (name), lineage (qualified names, root first),
+                components and properties (merged from the parents, the
+                component fragments and the definition itself), and the raw
+                definition.
+        """
+        qualified = self.qualify(name)
+        flat = self._flat.get(qualified)
+        if flat is not None:
+            return flat
+        d = self._definitions[qualified]
+        if d.get("parent"):
+            base = self.get(self._resolve_parent(qualified, d["parent"]))
+            lineage, properties, components = list(base["lineage"]), dict(base["properties"]), list(base["components"])
+        else:
+            lineage, properties, components = [], {}, []
+        for c in d.get("components") or []:
+            properties.update(self._fragment(qualified, c))
+            components.append(c)
+        if isinstance(d.get("properties"), dict):
+            properties.update(d["properties"])
+        lineage.append(qualified)
+        flat = {
+            "qualified": qualified,
+            "lineage": lineage,
+            "components": components,
+            "properties": properties,
+            "definition": d,
+        }
+        self._flat[qualified] = flat
+        return flat
+
+    def validator(self, name: str) -> Validator:
+        """The compiled, memoized Validator of an mtype."""
+        qualified = self.qualify(name)
+        v = self._validators.get(qualified)
+        if v is None:
+            v = self._validators[qualified] = Validator(self.get(qualified))
+        return v
+
+    def validate(
+        self, entities: t.Iterable[t.Any], mtype: t.Optional[str] = None, strict: bool = False
+    ) -> t.List[PropertyIssue]:
+        """
+        Check the properties of many entities against their mtype schemas.
+
+        Property values with allowed `levels` must be one of them (each item
+        for list values), empty values are accepted.
+
+        Args:
+            entities (Iterable): Entities or dicts.
+            mtype (str, optional): Validate all entities against this mtype
+                instead of their own `mtype`.
+            strict (bool, optional): Also report properties missing from the
+                schema and entities whose mtype is unknown. Defaults to False.
+
+        Returns:
+            list[PropertyIssue]: The offending values, by entity index.
+        """
+        validators = {}
+        issues = []
+        for i, e in enumerate(entities):
+            name = mtype or e["mtype"]
+            if name not in validators:
+                try:
+                    validators[name] = self.validator(name)
+                except KeyError as x:
+                    # Keep the reason, the mtype is unknown or ambiguous
+                    validators[name] = x.args[0]
+            v = validators[name]
+            if not isinstance(v, Validator):
+                if strict:
+                    issues.append(PropertyIssue(i, "mtype", name, v))
+                continue
+            issues.extend(v.check(e["properties"], i, strict=strict))
+        return issues
+
+
+_default = None
+
+
+def get_registry() -> SchemaRegistry:
+    """The shared registry of the packaged mtypes tree."""
+    global _default
+    if _default is None:
+        _default = SchemaRegistry()
+    return _default
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+# @File: genemede/search.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 1:15:52 pm
+"""Full-text search over the names, descriptions, tags and property values of entities.
+
+An inverted index maps every token to the entities containing it, weighted
+by the field it was found in (a match in the name counts more than one in a
+property value). Query terms match whole tokens or, by default, token
+prefixes ("cogi" finds "Cogitate"); entities must match every term and are
+ranked by TF-IDF:
+
+    index = SearchIndex.for_repository(repo, "search.json")
+    index.search("MEG cogitate")  # [(guid, score), ...] best first
+
+The index attaches itself to the EntityFiles (see `EntityFile.save_hooks`)
+so that saved edits are indexed right away, `save` persists it.
+"""
+import bisect
+import json
+import math
+import re
+import typing as t
+from pathlib import Path
+
+from genemede import io
+from genemede.journal import journal_path
+
+SEARCH_VERSION = 1
+# Weight of an occurrence of a token, by field
+FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "mtype": 1.5, "description": 1.0, "properties": 1.0}
+# Score factor of a token matched by prefix only, exact matches rank first
+PREFIX_FACTOR = 0.5
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> t.List[str]:
+    """Lowercase alphanumeric tokens of a text, "MEG-2 (Cogitate)" -> ["meg", "2", "cogitate"]"""
+    return TOKEN_RE.findall(text.casefold())
+
+
+def _texts(value) -> t.Iterator[str]:
+    """Strings and numbers nested in a value."""
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, str):
+            yield v
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            yield str(v)
+        elif isinstance(v, dict):
+            stack.extend(v.values())
+        elif isinstance(v, list):
+            stack.extend(v)
+
+
+def term_weights(entity) -> t.Dict[str, float]:
+    """{token: weighted count} of the searchable fields of an entity."""
+    weights = {}
+    for field, w in FIELD_WEIGHTS.items():
+        for text in _texts(entity[field]):
+            for tok in tokenize(text):
+                weights[tok] = weights.get(tok, 0.0) + w
+    return weights
+
+
+def _stamp(fpath: Path) -> list:
+    """What identifies a version of a file and of its journal."""
+    out = []
+    for p in (fpath, journal_path(fpath)):
+        try:
+            st = p.stat()
+            out += [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            out += [None, None]
+    return out
+
+
+class SearchIndex(object):
+    """Inverted index of entities, see the module docstring.
+
+    Args:
+        entities (Iterable, optional): Entities or dicts to index.
+    """
+
+    def __init__(self, entities: t.Iterable[t.Any] = ()):
+        self.postings = {}  # token -> {guid: weight}
+        self.docs = {}  # guid -> {token: weight}, to remove a document without it
+        self.sources = {}  # file path -> stamp of the indexed version
+        self._terms = None
+        for e in entities:
+            self.add(e)
+
+    def add(self, entity) -> None:
+        """Index (or re-index) an entity."""
+        guid = entity["guid"]
+        if guid in self.docs:
+            self.remove(guid)
+        weights = term_weights(entity)
+        self._add_doc(guid, weights)
+
+    update = add
+
+    def _add_doc(self, guid, weights):
+        self.docs[guid] = weights
+        for tok, w in weights.items():
+            posting = self.postings.get(tok)
+            if posting is None:
+                posting = self.postings[tok] = {}
+                self._terms = None
+            posting[guid] = w
+
+    def remove(self, guid: str) -> None:
+        """Drop an entity from the index, unknown GUIDs are ignored."""
+        for tok in self.docs.pop(guid, ()):
+            posting = self.postings[tok]
+            del posting[guid]
+            if not posting:
+                del self.postings[tok]
+                self._terms = None
+
+    def terms(self) -> t.List[str]:
+        """All the indexed tokens, sorted, cached until a token appears or vanishes."""
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        return self._terms
+
+    def expand(self, term: str, prefix: bool = True) -> t.List[str]:
+        """The indexed tokens matching a query term."""
+        if not prefix:
+            return [term] if term in self.postings else []
+        terms = self.terms()
+        i = bisect.bisect_left(terms, term)
+        out = []
+        while i < len(terms) and terms[i].startswith(term):
+            out.append(terms[i])
+            i += 1
+        return out
+
+    def search(self, text: str, limit: t.Optional[int] = 10, prefix: bool = True) -> t.List[t.Tuple[str, float]]:
+        """
+        Rank the entities matching every term of a free text query.
+
+        Args:
+            text (str): The query, tokenized like the indexed texts.
+            limit (int, optional): Number of results, None for all. Defaults to 10.
+            prefix (bool, optional): Let terms match token prefixes. Defaults to True.
+
+        Returns:
+            list: (guid, score) tuples, best first.
+        """
+        n_docs = len(self.docs)
+        scores = None
+        for term in dict.fromkeys(tokenize(text)):
+            matched = {}
+            for tok in self.expand(term, prefix=prefix):
+                posting = self.postings[tok]
+                idf = math.log(1 + n_docs / len(posting))
+                factor = idf if tok == term else idf * PREFIX_FACTOR
+                for guid, w in posting.items():
+                    s = w * factor
+                    if s > matched.get(guid, 0.0):
+                        matched[guid] = s
+            if scores is None:
+                scores = matched
+            else:
+                scores = {g: s + matched[g] for g, s in scores.items() if g in matched}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        ranked = sorted(scores.items(), key=lambda gs: (-gs[1], gs[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def attach(self, ef) -> None:
+        """Index the entities of an EntityFile and follow its saved edits."""
+        for e in ef:
+            self.add(e)
+        self.sources[str(ef.path)] = _stamp(ef.path)
+        if self._on_save not in ef.save_hooks:
+            ef.save_hooks.append(self._on_save)
+
+    def _on_save(self, ef, changes) -> None:
+        for op, guid, _ in changes:
+            if op == "delete":
+                self.remove(guid)
+            else:
+                entity = ef.get_entity(guid)
+                if entity is not None:
+                    self.add(entity)
+        self.sources[str(ef.path)] = _stamp(ef.path)
+
+    def is_current(self, fpaths: t.Iterable[t.Union[str, Path]]) -> bool:
+        """Whether the index was built from exactly these files, as they are on disk."""
+        fpaths = [Path(f) for f in fpaths]
+        if set(self.sources) != {str(f) for f in fpaths}:
+            return False
+        return all(self.sources[str(f)] == _stamp(f) for f in fpaths)
+
+    @classmethod
+    def for_repository(cls, repo, fpath: t.Optional[t.Union[str, Path]] = None) -> "SearchIndex":
+        """
+        Index of a Repository, attached to all of its files.
+
+        Args:
+            repo (Repository): The repository to index.
+            fpath (str, optional): Persisted index, reused if none of the
+                repository files changed since, rebuilt (and saved) otherwise.
+        """
+        index = None
+        if fpath is not None and Path(fpath).exists():
+            index = cls.load(fpath)
+            if not index.is_current(repo.files):
+                index = None
+        if index is None:
+            index = cls()
+            for ef in repo.files.values():
+                index.attach(ef)
+            if fpath is not None:
+                index.save(fpath)
+        else:
+            for ef in repo.files.values():
+                if index._on_save not in ef.save_hooks:
+                    ef.save_hooks.append(index._on_save)
+        return index
+
+    def save(self, fpath: t.Union[str, Path]) -> None:
+        """Persist the index as JSON, the postings are rebuilt from the documents on load."""
+        io.write_atomic(fpath, {"version": SEARCH_VERSION, "sources": self.sources, "docs": self.docs}, indent=None)
+
+    @classmethod
+    def load(cls, fpath: t.Union[str, Path]) -> "SearchIndex":
+        """
+        Load a persisted index.
+
+        Raises:
+            ValueError: If the file is not a search index of this version.
+        """
+        with open(fpath, "r") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != SEARCH_VERSION:
+            raise ValueError(f"{fpath} <- not a version {SEARCH_VERSION} search index")
+        index = cls()
+        index.sources = data["sources"]
+        for guid, weights in data["docs"].items():
+            index._add_doc(guid, weights)
+        return index
+
+    def __contains__(self, guid):
+        return guid in self.docs
+
+    def __len__(self):
+        return len(self.docs)
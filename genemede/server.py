@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+# @File: genemede/server.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 10:12:36 am
+"""Local metadata server keeping a Repository in memory.
+
+The repository is loaded once, with its GUID and mtype indexes, and served
+over a small JSON API on the loopback interface only (requests must name a
+loopback host and the server port in their Host header):
+
+    GET  /entities/<guid>               the entity, 404 if unknown
+    GET  /entities?mtype=subject&...    entities equal to every value (repeat a key for "any of")
+    POST /query                         {"where": [["eq", path, value], ["isin", path, [values]],
+                                         ["between", path, lo, hi]], "limit": n}
+    PUT  /entities/<guid>[?file=<path>] update the entity, or add it to a file of the repository
+    POST /flush                         write the pending edits now
+    GET  /status                        entity, file and pending edit counts
+
+Edits are applied in memory at once and written to disk in batches, every
+`flush_interval` seconds. A watcher polls the files every `poll_interval`
+seconds and reloads the ones changed by other programs. If such a file also
+has pending edits they win, and the external version is kept in a backup
+(see `io.update`). Connections are kept alive, so a `Client` lookup is a
+dictionary access plus a local round trip.
+
+Usage:
+    python -m genemede.server ROOT [--port PORT] [--flush-interval S] [--poll-interval S]
+"""
+import argparse
+import http.client
+import ipaddress
+import json
+import socket
+import threading
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from genemede import io
+from genemede.core import Entity, is_valid_file, validate_entity
+from genemede.query import between, eq, isin
+from genemede.repository import Repository
+
+DEFAULT_PORT = 8765
+FLUSH_INTERVAL = 1.0
+POLL_INTERVAL = 2.0
+PREDICATES = {"eq": eq, "isin": isin, "between": between}
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _is_local_host(header: t.Optional[str], port: int) -> bool:
+    """Whether a Host header names a loopback address and the server port, see _Handler."""
+    try:
+        url = urlsplit(f"//{header}")
+        return url.hostname is not None and _is_loopback(url.hostname) and (url.port or 80) == port
+    except ValueError:
+        return False
+
+
+def _stamp(fpath: Path) -> t.Optional[t.Tuple[int, int]]:
+    try:
+        st = fpath.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def parse_query(where: t.Any) -> list:
+    """
+    Build the predicates of a JSON query, see the module docstring.
+
+    Raises:
+        ValueError: If a clause is malformed.
+    """
+    if not isinstance(where, list):
+        raise ValueError(f"{where!r} <- where must be a list of [op, path, *args] clauses")
+    predicates = []
+    for clause in where:
+        if not isinstance(clause, list) or len(clause) < 3 or clause[0] not in PREDICATES:
+            raise ValueError(f"{clause!r} <- expected [op, path, *args] with op in {list(PREDICATES)}")
+        op, path, *args = clause
+        try:
+            predicates.append(PREDICATES[op](path, *args))
+        except TypeError as e:
+            raise ValueError(f"{clause!r} <- {e}")
+    return predicates
+
+
+class MetadataServer(object):
+    """In-memory Repository served over HTTP on a loopback address, see the module docstring.
+
+    Args:
+        path (str): Folder of the repository.
+        host (str, optional): A loopback address. Defaults to "127.0.0.1".
+        port (int, optional): Defaults to DEFAULT_PORT, 0 picks a free port.
+        flush_interval (float, optional): Seconds between batched writes. Defaults to FLUSH_INTERVAL.
+        poll_interval (float, optional): Seconds between checks for external
+            changes, None disables the watcher. Defaults to POLL_INTERVAL.
+        cache (bool, optional): Discover files through the on-disk catalog. Defaults to False.
+
+    Raises:
+        ValueError: If host is not a loopback address.
+    """
+
+    def __init__(
+        self,
+        path: t.Union[str, Path],
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        flush_interval: float = FLUSH_INTERVAL,
+        poll_interval: t.Optional[float] = POLL_INTERVAL,
+        cache: bool = False,
+    ):
+        if not _is_loopback(host):
+            raise ValueError(f"{host} <- the server only listens on loopback addresses")
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.repo = Repository(path, cache=cache)
+        self.repo.create_index("mtype")
+        # Guards the repository, requests are handled in threads
+        self.lock = threading.RLock()
+        # Serializes flush and sync, which write and read the files outside of lock
+        self._io_lock = threading.Lock()
+        self._dirty = set()  # EntityFiles with unsaved edits
+        self._stamps = {f: _stamp(f) for f in self._candidates()}
+        self._stop = threading.Event()
+        self._threads = []
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.app = self
+
+    @property
+    def address(self) -> t.Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def _candidates(self) -> t.List[Path]:
+        return io.candidate_files(self.repo.path)
+
+    def get(self, guid: str) -> t.Optional[dict]:
+        with self.lock:
+            entity = self.repo.get(guid)
+            return None if entity is None else entity.to_dict(squeeze=False)
+
+    def query(self, predicates: list, limit: t.Optional[int] = None) -> t.List[dict]:
+        with self.lock:
+            found = self.repo.query(*predicates)
+            return [e.to_dict(squeeze=False) for e in found[:limit]]
+
+    def put(self, item: dict, fpath: t.Optional[t.Union[str, Path]] = None) -> t.Tuple[dict, bool]:
+        """
+        Update the entity with the GUID of item, or add it to the file at fpath.
+
+        Args:
+            item (dict): A dict matching the Entity template.
+            fpath (str, optional): Repository file of a new entity, relative to the repository folder.
+
+        Raises:
+            ValueError: If item does not match the template.
+            KeyError: If the entity is new and fpath is not a file of the repository.
+
+        Returns:
+            tuple: (stored entity dict, whether it was created)
+        """
+        issue = validate_entity(item)
+        if issue is not None:
+            raise ValueError(issue.message)
+        with self.lock:
+            if item["guid"] in self.repo:
+                stored = self.repo.update_entity(item)
+                created = False
+            else:
+                if fpath is None:
+                    raise KeyError(f"{item['guid']} <- not in the repository, give the file to add it to")
+                target = self.repo.path.joinpath(fpath)
+                if target not in self.repo.files:
+                    raise KeyError(f"{fpath} <- not a file of the repository")
+                stored = self.repo.add_entity(Entity(item=item), target)
+                created = True
+            self._dirty.add(self.repo.file_of(stored.guid))
+            return stored.to_dict(squeeze=False), created
+
+    def pending(self) -> int:
+        """Number of files with edits not written to disk yet."""
+        with self.lock:
+            return len(self._dirty)
+
+    def flush(self) -> t.List[Path]:
+        """
+        Write the files with pending edits, returns their paths.
+
+        Requests only wait for the snapshot of the edits, not for the
+        writes, backups and fsyncs, made outside of the lock.
+        """
+        with self._io_lock:
+            with self.lock:
+                dirty, self._dirty = self._dirty, set()
+                snapshots = [(ef, ef.snapshot()) for ef in dirty]
+            written = []
+            try:
+                for ef, snap in snapshots:
+                    ef.write_snapshot(snap)
+                    written.append(ef)
+            finally:
+                with self.lock:
+                    for ef in written:
+                        self._stamps[ef.path] = _stamp(ef.path)
+                    # Written again by the next flush, whole files are rewritten
+                    self._dirty.update(ef for ef in dirty if ef not in written)
+            return [ef.path for ef in written]
+
+    def sync(self) -> t.List[Path]:
+        """
+        Pick up the files created, changed or deleted by other programs.
+
+        Returns:
+            list[Path]: The files (re)loaded or dropped.
+        """
+        with self._io_lock:
+            return self._sync()
+
+    def _sync(self) -> t.List[Path]:
+        candidates = self._candidates()
+        stamps = {f: _stamp(f) for f in candidates}
+        changed = []
+        with self.lock:
+            for f in set(self._stamps) - set(stamps):
+                del self._stamps[f]
+                if f in self.repo.files:
+                    ef = self.repo.remove_file(f)
+                    if ef in self._dirty:
+                        print(f"Warning: {f} was deleted, its unsaved edits are lost")
+                        self._dirty.discard(ef)
+                    changed.append(f)
+            for f, stamp in stamps.items():
+                if stamp is None or self._stamps.get(f) == stamp:
+                    continue
+                known = f in self._stamps
+                self._stamps[f] = stamp
+                ef = self.repo.files.get(f)
+                if ef in self._dirty:
+                    print(f"Warning: {f} changed on disk but has unsaved edits, they will overwrite it")
+                    continue
+                if not is_valid_file(f):
+                    if ef is not None:
+                        self.repo.remove_file(f)
+                        changed.append(f)
+                    continue
+                if known and ef is not None:
+                    self.repo.reload_file(f)
+                else:
+                    self.repo.add_file(f)
+                changed.append(f)
+        return changed
+
+    def _every(self, interval: float, func: t.Callable) -> None:
+        while not self._stop.wait(interval):
+            try:
+                func()
+            except Exception as e:
+                print(f"Warning: {func.__name__} failed: {e!r}")
+
+    def start(self) -> "MetadataServer":
+        """Serve in background threads, see `stop`."""
+        self._stop.clear()
+        targets = [self.httpd.serve_forever, lambda: self._every(self.flush_interval, self.flush)]
+        if self.poll_interval is not None:
+            targets.append(lambda: self._every(self.poll_interval, self.sync))
+        self._threads = [threading.Thread(target=f, daemon=True) for f in targets]
+        for th in self._threads:
+            th.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and write the pending edits."""
+        self._stop.set()
+        self.httpd.shutdown()
+        for th in self._threads:
+            th.join()
+        self._threads = []
+        self.httpd.server_close()
+        self.flush()
+
+    def serve_forever(self) -> None:
+        """Serve until interrupted, see `start`."""
+        self.start()
+        try:
+            self._stop.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, a lookup does not pay for a new connection
+    # Headers and body are separate writes, Nagle would delay the body by the peer's delayed ack (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: t.Any, close: bool = False) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> t.Any:
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n)) if n else None
+
+    def _route(self, method: str):
+        app = self.server.app
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        params = parse_qs(url.query)
+        if method == "GET" and parts == ["entities"]:
+            predicates = [eq(k, v[0]) if len(v) == 1 else isin(k, v) for k, v in params.items() if k != "limit"]
+            limit = int(params["limit"][0]) if "limit" in params else None
+            return 200, {"entities": app.query(predicates, limit)}
+        if method == "GET" and len(parts) == 2 and parts[0] == "entities":
+            entity = app.get(parts[1])
+            return (200, entity) if entity is not None else (404, {"error": f"{parts[1]} <- not found"})
+        if method == "GET" and parts == ["status"]:
+            return 200, {"entities": len(app.repo), "files": len(app.repo.files), "pending": app.pending()}
+        if method == "POST" and parts == ["query"]:
+            body = self._body() or {}
+            if not isinstance(body, dict):
+                raise ValueError(f"{body!r} <- expected a JSON object")
+            return 200, {"entities": app.query(parse_query(body.get("where", [])), body.get("limit"))}
+        if method == "POST" and parts == ["flush"]:
+            return 200, {"flushed": [str(f) for f in app.flush()]}
+        if method == "PUT" and len(parts) == 2 and parts[0] == "entities":
+            item = self._body()
+            if isinstance(item, dict):
+                item.setdefault("guid", parts[1])
+                if item["guid"] != parts[1]:
+                    raise ValueError(f"{item['guid']} <- does not match the URL GUID {parts[1]}")
+            stored, created = app.put(item, params.get("file", [None])[0])
+            return 201 if created else 200, stored
+        return 404, {"error": f"{method} {url.path} <- unknown endpoint"}
+
+    def _handle(self, method: str) -> None:
+        # A page from another site can reach the loopback address by pointing its own name at it
+        # (DNS rebinding), its requests then carry that name in Host
+        if not _is_local_host(self.headers.get("Host"), self.server.app.address[1]):
+            # The body is not read, the connection cannot be reused
+            self._send(403, {"error": f"{self.headers.get('Host')} <- not a local host of this server"}, close=True)
+            return
+        try:
+            status, body = self._route(method)
+        except KeyError as e:
+            status, body = 404, {"error": str(e.args[0]) if e.args else repr(e)}
+        except (ValueError, TypeError) as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            # Answered anyway, dropping the connection would break the client's kept-alive one
+            status, body = 500, {"error": repr(e)}
+        self._send(status, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+class _Connection(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        # Headers and body of a request are separate writes too, see _Handler
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class Client(object):
+    """Client of a MetadataServer over one kept-alive connection, not thread safe.
+
+    Args:
+        port (int, optional): Defaults to DEFAULT_PORT.
+        host (str, optional): Defaults to "127.0.0.1".
+        timeout (float, optional): Seconds. Defaults to 10.
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, host: str = "127.0.0.1", timeout: float = 10.0):
+        self.conn = _Connection(host, port, timeout=timeout)
+
+    def request(self, method: str, url: str, body: t.Any = None) -> t.Tuple[int, t.Any]:
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {} if payload is None else {"Content-Type": "application/json"}
+        self.conn.request(method, url, body=payload, headers=headers)
+        resp = self.conn.getresponse()
+        return resp.status, json.loads(resp.read())
+
+    def _check(self, status: int, body: t.Any) -> t.Any:
+        if status == 404:
+            raise KeyError(body["error"])
+        if status >= 400:
+            raise ValueError(body["error"])
+        return body
+
+    def get(self, guid: str, default=None) -> t.Optional[dict]:
+        """The entity dict with the given GUID, or default if not found."""
+        status, body = self.request("GET", f"/entities/{quote(guid, safe='')}")
+        return default if status == 404 else self._check(status, body)
+
+    def query(self, *where: list, limit: t.Optional[int] = None) -> t.List[dict]:
+        """Entity dicts matching all [op, path, *args] clauses, e.g. ["eq", "mtype", "subject"]."""
+        body = {"where": [list(c) for c in where], "limit": limit}
+        return self._check(*self.request("POST", "/query", body))["entities"]
+
+    def put(self, item: dict, fpath: t.Optional[str] = None) -> dict:
+        """Update (or add to fpath) an entity, returns it as stored."""
+        url = f"/entities/{quote(item['guid'], safe='')}"
+        if fpath is not None:
+            url += f"?file={quote(str(fpath))}"
+        return self._check(*self.request("PUT", url, item))
+
+    def flush(self) -> t.List[str]:
+        return self._check(*self.request("POST", "/flush"))["flushed"]
+
+    def status(self) -> dict:
+        return self._check(*self.request("GET", "/status"))
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="genemede.server", description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="folder of the repository")
+    parser.add_argument("--host", default="127.0.0.1", help="a loopback address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL)
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--cache", action="store_true", help="discover files through the catalog")
+    args = parser.parse_args(argv)
+    server = MetadataServer(
+        args.root,
+        host=args.host,
+        port=args.port,
+        flush_interval=args.flush_interval,
+        poll_interval=args.poll_interval,
+        cache=args.cache,
+    )
+    host, port = server.address
+    print(f"serving {len(server.repo)} entities from {len(server.repo.files)} files on http://{host}:{port}")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
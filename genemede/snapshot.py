@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# @File: genemede/snapshot.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 2:41:09 pm
+"""Read-only binary snapshots of a repository, memory mapped by readers.
+
+A snapshot is compiled once from a Repository (or any entities):
+
+    snapshot.build("data/", "data.gnmd.snap")
+
+and opened by any number of processes, each mapping the same file: the
+pages live once in the OS page cache whatever the number of workers, and an
+entity is only decoded when accessed. `Snapshot` reads like a (read-only)
+EntityFile, and is pickled as its path so it can be handed to `pmap` workers.
+
+Layout, little endian:
+
+    header   MAGIC, version, codec, n, then the offsets of the sections below
+    payloads the encoded entity dicts, in repository order
+    order    n + 1 u64 payload offsets, entity i spans order[i]:order[i + 1]
+    guids    the UTF-8 GUIDs, concatenated
+    index    n (guid offset u64, guid length u32, entity number u32) records sorted by GUID bytes
+    meta     JSON: the source files with their entity ranges and stamps
+
+Usage:
+    python -m genemede.snapshot ROOT OUTPUT [--codec json|msgpack]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+import typing as t
+from pathlib import Path
+
+from genemede import io
+from genemede.core import Entity
+from genemede.repository import Repository
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC = b"GNMDSNAP"
+SNAPSHOT_VERSION = 1
+SUFFIX = ".gnmd.snap"
+# Payload encodings, msgpack needs the optional msgpack package
+CODECS = ("json", "msgpack")
+HEADER = struct.Struct("<8sIIQQQQQQ")  # magic, version, codec, n, order, guids, index, meta offsets, meta length
+ENTRY = struct.Struct("<QII")  # guid offset, guid length, entity number
+OFFSET = struct.Struct("<Q")
+
+
+def _encoder(codec: str) -> t.Callable[[dict], bytes]:
+    if codec == "json":
+        return lambda d: json.dumps(d, separators=(",", ":")).encode()
+    if codec == "msgpack":
+        return io._require(msgpack, "msgpack", codec).packb
+    raise ValueError(f"{codec} <- unknown codec, use one of {CODECS}")
+
+
+def _decoder(codec: str) -> t.Callable[[bytes], dict]:
+    if codec == "json":
+        return json.loads
+    return io._require(msgpack, "msgpack", codec).unpackb
+
+
+def _stamp(fpath: Path) -> t.Optional[list]:
+    try:
+        st = Path(fpath).stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _sources(source) -> t.Iterator[t.Tuple[t.Optional[Path], t.Iterable]]:
+    """(file, entities) groups of a build source, see `build`."""
+    if isinstance(source, (str, Path)):
+        source = Repository(source)
+    if isinstance(source, Repository):
+        for ef in source.files.values():
+            # The entities the repository resolves, duplicated GUIDs resolve to the last file
+            yield ef.path, (e for e in ef if source.file_of(e.guid) is ef)
+    else:
+        yield None, source
+
+
+def build(
+    source: t.Union[str, Path, Repository, t.Iterable[t.Any]],
+    fpath: t.Union[str, Path],
+    codec: str = "json",
+) -> Path:
+    """
+    Compile entities into a snapshot file, atomically replacing fpath.
+
+    Args:
+        source: A Repository, the folder of one, or an iterable of Entities/dicts.
+        fpath (str): The snapshot to write, see SUFFIX.
+        codec (str, optional): Payload encoding, one of CODECS. msgpack decodes
+            faster, json needs no extra package. Defaults to "json".
+
+    Raises:
+        ValueError: If the codec is unknown or a GUID appears twice.
+        ImportError: If the codec needs a package that is not installed.
+
+    Returns:
+        Path: fpath.
+    """
+    fpath = Path(fpath)
+    encode = _encoder(codec)
+    offsets = [0]
+    guids = {}
+    sources = []
+    fd, tmp = tempfile.mkstemp(dir=fpath.parent, prefix=f".{fpath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(bytes(HEADER.size))
+            for src, entities in _sources(source):
+                start = len(guids)
+                for e in entities:
+                    d = e.to_dict(squeeze=False) if isinstance(e, Entity) else Entity(item=e).to_dict(squeeze=False)
+                    key = d["guid"].encode()
+                    if key in guids:
+                        raise ValueError(f"{d['guid']} <- duplicated GUID")
+                    guids[key] = len(offsets) - 1
+                    payload = encode(d)
+                    f.write(payload)
+                    offsets.append(offsets[-1] + len(payload))
+                if src is not None:
+                    sources.append({"path": str(src), "start": start, "stop": len(guids), "stamp": _stamp(src)})
+            base = HEADER.size
+            order_at = base + offsets[-1]
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            guids_at = f.tell()
+            keys = sorted(guids)
+            entries = []
+            pos = 0
+            for key in keys:
+                f.write(key)
+                entries.append(ENTRY.pack(pos, len(key), guids[key]))
+                pos += len(key)
+            index_at = f.tell()
+            f.write(b"".join(entries))
+            meta_at = f.tell()
+            meta = json.dumps({"codec": codec, "sources": sources}).encode()
+            f.write(meta)
+            f.seek(0)
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    SNAPSHOT_VERSION,
+                    CODECS.index(codec),
+                    len(guids),
+                    order_at,
+                    guids_at,
+                    index_at,
+                    meta_at,
+                    len(meta),
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, io.new_file_mode())
+        os.replace(tmp, fpath)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    # The rename itself is only durable once the folder is synced, see io.write_atomic
+    io.fsync_dir(fpath.parent)
+    return fpath
+
+
+class Snapshot(object):
+    """Read-only, memory mapped view of a snapshot file with the read API of an EntityFile.
+
+    Args:
+        path (str): A file written by `build`.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+
+    def __init__(self, path: t.Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{self.path} <- not a genemede snapshot")
+        magic, version, codec, n, order_at, guids_at, index_at, meta_at, meta_len = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} <- not a version {SNAPSHOT_VERSION} genemede snapshot")
+        self.n = n
+        self.codec = CODECS[codec]
+        self._decode = _decoder(self.codec)
+        self._order_at, self._guids_at, self._index_at = order_at, guids_at, index_at
+        self.meta = json.loads(self._mm[meta_at:meta_at + meta_len])
+        self.lazy = False
+
+    def _payload(self, i: int) -> bytes:
+        a, b = struct.unpack_from("<2Q", self._mm, self._order_at + 8 * i)
+        return self._mm[HEADER.size + a:HEADER.size + b]
+
+    def _key(self, k: int) -> t.Tuple[bytes, int]:
+        pos, size, i = ENTRY.unpack_from(self._mm, self._index_at + ENTRY.size * k)
+        start = self._guids_at + pos
+        return self._mm[start:start + size], i
+
+    def _find(self, guid: str) -> t.Optional[int]:
+        """Entity number of a GUID, by binary search of the index."""
+        key = guid.encode()
+        lo, hi = 0, self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe, i = self._key(mid)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return i
+        return None
+
+    def entity(self, i: int) -> Entity:
+        """Decode the i-th entity, in repository order."""
+        return Entity(item=self._decode(self._payload(i)))
+
+    def get_entity(self, guid: str, default=None) -> t.Optional[Entity]:
+        """Return the Entity with the given GUID in O(log n), or default if not found."""
+        i = self._find(guid)
+        return default if i is None else self.entity(i)
+
+    def source_of(self, guid: str) -> t.Optional[str]:
+        """Path of the repository file the entity was compiled from, if any."""
+        i = self._find(guid)
+        if i is None:
+            return None
+        for src in self.meta["sources"]:
+            if src["start"] <= i < src["stop"]:
+                return src["path"]
+        return None
+
+    def guids(self) -> t.Iterator[str]:
+        """All GUIDs, in sorted order, without decoding the entities."""
+        for k in range(self.n):
+            yield self._key(k)[0].decode()
+
+    def iter_entities(self) -> t.Iterator[Entity]:
+        """Decode the entities one at a time, in repository order."""
+        for i in range(self.n):
+            yield self.entity(i)
+
+    def query(self, *predicates) -> t.List[Entity]:
+        """Return the Entities matching all predicates, see `genemede.query`. Scans the snapshot."""
+        from genemede import query
+
+        return query.run(predicates, self.iter_entities())
+
+    def is_current(self) -> bool:
+        """Whether none of the source files changed since the snapshot was built."""
+        return all(_stamp(src["path"]) == src["stamp"] for src in self.meta["sources"])
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __contains__(self, guid):
+        return self._find(guid) is not None
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return self.iter_entities()
+
+    def __reduce__(self):
+        # Workers reopen (and share) the mapping instead of receiving a copy of it
+        return (type(self), (self.path,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return str(self.path)
+
+    def __str__(self):
+        return str(self.path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="genemede.snapshot", description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="folder of the repository")
+    parser.add_argument("output", help=f"snapshot file, e.g. data{SUFFIX}")
+    parser.add_argument("--codec", choices=CODECS, default="json")
+    args = parser.parse_args(argv)
+    fpath = build(args.root, args.output, codec=args.codec)
+    with Snapshot(fpath) as snap:
+        print(f"{len(snap)} entities from {len(snap.meta['sources'])} files in {fpath}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -56,7 +56,9 @@ setup(
     url="https://genemede.github.io/",
     packages=find_packages(exclude=["scratch"]),  # same as name
     include_package_data=True,
+    package_data={"genemede": ["mtypes/*.json", "mtypes/**/*.json"]},
     # external packages as dependencies
     install_requires=require,
+    extras_require={"codecs": ["zstandard", "msgpack"], "columnar": ["numpy", "pyarrow"]},
     scripts=[],
 )
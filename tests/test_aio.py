@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# @File: tests/test_aio.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 11:40:26 am
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from genemede import aio
+from genemede.core import Entity, EntityFile
+
+
+def make_item(guid, name):
+    item = dict.fromkeys(Entity.template)
+    item.update(guid=guid, modified_at="2023-01-01T00:00:00", name=name, mtype="subject")
+    return item
+
+
+class TestAio(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.files = []
+        for i in range(5):
+            fpath = self.temp_dir / f"file{i}.json"
+            with open(fpath, "w") as f:
+                json.dump([make_item(f"g{i}", f"name {i}")], f)
+            self.files.append(fpath)
+
+    def tearDown(self):
+        aio.configure()
+
+    async def test_load_many(self):
+        efs = await aio.load_many(self.files, limit=2)
+        self.assertEqual([ef.path for ef in efs], self.files)
+        self.assertEqual([ef.get_entity(f"g{i}").name for i, ef in enumerate(efs)], [f"name {i}" for i in range(5)])
+        found = await aio.load_dir(self.temp_dir)
+        self.assertEqual(sorted(ef.path for ef in found), self.files)
+
+    async def test_load_errors(self):
+        self.files[1].write_text("[not json")
+        results = await aio.load_many(self.files, return_exceptions=True)
+        self.assertIsInstance(results[1], ValueError)
+        with self.assertRaises(ValueError):
+            await aio.load_many(self.files)
+
+    async def test_save_and_create(self):
+        ef = await aio.load(self.files[0])
+        ef.add_entity(Entity(item=make_item("new", "new")))
+        await aio.save(ef)
+        self.assertIn("new", EntityFile(self.files[0]))
+        fpath = await aio.create(self.temp_dir / "created", [make_item("c", "c")], encoding="gzip")
+        self.assertEqual((await aio.read(fpath))[0]["guid"], "c")
+
+    async def test_bounded_executor(self):
+        aio.configure(max_files=2)
+        active, peak = 0, 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        await asyncio.gather(*(aio.run(work) for _ in range(8)))
+        self.assertEqual(peak, 2)
+        with self.assertRaises(ValueError):
+            aio.configure(max_files=0)
+
+
+class TestAioLoops(unittest.TestCase):
+    def test_save_from_several_loops(self):
+        fpath = Path(tempfile.mkdtemp()) / "file.json"
+        with open(fpath, "w") as f:
+            json.dump([make_item("g", "name")], f)
+        ef = EntityFile(fpath)
+
+        async def contended(name):
+            ef.update_entity(make_item("g", name))
+            await asyncio.gather(aio.save(ef), aio.save(ef))
+
+        # The save locks of the first loop must not leak into the second one
+        asyncio.run(contended("first"))
+        asyncio.run(contended("second"))
+        self.assertEqual(EntityFile(fpath).get_entity("g").name, "second")
+
+
+if __name__ == "__main__":
+    unittest.main()
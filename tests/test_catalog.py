@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# @File: tests/test_catalog.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 1:48:20 pm
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import genemede.catalog as catalog
+from genemede.catalog import Catalog, main
+from genemede.core import Entity, find_gnmd_files
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        item = dict.fromkeys(Entity.template)
+        item["mtype"] = "subject"
+        with open(self.temp_dir / "subjects.json", "w") as f:
+            json.dump([item, item], f)
+        self.temp_dir.joinpath("sub").mkdir()
+        with open(self.temp_dir / "sub" / "invalid.json", "w") as f:
+            json.dump([{"name": "x"}], f)
+
+    def test_scan(self):
+        files = find_gnmd_files(self.temp_dir, cache=True)
+        self.assertEqual(files, [self.temp_dir / "subjects.json"])
+        cat = Catalog(self.temp_dir)
+        self.assertEqual(len(cat), 2)
+        entry = cat[self.temp_dir / "subjects.json"]
+        self.assertEqual((entry["valid"], entry["n_entities"], entry["mtypes"]), (True, 2, ["subject"]))
+        self.assertFalse(cat[self.temp_dir / "sub" / "invalid.json"]["valid"])
+
+    def test_rescan_reads_only_changed_files(self):
+        Catalog(self.temp_dir).scan()
+        with unittest.mock.patch.object(catalog, "describe", wraps=catalog.describe) as describe:
+            Catalog(self.temp_dir).scan()
+            self.assertEqual(describe.call_count, 0)
+            # Touching a file without changing its content only re-hashes it
+            os.utime(self.temp_dir / "subjects.json", ns=(0, 0))
+            Catalog(self.temp_dir).scan()
+            self.assertEqual(describe.call_count, 0)
+            with open(self.temp_dir / "sub" / "invalid.json", "w") as f:
+                json.dump([dict.fromkeys(Entity.template)], f)
+            files = Catalog(self.temp_dir).scan()
+            self.assertEqual(describe.call_count, 1)
+        self.assertEqual(len(files), 2)
+
+    def test_verify(self):
+        cat = Catalog(self.temp_dir)
+        cat.scan()
+        self.assertEqual(cat.verify(), [])
+        st = (self.temp_dir / "subjects.json").stat()
+        (self.temp_dir / "subjects.json").write_text("[]")
+        os.utime(self.temp_dir / "subjects.json", ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(cat.verify(), ["subjects.json"])
+        self.assertEqual(main(["verify", str(self.temp_dir)]), 1)
+        self.assertEqual(main(["rebuild", str(self.temp_dir)]), 0)
+        self.assertEqual(main(["verify", str(self.temp_dir)]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# @File: tests/test_columnar.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 9:48:02 am
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede import columnar
+from genemede.columnar import flatten, from_columns, to_columns, unflatten
+from genemede.core import Entity
+
+
+def make_subject(i, **properties):
+    item = dict.fromkeys(Entity.template)
+    item.update(
+        guid=f"s{i}", modified_at="2023-01-01T00:00:00", name=f"subject {i}", mtype="subject", properties=properties
+    )
+    return Entity(item=item)
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.ents = [
+            make_subject(0, age=21, sex="male", mpi={"dominant_eye": "left", "glasses": True}),
+            make_subject(1, age=34.5, sex="female"),
+            make_subject(2, sex="female", tags=[], extra={}),
+        ]
+
+    def test_flatten(self):
+        d = {"a": {"b": 1, "c": {"d": [1]}}, "e": {}, "f": None}
+        flat = flatten(d)
+        self.assertEqual(flat, {"a.b": 1, "a.c.d": [1], "e": {}, "f": None})
+        self.assertEqual(unflatten(flat), d)
+
+    def test_to_columns(self):
+        cols = to_columns(self.ents)
+        self.assertEqual(cols["guid"], ["s0", "s1", "s2"])
+        self.assertEqual(cols["properties.age"], [21, 34.5, None])
+        self.assertEqual(cols["properties.mpi.glasses"], [True, None, None])
+        self.assertEqual(cols["properties.tags"], [None, None, []])
+        self.assertNotIn("properties", cols)
+        self.assertEqual({len(c) for c in cols.values()}, {3})
+
+    def test_round_trip(self):
+        back = from_columns(to_columns(self.ents))
+        self.assertEqual(back, self.ents)
+        self.assertEqual(from_columns(to_columns([])), [])
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_numpy(self):
+        np = columnar.np
+        arrays = columnar.to_numpy(to_columns(self.ents))
+        self.assertEqual(arrays["properties.age"].dtype, np.float64)
+        self.assertTrue(np.isnan(arrays["properties.age"][2]))
+        self.assertEqual(arrays["guid"].dtype.kind, "U")
+        self.assertEqual(arrays["parent"].dtype, object)
+        self.assertEqual(from_columns(arrays), self.ents)
+
+    @unittest.skipIf(columnar.np is None, "numpy is not installed")
+    def test_aggregations(self):
+        cols = to_columns(self.ents)
+        self.assertEqual(columnar.value_counts(cols["properties.sex"]), {"female": 2, "male": 1})
+        stats = columnar.group_stats(cols["properties.age"], by=cols["properties.sex"])
+        self.assertEqual(stats["key"].tolist(), ["female", "male"])
+        self.assertEqual(stats["count"].tolist(), [1, 1])
+        self.assertEqual(stats["mean"].tolist(), [34.5, 21.0])
+        by_sex = columnar.factorize(cols["properties.sex"])
+        self.assertEqual(columnar.group_stats(cols["properties.age"], by_sex)["sum"].tolist(), [34.5, 21.0])
+        total = columnar.group_stats(cols["properties.age"])
+        self.assertEqual(total["max"].tolist(), [34.5])
+
+    @unittest.skipIf(columnar.pa is None, "pyarrow is not installed")
+    def test_parquet(self):
+        fpath = Path(tempfile.mkdtemp()) / "subjects.parquet"
+        ents = self.ents[:2]
+        columnar.write_parquet(to_columns(ents), fpath)
+        self.assertEqual(columnar.read_parquet(fpath)["properties.age"], [21.0, 34.5])
+
+    def test_missing_optional_package(self):
+        if columnar.np is None:
+            with self.assertRaises(ImportError):
+                columnar.to_numpy(to_columns(self.ents))
+
+
+if __name__ == "__main__":
+    unittest.main()
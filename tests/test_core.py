@@ -8,49 +8,63 @@ import os
 import shutil
 import tempfile
 import unittest
+import unittest.mock
 import uuid
 from datetime import datetime
 from pathlib import Path
 
 import genemede.io as io
-from genemede.core import Entity, EntityFile, is_valid_file, is_valid_gnmd_struct
+from genemede.core import (
+    Entity,
+    EntityFile,
+    find_gnmd_files,
+    is_valid_file,
+    is_valid_gnmd_struct,
+    validate_gnmd_struct,
+)
 
 
 class TestEntity(unittest.TestCase):
     def test_init_with_no_arg(self):
         e = Entity()
         self.assertIsNotNone(e.guid)  # type: ignore
-        self.assertIsNotNone(e.datetime)  # type: ignore
+        self.assertIsNotNone(e.modified_at)  # type: ignore
         self.assertIsNone(e.name)  # type: ignore
         self.assertIsNone(e.description)  # type: ignore
         self.assertIsNone(e.mtype)  # type: ignore
-        self.assertIsNone(e.resources)  # type: ignore
+        self.assertIsNone(e.parent)  # type: ignore
+        self.assertIsNone(e.components)  # type: ignore
+        self.assertIsNone(e.links)  # type: ignore
         self.assertIsNone(e.properties)  # type: ignore
         self.assertIsNone(e.custom)  # type: ignore
-        self.assertIsNone(e.bids)  # type: ignore
+        self.assertIsNone(e.tags)  # type: ignore
 
     def test_init_with_valid_dict(self):
         item = {
             "guid": "123",
-            "datetime": "2022-01-01",
+            "modified_at": "2022-01-01",
             "name": "test",
             "description": "test description",
             "mtype": "test type",
-            "resources": [],
+            "parent": None,
+            "components": [],
+            "links": [],
             "properties": [],
             "custom": [],
-            "bids": [],
+            "tags": [],
         }
         e = Entity(item)
         self.assertEqual(e.guid, "123")  # type: ignore
-        self.assertEqual(e.datetime, "2022-01-01")  # type: ignore
+        self.assertEqual(e.modified_at, "2022-01-01")  # type: ignore
         self.assertEqual(e.name, "test")  # type: ignore
         self.assertEqual(e.description, "test description")  # type: ignore
         self.assertEqual(e.mtype, "test type")  # type: ignore
-        self.assertEqual(e.resources, [])  # type: ignore
+        self.assertIsNone(e.parent)  # type: ignore
+        self.assertEqual(e.components, [])  # type: ignore
+        self.assertEqual(e.links, [])  # type: ignore
         self.assertEqual(e.properties, [])  # type: ignore
         self.assertEqual(e.custom, [])  # type: ignore
-        self.assertEqual(e.bids, [])  # type: ignore
+        self.assertEqual(e.tags, [])  # type: ignore
 
     def test_init_with_invalid_dict(self):
         item = {"invalid_key": "invalid_value"}
@@ -62,6 +76,33 @@ class TestEntity(unittest.TestCase):
         with self.assertRaises(TypeError):
             e = Entity(item)
 
+    def test_compact_slots(self):
+        e = Entity()
+        self.assertFalse(hasattr(e, "__dict__"))
+        self.assertEqual(set(e.__slots__), set(Entity.template))
+        with self.assertRaises(AttributeError):
+            e.not_a_template_key = 1
+
+    def test_equality_and_copies(self):
+        item = dict.fromkeys(Entity.template)
+        item.update(guid="123", modified_at="2023-01-01T00:00:00", name="test")
+        e1, e2 = Entity(item), Entity(dict(item))
+        self.assertEqual(e1, e2)
+        self.assertEqual(copy.deepcopy(e1), e1)
+        e2.name = "other"
+        self.assertNotEqual(e1, e2)
+        self.assertEqual(e1.to_dict(squeeze=False), item)
+        self.assertEqual(e1.to_dict(), {k: v for k, v in item.items() if v is not None})
+
+    def test_view(self):
+        e = Entity()
+        view = e.view()
+        self.assertNotIn("name", view)
+        e.name = "test"
+        self.assertEqual(view["name"], "test")
+        self.assertEqual(dict(view), e.to_dict())
+        self.assertEqual(dict(e.view(squeeze=False)), e.to_dict(squeeze=False))
+
 
 class TestEntityFile(unittest.TestCase):
     def setUp(self):
@@ -101,6 +142,39 @@ class TestEntityFile(unittest.TestCase):
         ief = EntityFile(self.test_path)
         self.assertFalse(len(ief.ents) == 2)
 
+    def test_load_reads_file_once(self):
+        with unittest.mock.patch("genemede.core.io.read", wraps=io.read) as read:
+            ef = EntityFile(self.valid_path)
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(len(ef.ents), 2)
+
+    def test_lazy_load(self):
+        with unittest.mock.patch("genemede.core.io.read", wraps=io.read) as read:
+            ef = EntityFile(self.valid_path, lazy=True)
+            self.assertEqual(ef.ents, [])
+            ents = list(ef)
+        self.assertEqual(read.call_count, 0)
+        self.assertEqual(len(ents), 2)
+        self.assertTrue(all(isinstance(e, Entity) for e in ents))
+        with self.assertRaises(KeyError):
+            list(EntityFile(self.test_path, lazy=True))
+
+    def test_guid_index(self):
+        ef = EntityFile(self.valid_path)
+        guid = ef.ents[0].guid
+        self.assertIs(ef.get_entity(guid), ef.ents[0])
+        new = ef.add_entity(Entity())
+        self.assertIn(new.guid, ef)
+        with self.assertRaises(KeyError):
+            ef.add_entity(new)
+        changed = Entity(new.to_dict(squeeze=False))
+        changed.name = "changed"
+        self.assertIs(ef.update_entity(changed), new)
+        self.assertEqual(ef.get_entity(new.guid).name, "changed")
+        ef.remove_entity(guid)
+        self.assertIsNone(ef.get_entity(guid))
+        self.assertEqual(len(ef.ents), 2)
+
     # def test_fix_guids(self):
     #     # Test with dry_run=True
     #     entities = [Entity(item=d) for d in self.valid_data]
@@ -114,5 +188,59 @@ class TestEntityFile(unittest.TestCase):
     #     self.assertFalse(entity_file.ents == entities)
 
 
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.valid_data = [dict.fromkeys(Entity.template) for _ in range(3)]
+
+    def test_valid_struct(self):
+        report = validate_gnmd_struct(self.valid_data)
+        self.assertTrue(report)
+        self.assertEqual(report.n_items, 3)
+        self.assertEqual(report.bad_indices, [])
+        self.assertTrue(is_valid_gnmd_struct(self.valid_data))
+
+    def test_not_a_list(self):
+        report = validate_gnmd_struct({"guid": None})
+        self.assertFalse(report)
+        self.assertIsNotNone(report.error)
+
+    def test_report_missing_and_unknown_keys(self):
+        self.valid_data[1].pop("tags")
+        self.valid_data[2]["bids"] = {}
+        self.valid_data.append("not a dict")
+        report = validate_gnmd_struct(self.valid_data)
+        self.assertFalse(report)
+        self.assertEqual(report.bad_indices, [1, 2, 3])
+        self.assertEqual(report.issues[0].missing, {"tags"})
+        self.assertEqual(report.issues[1].unknown, {"bids"})
+        self.assertFalse(is_valid_gnmd_struct(self.valid_data))
+
+    def test_fail_fast(self):
+        self.valid_data[0].pop("guid")
+        self.valid_data[2].pop("guid")
+        report = validate_gnmd_struct(self.valid_data, fail_fast=True)
+        self.assertEqual(report.bad_indices, [0])
+
+
+class TestFindGnmdFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        for i in range(6):
+            data = [dict.fromkeys(Entity.template)] if i % 2 else [{"name": "invalid"}]
+            with open(self.temp_dir / f"file_{i}.json", "w") as f:
+                json.dump(data, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parallel_matches_serial(self):
+        serial = find_gnmd_files(self.temp_dir)
+        self.assertEqual(len(serial), 3)
+        self.assertEqual(find_gnmd_files(self.temp_dir, workers=2, chunksize=1), serial)
+        self.assertEqual(
+            find_gnmd_files(self.temp_dir, cache=True, workers=2), sorted(serial)
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# @File: tests/test_curate.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 5:36:14 pm
+import copy
+import json
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+
+import genemede.io as io
+from genemede.core import Entity, is_valid_gnmd_struct
+from genemede.curate import curate, fix_datetimes, fix_guids, invalid_datetimes, try_fix_file
+
+
+class TestCurate(unittest.TestCase):
+    def setUp(self):
+        good = dict.fromkeys(Entity.template)
+        good.update(guid=str(uuid.uuid4()), modified_at="2023-01-01T10:00:00.000001")
+        bad = dict(good, guid="not-a-guid", modified_at="01/01/2023")
+        missing = {"name": "legacy"}
+        self.data = [good, bad, missing]
+
+    def test_curate(self):
+        original = copy.deepcopy(self.data)
+        report = curate(self.data)
+        self.assertEqual(report.n_items, 3)
+        self.assertEqual({c.index for c in report.changes}, {1, 2})
+        self.assertEqual(report.summary()["guid"], 2)
+        self.assertEqual(report.summary()["modified_at"], 2)
+        self.assertEqual(self.data[0], original[0])
+        self.assertEqual(next(c.old for c in report.changes if c.index == 1 and c.key == "guid"), "not-a-guid")
+        self.assertTrue(is_valid_gnmd_struct(self.data))
+        # Already curated data is left alone
+        self.assertFalse(curate(self.data))
+
+    def test_dry_run(self):
+        original = copy.deepcopy(self.data)
+        report = curate(self.data, dry_run=True)
+        self.assertTrue(report.dry_run)
+        self.assertEqual(len(report), len(curate(copy.deepcopy(original))))
+        self.assertEqual(self.data, original)
+
+    def test_single_fixes(self):
+        data = [d for d in self.data[:2]]
+        fix_guids(data)
+        uuid.UUID(data[1]["guid"])
+        self.assertEqual(data[1]["modified_at"], "01/01/2023")
+        fix_datetimes(data)
+        self.assertNotEqual(data[1]["modified_at"], "01/01/2023")
+
+    def test_invalid_datetimes(self):
+        values = [
+            "2023-01-01T10:00:00",
+            "2023-01-01T10:00:00.000001+02:00",
+            "2023-01-01T10:00:00Z",
+            "2023-02-31T10:00:00",
+            "2023-02-29T10:00:00",
+            "2024-02-29T10:00:00",
+            "2023-01-01T10:00:00+24:00",
+            None,
+        ]
+        self.assertEqual(invalid_datetimes(values), [3, 4, 6, 7])
+
+    def test_errors_are_not_swallowed(self):
+        with self.assertRaises(TypeError):
+            curate(self.data + ["not a dict"])
+        with self.assertRaises(ValueError):
+            curate(self.data, fixes=["unknown"])
+
+    def test_try_fix_file(self):
+        fpath = Path(tempfile.mkdtemp()) / "legacy.json"
+        with open(fpath, "w") as f:
+            json.dump(self.data, f)
+        self.assertTrue(try_fix_file(fpath))
+        self.assertTrue(is_valid_gnmd_struct(io.read(fpath)))
+        self.assertEqual(len(io.list_backups(fpath)), 1)
+        fpath.write_text("{")
+        self.assertFalse(try_fix_file(fpath))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# @File: tests/test_diff.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 6:12:40 pm
+import copy
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede import io
+from genemede.core import Entity, EntityFile
+from genemede.diff import diff, diff_trees, digest, entity_hash, merge
+from tests.test_repository import make_item
+
+
+def subject(guid, age, modified_at="2023-01-01T00:00:00"):
+    item = make_item(guid, f"Subject {guid}", "subject")
+    item.update(properties={"age": age, "sex": "female"}, modified_at=modified_at)
+    return item
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.base = [subject(f"s{i}", 20 + i) for i in range(5)]
+
+    def test_hash_is_canonical(self):
+        item = self.base[0]
+        reordered = {k: item[k] for k in reversed(list(item))}
+        reordered["properties"] = {"sex": "female", "age": 20}
+        self.assertEqual(entity_hash(reordered), entity_hash(Entity(item=item)))
+        changed = copy.deepcopy(item)
+        changed["properties"]["age"] = 21
+        self.assertNotEqual(entity_hash(changed), entity_hash(item))
+        touched = dict(item, modified_at="2024-01-01T00:00:00")
+        self.assertNotEqual(entity_hash(touched), entity_hash(item))
+        self.assertEqual(entity_hash(touched, ignore=("modified_at",)), entity_hash(item, ignore=("modified_at",)))
+        hashes = {e["guid"]: entity_hash(e) for e in self.base}
+        self.assertEqual(digest(hashes), digest(dict(reversed(hashes.items()))))
+        self.assertNotEqual(digest(hashes), digest({**hashes, "s0": entity_hash(changed)}))
+
+    def test_diff(self):
+        other = copy.deepcopy(self.base)
+        other[1]["properties"]["age"] = 99
+        other[2]["tags"] = ["pilot"]
+        del other[3]
+        other.append(subject("s9", 40))
+        d = diff(self.base, other)
+        self.assertEqual([e["guid"] for e in d.added], ["s9"])
+        self.assertEqual([e["guid"] for e in d.removed], ["s3"])
+        self.assertEqual(
+            {c.guid: c.fields for c in d.modified},
+            {"s1": {"properties.age": (21, 99)}, "s2": {"tags": (None, ["pilot"])}},
+        )
+        self.assertIn("properties.age: 21 -> 99", str(d))
+        same = diff(self.base, list(reversed(self.base)))
+        self.assertFalse(same)
+        self.assertEqual(same.digest_a, same.digest_b)
+
+    def test_diff_files(self):
+        tmp = Path(tempfile.mkdtemp())
+        for site in ("a", "b"):
+            tmp.joinpath(site).mkdir()
+            io.write_atomic(tmp / site / "labs.json", [make_item("l1", "Lab", "lab")])
+        io.write_atomic(tmp / "a" / "subjects.json", self.base)
+        # Same entities in another encoding, not a change
+        io.write_atomic(tmp / "b" / "subjects.json", self.base, encoding="compact")
+        io.write_atomic(tmp / "b" / "new.json", [make_item("n1", "New", "device")])
+        ef = EntityFile(tmp / "b" / "labs.json")
+        self.assertFalse(diff(tmp / "a" / "labs.json", ef))
+        diffs = diff_trees(tmp / "a", tmp / "b")
+        self.assertEqual(list(diffs), ["new.json"])
+        self.assertEqual([e["guid"] for e in diffs["new.json"].added], ["n1"])
+        # Backups are not paired, .gnmd files are, and ignore is passed through
+        io.update(tmp / "b" / "labs.json", [dict(make_item("l1", "Lab", "lab"), modified_at="2024-01-01T00:00:00")])
+        io.create(tmp / "a" / "devices.gnmd.gz", [make_item("d1", "Device", "device")], encoding="gzip")
+        self.assertEqual(list(diff_trees(tmp / "a", tmp / "b")), ["devices.gnmd.gz", "labs.json", "new.json"])
+        diffs = diff_trees(tmp / "a", tmp / "b", ignore=("modified_at",))
+        self.assertEqual(list(diffs), ["devices.gnmd.gz", "new.json"])
+
+    def test_squeezed_dicts(self):
+        squeezed = [Entity(item=d).to_dict() for d in self.base]
+        self.assertNotIn("description", squeezed[0])
+        self.assertFalse(diff(self.base, squeezed))
+        squeezed[0]["description"] = "Described"
+        self.assertEqual(diff(self.base, squeezed).modified[0].fields, {"description": (None, "Described")})
+        result = merge(self.base, squeezed, [Entity(item=d).to_dict() for d in self.base])
+        self.assertEqual((len(result.entities), result.conflicts), (5, []))
+        self.assertEqual(result.entities[0]["description"], "Described")
+        self.assertEqual(set(result.entities[1]), set(Entity.template))
+
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.base = [subject(f"s{i}", 20 + i) for i in range(6)]
+        self.ours = copy.deepcopy(self.base)
+        self.theirs = copy.deepcopy(self.base)
+
+    def test_merge_without_conflicts(self):
+        self.ours[0]["properties"]["age"] = 50
+        self.theirs[1]["name"] = "Theirs"
+        # Different fields of the same entity
+        self.ours[2]["tags"] = ["ours"]
+        self.theirs[2]["description"] = "theirs"
+        self.theirs[2]["modified_at"] = "2024-01-01T00:00:00"
+        del self.ours[3]
+        self.theirs.append(subject("t1", 30))
+        result = merge(self.base, self.ours, self.theirs)
+        self.assertEqual(result.conflicts, [])
+        merged = {e["guid"]: e for e in result.entities}
+        self.assertEqual(list(merged), ["s0", "s1", "s2", "s4", "s5", "t1"])
+        self.assertEqual(merged["s0"]["properties"]["age"], 50)
+        self.assertEqual(merged["s1"]["name"], "Theirs")
+        self.assertEqual((merged["s2"]["tags"], merged["s2"]["description"]), (["ours"], "theirs"))
+        self.assertEqual(merged["s2"]["modified_at"], "2024-01-01T00:00:00")
+
+    def test_nested_edits_merged(self):
+        # Independent edits of the same dict are both kept
+        self.ours[0]["properties"]["age"] = 31
+        self.theirs[0]["properties"]["sex"] = "male"
+        self.theirs[0]["modified_at"] = "2024-01-01T00:00:00"
+        # Edited differently on both sides, reported by dotted path
+        self.ours[1]["properties"].update(age=40, weight=70)
+        self.theirs[1]["properties"]["age"] = 41
+        del self.theirs[1]["properties"]["sex"]
+        result = merge(self.base, self.ours, self.theirs)
+        merged = {e["guid"]: e for e in result.entities}
+        self.assertEqual(merged["s0"]["properties"], {"age": 31, "sex": "male"})
+        self.assertEqual(merged["s1"]["properties"], {"age": 40, "weight": 70})
+        conflicts = [(c.guid, c.fields, c.winner) for c in result.conflicts]
+        self.assertEqual(conflicts, [("s1", ["properties.age"], "ours")])
+
+    def test_conflicts_resolved_by_modified_at(self):
+        self.ours[0].update(name="Ours", modified_at="2024-02-01T00:00:00")
+        self.theirs[0].update(name="Theirs", modified_at="2024-01-01T00:00:00")
+        self.ours[1].update(name="Ours", modified_at="2024-01-01T00:00:00")
+        self.theirs[1].update(name="Theirs", modified_at="2024-03-01T00:00:00")
+        # Deleted by us, modified by them: kept
+        del self.ours[2]
+        self.theirs[2]["name"] = "Edited"
+        result = merge(self.base, self.ours, self.theirs)
+        merged = {e["guid"]: e for e in result.entities}
+        self.assertEqual([merged[g]["name"] for g in ("s0", "s1", "s2")], ["Ours", "Theirs", "Edited"])
+        self.assertEqual(
+            {c.guid: (c.fields, c.winner) for c in result.conflicts},
+            {"s0": (["name"], "ours"), "s1": (["name"], "theirs"), "s2": ([], "theirs")},
+        )
+        self.assertIn("kept theirs", str(result))
+
+    def test_merge_cli(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.theirs[0]["name"] = "Theirs"
+        for name, data in (("base", self.base), ("ours", self.ours), ("theirs", self.theirs)):
+            with open(tmp / f"{name}.json", "w") as f:
+                json.dump(data, f)
+        from genemede.diff import main
+
+        paths = [str(tmp / f"{n}.json") for n in ("base", "ours", "theirs")]
+        self.assertEqual(main(["--merge", *paths, "-o", str(tmp / "merged.json")]), 0)
+        self.assertEqual(io.read(tmp / "merged.json")[0]["name"], "Theirs")
+        self.assertEqual(main([str(tmp / "base.json"), str(tmp / "merged.json")]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
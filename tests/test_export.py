@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# @File: tests/test_export.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 6:48:50 pm
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import genemede as gnmd
+import genemede.io as io
+from genemede.core import Entity
+from genemede.export import apply_mapping, compile_mapping, export_participants, export_sidecar
+from genemede.paths import MISSING, compile_path
+
+
+class TestPaths(unittest.TestCase):
+    def test_compile_path(self):
+        get = compile_path("*properties.institute")
+        self.assertIs(get, compile_path("*properties.institute"))
+        self.assertEqual(get({"properties": {"institute": "UCL"}}), "UCL")
+        self.assertIs(get({"properties": None}), MISSING)
+        self.assertIs(get({}), MISSING)
+        e = Entity()
+        e.properties = {"institute": "UCL"}
+        self.assertEqual(get(e), "UCL")
+        self.assertEqual(compile_path("name")(e), None)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.subjects = io.read(gnmd.test_path.joinpath("fixtures/metadata_databases/subjects.json"))
+
+    def test_compile_mapping_is_cached(self):
+        mapping = {"age": "*properties.age"}
+        self.assertIs(compile_mapping(mapping), compile_mapping(dict(mapping)))
+
+    def test_export_participants(self):
+        e = Entity()
+        e.name = "sub 02"
+        e.properties = {"sex": "female", "age": 31, "handedness": None}
+        fpath = export_participants(self.subjects + [e], self.temp_dir, sidecars=True)
+        lines = fpath.read_text().splitlines()
+        self.assertEqual(lines[0].split("\t"), ["participant_id", "age", "sex", "handedness"])
+        self.assertEqual(lines[1].split("\t"), ["sub-Subject1", "n/a", "male", "n/a"])
+        self.assertEqual(lines[2].split("\t"), ["sub-sub02", "31", "female", "n/a"])
+        self.assertIn("age", json.loads((self.temp_dir / "participants.json").read_text()))
+        sidecar = json.loads((self.temp_dir / "sub-sub02" / "sub-sub02.json").read_text())
+        self.assertEqual(sidecar, {"age": 31, "sex": "female", "handedness": None})
+        with self.assertRaises(ValueError):
+            export_participants([e, e], self.temp_dir)
+
+    def test_own_mapping_adds_columns(self):
+        e = {"name": "sub 03", "properties": {"age": 40, "weight": 70}, "bids": {"weight": "*properties.weight"}}
+        fpath = export_participants(self.subjects + [e], self.temp_dir)
+        rows = [line.split("\t") for line in fpath.read_text().splitlines()]
+        self.assertEqual(rows[0], ["participant_id", "age", "sex", "handedness", "weight"])
+        self.assertEqual(rows[1], ["sub-Subject1", "n/a", "male", "n/a", "n/a"])
+        self.assertEqual(rows[2], ["sub-sub03", "n/a", "n/a", "n/a", "70"])
+
+    def test_export_sidecar(self):
+        lab = {"properties": {"institute": "Champalimaud"}}
+        self.assertEqual(
+            apply_mapping(lab, {"InstitutionName": "*properties.institute"}), {"InstitutionName": "Champalimaud"}
+        )
+        fpath = export_sidecar(lab, self.temp_dir / "dataset.json")
+        self.assertEqual(json.loads(fpath.read_text()), {"InstitutionName": "Champalimaud"})
+
+
+if __name__ == "__main__":
+    unittest.main()
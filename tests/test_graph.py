@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# @File: tests/test_graph.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 10:58:40 pm
+import json
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+
+from genemede.core import Entity
+from genemede.graph import EntityGraph, iter_references
+from genemede.repository import Repository
+
+
+def guid(name):
+    """A stable GUID per test name, links only count GUIDs."""
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, name))
+
+
+def names(ents):
+    return sorted(e["name"] for e in ents)
+
+
+def make_item(name, mtype, parent=None, links=None, components=None):
+    item = dict.fromkeys(Entity.template)
+    item.update(guid=guid(name), modified_at="2023-01-01T00:00:00", name=name, mtype=mtype)
+    item.update(parent=parent, links=links, components=components)
+    return item
+
+
+class TestEntityGraph(unittest.TestCase):
+    def setUp(self):
+        self.items = [
+            make_item("p1", "project"),
+            make_item("s1", "subject", links={"project": guid("p1")}),
+            make_item("ses1", "session", links={"project": guid("p1"), "subjects": [guid("s1"), guid("gone")]}),
+            make_item("ses2", "session", parent=guid("ses1"), components=["*guid.devices.json"]),
+            make_item("d1", "device", links=[guid("ses2")]),
+        ]
+        self.graph = EntityGraph(self.items)
+
+    def test_references(self):
+        refs = list(iter_references(self.items[2]))
+        self.assertEqual(refs, [("links", guid("p1")), ("links", guid("s1")), ("links", guid("gone"))])
+        self.assertEqual(list(iter_references(self.items[3])), [("parent", guid("ses1"))])
+
+    def test_links_free_text(self):
+        item = make_item("n1", "note", links={"project": guid("p1"), "note": "see lab book", "ids": ["1", guid("s1")]})
+        self.assertEqual(list(iter_references(item)), [("links", guid("p1")), ("links", guid("s1"))])
+        self.graph.add(item)
+        self.assertEqual(self.graph.dangling(), [(guid("ses1"), "links", guid("gone"))])
+
+    def test_resolve_many(self):
+        found = self.graph.resolve_many([guid("s1"), guid("nope"), guid("p1")])
+        self.assertEqual([e and e["name"] for e in found], ["s1", None, "p1"])
+
+    def test_closures(self):
+        self.assertEqual(names(self.graph.descendants(guid("p1"))), ["d1", "s1", "ses1", "ses2"])
+        self.assertEqual(names(self.graph.descendants(guid("p1"), mtype="session")), ["ses1", "ses2"])
+        self.assertEqual(names(self.graph.ancestors(guid("ses2"))), ["p1", "s1", "ses1"])
+
+    def test_components(self):
+        # The container lists its parts, the parts are under it
+        rig = make_item("rig", "device", links={"project": guid("p1")}, components=[guid("amp"), guid("cap")])
+        self.graph.add(rig)
+        self.graph.add(make_item("amp", "device"))
+        self.graph.add(make_item("cap", "device"))
+        self.graph.add(make_item("chan", "device", parent=guid("cap")))
+        self.assertEqual(names(self.graph.descendants(guid("rig"))), ["amp", "cap", "chan"])
+        self.assertEqual(names(self.graph.ancestors(guid("chan"))), ["cap", "p1", "rig"])
+        self.assertIn(guid("amp"), [e["guid"] for e in self.graph.descendants(guid("p1"))])
+        self.assertEqual(names(self.graph.references(guid("rig"), field="components")), ["amp", "cap"])
+        self.assertEqual(self.graph.cycles(), [])
+        self.graph.remove(guid("rig"))
+        self.assertEqual(self.graph.ancestors(guid("amp")), [])
+        self.assertNotIn(guid("amp"), self.graph.up)
+
+    def test_dangling_and_cycles(self):
+        self.assertEqual(self.graph.dangling(), [(guid("ses1"), "links", guid("gone"))])
+        self.assertEqual(self.graph.cycles(), [])
+        self.graph.update(make_item("p1", "project", links=[guid("d1")]))
+        cycles = self.graph.cycles()
+        self.assertTrue(cycles)
+        for c in cycles:
+            self.assertEqual(c[0], c[-1])
+            self.assertIn(guid("p1"), c)
+            self.assertIn(guid("d1"), c)
+
+    def test_incremental(self):
+        self.graph.update(make_item("s1", "subject"))
+        self.assertEqual(self.graph.referrers(guid("p1"))[0]["name"], "ses1")
+        self.graph.remove(guid("ses1"))
+        self.assertEqual(self.graph.dangling(), [(guid("ses2"), "parent", guid("ses1"))])
+        self.assertEqual(self.graph.descendants(guid("p1")), [])
+        self.assertNotIn(guid("gone"), self.graph.into)
+
+
+class TestRepositoryGraph(unittest.TestCase):
+    def test_graph_follows_edits(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        items = [make_item("p1", "project"), make_item("ses1", "session", links={"project": guid("p1")})]
+        with open(temp_dir / "items.json", "w") as f:
+            json.dump(items, f)
+        repo = Repository(temp_dir)
+        graph = repo.graph()
+        self.assertIs(graph.descendants(guid("p1"))[0], repo.get(guid("ses1")))
+        repo.add_entity(make_item("ses2", "session", links={"project": guid("p1")}), temp_dir / "items.json")
+        self.assertEqual(len(graph.descendants(guid("p1"))), 2)
+        repo.update_entity(make_item("ses2", "session"))
+        repo.remove_entity(guid("ses1"))
+        self.assertEqual(graph.descendants(guid("p1")), [])
+        self.assertIs(repo.graph(), graph)
+
+
+if __name__ == "__main__":
+    unittest.main()
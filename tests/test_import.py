@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# @File: tests/test_import.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 3:31:09 pm
+import importlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import genemede as gnmd
+from genemede import io
+from genemede.core import EntityFile, is_valid_gnmd_struct
+
+gimport = importlib.import_module("genemede.import")
+
+
+class TestImport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def test_csv(self):
+        source = self.temp_dir / "subjects.csv"
+        source.write_text("id,name,age,sex\n1,Subject 1,21,male\n2,Subject 2,,female\n3,Subject 3,40,unknown\n")
+        output = self.temp_dir / "subjects.json"
+        report = gimport.import_file(
+            source,
+            output,
+            mapping={"id": "custom.source_id"},
+            defaults={"mtype": "subject/human"},
+            chunk_size=2,
+            check_properties=True,
+        )
+        self.assertEqual((report.n_rows, report.n_imported, report.n_rejected), (3, 2, 1))
+        self.assertGreater(report.rows_per_second, 0)
+        data = io.read(output)
+        self.assertTrue(is_valid_gnmd_struct(data))
+        self.assertEqual(data[0]["properties"], {"age": "21", "sex": "male"})
+        self.assertEqual(data[1]["custom"], {"source_id": "2"})
+        # One timestamp per chunk
+        self.assertEqual(data[0]["modified_at"], data[1]["modified_at"])
+        self.assertTrue(all(gnmd.Entity(item=d).guid for d in data))
+        rejected = [json.loads(line) for line in report.rejects.read_text().splitlines()]
+        self.assertEqual(rejected[0]["row"], 2)
+        self.assertIn("properties.sex='unknown'", rejected[0]["reason"])
+        # Written incrementally, yet the same bytes as a regular pretty file
+        self.assertEqual(output.read_text(), json.dumps(data, indent=4))
+
+    def test_tsv_and_rejects(self):
+        source = self.temp_dir / "sessions.tsv"
+        guid = "5e4b6c1e-9d3a-4a8e-b0f4-3a6b2c1d0e9f"
+        source.write_text(f"guid\tname\n{guid}\tA\n{guid}\tB\n")
+        output = self.temp_dir / "sessions.json"
+        report = gimport.import_file(source, output, unmapped="drop")
+        self.assertEqual(report.n_imported, 1)
+        self.assertEqual(report.n_rejected, 1)
+        self.assertEqual(EntityFile(output).ents[0].name, "A")
+        with self.assertRaises(FileExistsError):
+            gimport.import_file(source, output)
+        with self.assertRaises(ValueError):
+            gimport.import_file(source, self.temp_dir / "x.json", mapping={"name": "nowhere"})
+        # Without the duplicate check no GUID is kept, both rows are imported
+        report = gimport.import_file(source, self.temp_dir / "unchecked.json", check_duplicates=False)
+        self.assertEqual((report.n_imported, report.n_rejected), (2, 0))
+
+    def test_legacy_json(self):
+        source = gnmd.test_path.joinpath("fixtures", "metadata_databases", "subjects.json")
+        items = io.read(source) + ["not a row"]
+        source = self.temp_dir / "legacy.json"
+        io.write_atomic(source, items)
+        output = self.temp_dir / "subjects.gnmd"
+        report = gimport.import_file(source, output, chunk_size=1)
+        self.assertEqual((report.n_imported, report.n_rejected), (len(items) - 1, 1))
+        ef = EntityFile(output)
+        self.assertEqual(len(ef.ents), len(items) - 1)
+        self.assertEqual(ef.ents[0].properties["sex"], "male")
+        self.assertIn("bids", ef.ents[0].custom)
+        self.assertEqual(ef.ents[0].links, [""])
+
+    def test_legacy_guids_rejected(self):
+        source = gnmd.test_path.joinpath("fixtures", "metadata_databases", "labs.json")
+        output = self.temp_dir / "labs.gnmd"
+        report = gimport.import_file(source, output)
+        # "1" and "2" may be referenced elsewhere, they are not replaced by new GUIDs
+        self.assertEqual((report.n_imported, report.n_rejected), (0, 2))
+        rejected = [json.loads(line) for line in report.rejects.read_text().splitlines()]
+        self.assertEqual([r["data"]["guid"] for r in rejected], ["1", "2"])
+        self.assertIn("not a GUID", rejected[0]["reason"])
+
+    def test_cli(self):
+        source = self.temp_dir / "labs.csv"
+        source.write_text("name,city\nLab,Lisbon\n")
+        output = self.temp_dir / "labs.json"
+        argv = [str(source), str(output), "--mtype", "lab", "--map", "city=properties.town"]
+        self.assertEqual(gimport.main(argv), 0)
+        self.assertEqual(io.read(output)[0]["properties"], {"town": "Lisbon"})
+        self.assertEqual(io.read(output)[0]["mtype"], "lab")
+
+
+if __name__ == "__main__":
+    unittest.main()
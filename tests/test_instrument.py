@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# @File: tests/test_instrument.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 7:12:54 pm
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede import instrument, io
+from genemede.core import Entity, EntityFile, find_gnmd_files
+from genemede.curate import curate
+
+
+def make_item(guid):
+    item = dict.fromkeys(Entity.template)
+    item.update(guid=guid, modified_at="2023-01-01T00:00:00", name=guid, mtype="subject")
+    return item
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.fpath = self.temp_dir / "items.json"
+        io.write_atomic(self.fpath, [make_item("a"), make_item("b")])
+        (self.temp_dir / "other.json").write_text('{"not": "gnmd"}')
+
+    def test_disabled_records_nothing(self):
+        instrument.STATS.reset()
+        EntityFile(self.fpath)
+        self.assertEqual(instrument.STATS.snapshot(), {"timers": {}, "counters": {}})
+
+    def test_stages(self):
+        size = self.fpath.stat().st_size
+        with instrument.instrumented() as stats:
+            ef = EntityFile(self.fpath)
+            ef.add_entity(make_item("c"))
+            ef.save()
+            find_gnmd_files(self.temp_dir)
+            curate([{"guid": "bad"}])
+        self.assertFalse(instrument.enabled)
+        self.assertGreater(stats.counters["io.bytes_read"], size)
+        self.assertEqual(stats.counters["core.entities_built"], 2)
+        self.assertEqual(stats.counters["core.files_skipped"], 1)
+        # 10 missing keys (modified_at set to the batch timestamp) and a new guid
+        self.assertEqual(stats.counters["curate.changes"], 11)
+        stages = (
+            "io.read.disk",
+            "io.read.decode",
+            "core.validate",
+            "core.entities",
+            "io.backup",
+            "io.write.encode",
+            "curate",
+        )
+        for name in stages:
+            self.assertGreater(stats.timers[name][0], 0, name)
+        self.assertIn("io.backup", str(stats))
+        json.dumps(stats.snapshot())
+
+    def test_profile_and_trace(self):
+        prof, trace = self.temp_dir / "run.prof", self.temp_dir / "run.trace.json"
+        with instrument.instrumented(profile=prof, trace=trace):
+            io.read(self.fpath)
+        self.assertTrue(prof.stat().st_size)
+        events = json.loads(trace.read_text())["traceEvents"]
+        self.assertEqual({e["name"] for e in events}, {"io.read.disk", "io.read.decode"})
+
+    def test_env_var(self):
+        trace = self.temp_dir / "env.trace.json"
+        env = dict(os.environ, GENEMEDE_INSTRUMENT="1", GENEMEDE_TRACE=str(trace))
+        code = (
+            f"from genemede import io, instrument; io.read({str(self.fpath)!r}); "
+            "print(instrument.STATS.counters['io.bytes_read'])"
+        )
+        root = Path(__file__).parent.parent
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(root), env.get("PYTHONPATH")]))
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(int(out.stdout), self.fpath.stat().st_size)
+        self.assertTrue(json.loads(trace.read_text())["traceEvents"])
+
+
+if __name__ == "__main__":
+    unittest.main()
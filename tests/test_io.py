@@ -4,10 +4,26 @@
 # @Date: Tuesday, April 18th 2023, 10:29:52 am
 
 import json
+import os
 import tempfile
 import unittest
+import unittest.mock
 from pathlib import Path
-from genemede.io import create, read, update, backup
+
+import genemede.io as gio
+from genemede.core import Entity, EntityFile, find_gnmd_files
+from genemede.io import (
+    backup,
+    candidate_files,
+    create,
+    encoding_of,
+    iter_read,
+    list_backups,
+    prune_backups,
+    read,
+    update,
+    write_atomic,
+)
 
 
 # Implement tests for genemede.io functions
@@ -55,3 +71,148 @@ class TestIO(unittest.TestCase):
         # List all files in temp_dir
         files = self.temp_dir.glob("*.gnmd")
         self.assertTrue(len([x for x in files if "test_file" in x.name]) >= 2)
+
+    def test_iter_read(self):
+        data = [12345, "a,]b", {"k": [1, {"n": None}]}, [], 6.5e3] + self.test_data * 20
+        fpath = self.temp_dir / "stream.json"
+        with open(fpath, "w") as f:
+            json.dump(data, f, indent=4)
+        for chunk_size in (1, 7, 1 << 16):
+            self.assertEqual(list(iter_read(fpath, chunk_size=chunk_size)), data)
+
+    def test_iter_read_empty_and_invalid(self):
+        fpath = self.temp_dir / "stream.json"
+        fpath.write_text(" [ ] ")
+        self.assertEqual(list(iter_read(fpath)), [])
+        fpath.write_text('{"not": "a list"}')
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_read(fpath))
+        fpath.write_text("[1, 2")
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_read(fpath, chunk_size=2))
+
+    def test_update_is_atomic_and_backed_up(self):
+        fpath = self.temp_dir / "test_file.json"
+        write_atomic(fpath, self.test_data)
+        inode = fpath.stat().st_ino
+        update(fpath, [])
+        self.assertEqual(read(fpath), [])
+        backups = list_backups(fpath)
+        self.assertEqual(len(backups), 1)
+        # The backup is the old file itself, not a copy
+        self.assertEqual(backups[0].stat().st_ino, inode)
+        self.assertEqual(read(backups[0]), self.test_data)
+
+    def test_write_atomic_failure_keeps_file(self):
+        fpath = self.temp_dir / "test_file.gnmd"
+        create(fpath, self.test_data)
+        with self.assertRaises(TypeError):
+            write_atomic(fpath, [object()])
+        self.assertEqual(read(fpath), self.test_data)
+        self.assertEqual([f.name for f in self.temp_dir.iterdir()], ["test_file.gnmd"])
+
+    def test_new_file_mode(self):
+        fpath = self.temp_dir / "new.gnmd"
+        # The umask is process wide state, writers must not touch it
+        with unittest.mock.patch("genemede.io.os.umask") as umask:
+            write_atomic(fpath, self.test_data)
+        umask.assert_not_called()
+        mask = os.umask(0)
+        os.umask(mask)
+        self.assertEqual(fpath.stat().st_mode & 0o777, 0o666 & ~mask)
+
+    def test_backup_retention(self):
+        fpath = self.temp_dir / "test_file.gnmd"
+        create(fpath, self.test_data)
+        for i in range(4):
+            update(fpath, [i], keep_backups=2)
+        self.assertEqual(len(list_backups(fpath)), 2)
+        self.assertEqual(read(list_backups(fpath)[-1]), [2])
+        self.assertEqual(len(prune_backups(fpath, keep=0)), 2)
+        self.assertEqual(list_backups(fpath), [])
+
+    def _available(self):
+        return [
+            e
+            for e in gio.ENCODINGS
+            if not (e == "zstd" and gio.zstandard is None or e == "binary" and gio.msgpack is None)
+        ]
+
+    def test_encodings_round_trip(self):
+        for encoding in self._available():
+            with self.subTest(encoding=encoding):
+                fpath = create(self.temp_dir / f"{encoding}.json", self.test_data, encoding=encoding)
+                self.assertEqual(encoding_of(fpath), encoding)
+                self.assertEqual(read(fpath), self.test_data)
+                self.assertEqual(list(iter_read(fpath, chunk_size=5)), self.test_data)
+
+    def test_encoding_suffix_and_size(self):
+        pretty = create(self.temp_dir / "x.gnmd", self.test_data * 50)
+        compact = create(self.temp_dir / "y", self.test_data * 50, encoding="compact")
+        gz = create(self.temp_dir / "z.gnmd", self.test_data * 50, encoding="gzip")
+        self.assertEqual((compact.name, gz.name), ("y.gnmd", "z.gnmd.gz"))
+        self.assertLess(compact.stat().st_size, pretty.stat().st_size)
+        self.assertLess(gz.stat().st_size, compact.stat().st_size)
+
+    def test_update_keeps_encoding(self):
+        fpath = create(self.temp_dir / "x.gnmd.gz", self.test_data, encoding="gzip")
+        update(fpath, [1, 2])
+        self.assertEqual(encoding_of(fpath), "gzip")
+        self.assertEqual(read(fpath), [1, 2])
+        self.assertEqual(read(list_backups(fpath)[0]), self.test_data)
+        update(fpath, [3], encoding="compact")
+        self.assertEqual(encoding_of(fpath), "compact")
+
+    def test_detect_pretty_or_compact(self):
+        self.assertEqual(gio.detect(gio.encode(self.test_data, "pretty")[:16]), "pretty")
+        self.assertEqual(gio.detect(gio.encode(self.test_data, "compact")[:16]), "compact")
+        self.assertEqual(gio.detect(b'[{"name":"a b"}]'), "compact")
+        self.assertEqual(gio.detect(b"[\n]"), "pretty")
+        # One line JSON from elsewhere is not what encode("compact") writes
+        self.assertEqual(gio.detect(b'[ {"guid": "x"}]'), "pretty")
+
+    def test_update_keeps_foreign_json_pretty(self):
+        fpath = self.temp_dir / "foreign.json"
+        fpath.write_text(json.dumps(self.test_data))
+        update(fpath, [1, 2])
+        self.assertEqual(fpath.read_bytes(), gio.encode([1, 2], "pretty"))
+
+    def test_files_of_every_encoding_are_found(self):
+        data = [dict.fromkeys(Entity.template)]
+        paths = [create(self.temp_dir / e, data, encoding=e) for e in self._available()]
+        write_atomic(self.temp_dir / "legacy.json", data)
+        (self.temp_dir / "notes.txt").write_text("not genemede")
+        # Backups hold stale copies of the entities
+        backup(self.temp_dir / "legacy.json")
+        expected = sorted(paths + [self.temp_dir / "legacy.json"])
+        self.assertEqual(candidate_files(self.temp_dir), expected)
+        self.assertEqual(sorted(find_gnmd_files(self.temp_dir)), expected)
+        self.assertEqual(sorted(find_gnmd_files(self.temp_dir, cache=True)), expected)
+
+    def test_unknown_or_missing_encoding(self):
+        with self.assertRaises(ValueError):
+            gio.encode([], "xml")
+        if gio.msgpack is None:
+            with self.assertRaises(ImportError):
+                gio.encode([], "binary")
+
+    @unittest.skipIf(gio.zstandard is None, "zstandard is not installed")
+    def test_zstd_stream(self):
+        fpath = create(self.temp_dir / "x", self.test_data * 10, encoding="zstd")
+        self.assertEqual(fpath.name, "x.gnmd.zst")
+        self.assertEqual(list(iter_read(fpath, chunk_size=3)), self.test_data * 10)
+
+    @unittest.skipIf(gio.zstandard is None, "zstandard is not installed")
+    def test_zstd_entity_file(self):
+        data = [dict.fromkeys(Entity.template) for _ in range(3)]
+        fpath = create(self.temp_dir / "x", data, encoding="zstd")
+        self.assertEqual(encoding_of(fpath), "zstd")
+        # Lazy files are streamed through the decompressing text wrapper
+        lazy = EntityFile(fpath, lazy=True)
+        self.assertEqual(len(list(lazy)), 3)
+        ef = EntityFile(fpath)
+        ef.remove_entity(ef.ents[0].guid)
+        ef.save()
+        self.assertEqual(encoding_of(fpath), "zstd")
+        self.assertEqual(len(read(fpath)), 2)
+        self.assertEqual(len(read(list_backups(fpath)[0])), 3)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# @File: tests/test_journal.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 4:51:09 pm
+import json
+import tempfile
+import time
+import unittest
+import unittest.mock
+from datetime import datetime
+from pathlib import Path
+
+import genemede.io as io
+import genemede.journal as journal
+from genemede.core import Entity, EntityFile
+from genemede.journal import Journal
+
+
+def make_item(guid, name):
+    item = dict.fromkeys(Entity.template)
+    item.update(guid=guid, modified_at="2023-01-01T00:00:00", name=name)
+    return item
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.fpath = self.temp_dir / "subjects.json"
+        with open(self.fpath, "w") as f:
+            json.dump([make_item("s1", "Subject 1"), make_item("s2", "Subject 2")], f)
+
+    def test_save_appends_only_changes(self):
+        ef = EntityFile(self.fpath, journal=True)
+        ef.add_entity(make_item("s3", "Subject 3"))
+        ef.update_entity(make_item("s1", "Renamed"))
+        ef.remove_entity("s2")
+        with unittest.mock.patch.object(io, "write_atomic") as write:
+            ef.save()
+        write.assert_not_called()
+        records = list(Journal(self.fpath).records())
+        self.assertEqual([r["op"] for r in records], ["add", "update", "delete"])
+        # Updates only store the changed fields
+        self.assertEqual(set(records[1]["data"]), {"name", "modified_at"})
+        reloaded = EntityFile(self.fpath, journal=True)
+        self.assertEqual([e.name for e in reloaded.ents], ["Renamed", "Subject 3"])
+        self.assertEqual([e.name for e in EntityFile(self.fpath, lazy=True, journal=True)], ["Renamed", "Subject 3"])
+        # Without the journal the base file is untouched
+        self.assertEqual(len(EntityFile(self.fpath).ents), 2)
+
+    def test_compaction_and_history(self):
+        ef = EntityFile(self.fpath, journal=True)
+        ef.update_entity(make_item("s1", "First"))
+        ef.save()
+        time.sleep(0.01)
+        middle = datetime.now()
+        time.sleep(0.01)
+        ef.update_entity(make_item("s1", "Second"))
+        ef.save()
+        j = Journal(self.fpath)
+        j.compact()
+        self.assertEqual(len(j), 0)
+        self.assertEqual(io.read(self.fpath)[0]["name"], "Second")
+        ef = EntityFile(self.fpath, journal=True)
+        ef.remove_entity("s2")
+        ef.save()
+        self.assertEqual(len(j.segments()), 2)
+        self.assertEqual([d["name"] for d in j.replay()], ["Second"])
+        self.assertEqual([d["name"] for d in j.replay(until=middle)], ["First", "Subject 2"])
+        self.assertEqual([d["name"] for d in j.replay(until=datetime.now())], ["Second"])
+
+    def test_automatic_compaction(self):
+        with unittest.mock.patch.object(journal, "COMPACT_EVERY", 2):
+            ef = EntityFile(self.fpath, journal=True)
+            ef.update_entity(make_item("s1", "First"))
+            ef.save()
+            self.assertEqual(len(ef.journal), 1)
+            ef.update_entity(make_item("s2", "Second"))
+            ef.save()
+        self.assertEqual(len(ef.journal), 0)
+        self.assertEqual([d["name"] for d in io.read(self.fpath)], ["First", "Second"])
+
+    def test_torn_record_is_ignored(self):
+        j = Journal(self.fpath)
+        j.append("delete", "s1")
+        with open(j.path, "a") as f:
+            f.write('{"seq": 2, "op": "del')
+        self.assertEqual([d["guid"] for d in Journal(self.fpath).replay()], ["s2"])
+        Journal(self.fpath).append("delete", "s2")
+        self.assertEqual(Journal(self.fpath).replay(), [])
+
+    def test_entities_without_guid(self):
+        with open(self.fpath, "w") as f:
+            json.dump([make_item(None, "Subject 1"), make_item("", "Subject 2")], f)
+        # Keyed by position, they do not collapse into one
+        self.assertEqual([d["name"] for d in Journal(self.fpath).replay()], ["Subject 1", "Subject 2"])
+        ef = EntityFile(self.fpath, journal=True)
+        guid = ef.ents[0].guid
+        ef.update_entity({**ef.ents[0].to_dict(squeeze=False), "name": "Renamed"})
+        ef.save()
+        # The generated GUIDs were written to the base
+        self.assertEqual([d["guid"] for d in io.read(self.fpath)], [e.guid for e in ef.ents])
+        ef.update_entity({**ef.ents[0].to_dict(squeeze=False), "name": "Again"})
+        ef.save()
+        reloaded = EntityFile(self.fpath, journal=True)
+        self.assertEqual(reloaded.get_entity(guid).name, "Again")
+        self.assertEqual([e.name for e in reloaded.ents], ["Again", "Subject 2"])
+
+    def test_unknown_guid(self):
+        Journal(self.fpath).append("update", "nope", {"name": "x"})
+        with self.assertRaisesRegex(KeyError, "nope"):
+            Journal(self.fpath).replay()
+
+    def test_save_without_journal_retires_it(self):
+        ef = EntityFile(self.fpath, journal=True)
+        ef.remove_entity("s2")
+        ef.save()
+        # Rewritten without the journal, whose edits the base does not carry
+        plain = EntityFile(self.fpath)
+        plain.remove_entity("s1")
+        plain.save()
+        j = Journal(self.fpath)
+        self.assertEqual(len(j), 0)
+        self.assertEqual([d["name"] for d in j.replay()], ["Subject 2"])
+        self.assertEqual([e.name for e in EntityFile(self.fpath, journal=True).ents], ["Subject 2"])
+        # The journal now belongs to the backup of the base it applied to
+        bak = io.list_backups(self.fpath)[-1]
+        self.assertEqual([r["op"] for r in journal.read_records(journal.journal_path(bak))], ["delete"])
+
+
+if __name__ == "__main__":
+    unittest.main()
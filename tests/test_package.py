@@ -2,6 +2,10 @@
 # @File: tests/test_package.py
 # @Author: Niccolo' Bonacchi (@nbonacchi)
 # @Date: Tuesday, October 18th 2022, 11:44:10 am
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from pkg_resources import parse_version
 
@@ -21,3 +25,52 @@ def test_version_casting():
         pytest.raises(e, pytrace=True)
 
     gm.__version__
+
+
+# Cumulative `import genemede` time, in microseconds; it used to be ~100 ms
+IMPORT_BUDGET_US = 30_000
+
+
+def _import_time(module: str) -> int:
+    """Cumulative import time of a module in a fresh interpreter, see `python -X importtime`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+        check=True,
+    )
+    for line in out.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not in the -X importtime output")
+
+
+def test_import_time_budget():
+    # Best of a few runs, a loaded machine only makes it slower
+    best = min(_import_time("genemede") for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import genemede took {best} us, budget {IMPORT_BUDGET_US} us"
+
+
+def test_import_is_lazy():
+    code = "import sys, genemede; print(' '.join(m for m in sys.modules if m.startswith('genemede')))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=Path(__file__).parent.parent, check=True
+    )
+    assert out.stdout.split() == ["genemede"]
+
+
+def test_lazy_attributes():
+    import genemede as gm
+    from genemede import core, io
+
+    assert gm.Entity is core.Entity
+    assert gm.find_gnmd_files is core.find_gnmd_files
+    assert gm.io is io
+    assert gm.test_path == Path(__file__).parent
+    assert {"Entity", "io", "test_path"} <= set(dir(gm))
+    for name in gm.__all__:
+        assert getattr(gm, name) is not None
+    with pytest.raises(AttributeError):
+        gm.not_an_attribute
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# @File: tests/test_query.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 9:25:47 pm
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede.core import Entity, EntityFile
+from genemede.query import Predicate, between, eq, explain, isin
+from genemede.repository import Repository
+
+
+def make_item(i):
+    item = dict.fromkeys(Entity.template)
+    item.update(
+        guid=f"g{i}",
+        modified_at="2023-01-01T00:00:00",
+        name=f"entity {i}",
+        mtype="subject" if i % 3 else "session",
+        tags=["cogitate", "meg"] if i % 2 else ["cogitate"],
+        properties={"sex": ["male", "female", "other"][i % 3], "age": 10 + i},
+    )
+    return item
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.fpath = self.temp_dir / "entities.json"
+        with open(self.fpath, "w") as f:
+            json.dump([make_item(i) for i in range(30)], f)
+        self.queries = [
+            [eq("mtype", "subject")],
+            [eq("tags", "meg"), eq("properties.sex", "male")],
+            [isin("properties.sex", ["female", "other"]), between("properties.age", 15, 20)],
+            [between("properties.age", 35, None, inclusive=False)],
+            [eq("properties.missing", 1)],
+        ]
+
+    def guids(self, entities):
+        return sorted(e.guid for e in entities)
+
+    def test_indexed_matches_scan(self):
+        ef = EntityFile(self.fpath)
+        scans = [self.guids(ef.query(*q)) for q in self.queries]
+        self.assertEqual(len(scans[0]), 20)
+        self.assertEqual(scans[3], ["g26", "g27", "g28", "g29"])
+        self.assertEqual(scans[4], [])
+        for path in ("mtype", "tags", "properties.sex", "properties.age"):
+            ef.create_index(path)
+        self.assertEqual([self.guids(ef.query(*q)) for q in self.queries], scans)
+        self.assertIn("index", explain(self.queries[1], ef.indexes))
+        lazy = EntityFile(self.fpath, lazy=True)
+        self.assertEqual([self.guids(lazy.query(*q)) for q in self.queries], scans)
+
+    def test_indexed_results_in_entity_order(self):
+        ef = EntityFile(self.fpath)
+        scans = [[e.guid for e in ef.query(*q)] for q in self.queries]
+        for path in ("mtype", "tags", "properties.sex", "properties.age"):
+            ef.create_index(path)
+        self.assertEqual([[e.guid for e in ef.query(*q)] for q in self.queries], scans)
+        ef.remove_entity("g1")
+        ef.add_entity(make_item(100))
+        ef.add_entity(make_item(101))
+        order = [e.guid for e in ef.ents if e.mtype == "subject"]
+        self.assertEqual([e.guid for e in ef.query(eq("mtype", "subject"))], order)
+        self.assertEqual(order[-2:], ["g100", "g101"])
+        with self.assertRaises(TypeError):
+            Predicate("mtype")
+
+    def test_indexes_follow_edits(self):
+        ef = EntityFile(self.fpath)
+        ef.create_index("properties.sex")
+        ef.create_index("tags")
+        changed = make_item(0)
+        changed["properties"] = {"sex": "male", "age": 0}
+        ef.update_entity(changed)
+        ef.add_entity(dict(make_item(100), tags=["new"]))
+        ef.remove_entity("g3")
+        males = self.guids(ef.query(eq("properties.sex", "male")))
+        self.assertIn("g0", males)
+        self.assertNotIn("g3", males)
+        self.assertEqual(self.guids(ef.query(eq("tags", "new"))), ["g100"])
+
+    def test_repository_query(self):
+        with open(self.temp_dir / "more.json", "w") as f:
+            json.dump([make_item(i) for i in range(30, 33)], f)
+        repo = Repository(self.temp_dir)
+        repo.create_index("mtype")
+        self.assertEqual(len(repo.query(eq("mtype", "session"))), 11)
+        self.assertEqual(self.guids(repo.query(between("properties.age", 41, 42))), ["g31", "g32"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# @File: tests/test_repository.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 12:40:02 pm
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede.core import Entity
+from genemede.repository import Repository
+
+
+def make_item(guid, name, mtype, links=None):
+    item = dict.fromkeys(Entity.template)
+    item.update(guid=guid, modified_at="2023-01-01T00:00:00", name=name, mtype=mtype, links=links)
+    return item
+
+
+class TestRepository(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        files = {
+            "projects.json": [make_item("p1", "Project", "project")],
+            "subjects.json": [make_item("s1", "Subject 1", "subject"), make_item("s2", "Subject 2", "subject")],
+            "sessions.json": [
+                make_item("ses1", "Session 1", "session", {"project": "p1", "subjects": ["s1", "s2", "gone"]})
+            ],
+        }
+        for name, data in files.items():
+            with open(self.temp_dir / name, "w") as f:
+                json.dump(data, f)
+        self.repo = Repository(self.temp_dir)
+
+    def test_index(self):
+        self.assertEqual(len(self.repo), 4)
+        self.assertEqual(self.repo.get("s2").name, "Subject 2")
+        self.assertEqual(self.repo.file_of("p1").path.name, "projects.json")
+        self.assertIsNone(self.repo.get("unknown"))
+
+    def test_resolve_links(self):
+        links = self.repo.resolve_links(self.repo.get("ses1"))
+        self.assertIs(links["project"], self.repo.get("p1"))
+        self.assertEqual([s.name for s in links["subjects"][:2]], ["Subject 1", "Subject 2"])
+        self.assertEqual(links["subjects"][2], "gone")
+
+    def test_edits_keep_index(self):
+        subjects = self.temp_dir / "subjects.json"
+        self.repo.add_entity(make_item("s3", "Subject 3", "subject"), subjects)
+        self.assertEqual(self.repo.files[subjects].get_entity("s3").name, "Subject 3")
+        self.assertIs(self.repo.file_of("s3"), self.repo.files[subjects])
+        with self.assertRaises(KeyError):
+            self.repo.add_entity(make_item("p1", "Duplicate", "project"), subjects)
+        self.repo.update_entity(make_item("s3", "Renamed", "subject"))
+        self.assertEqual(self.repo.get("s3").name, "Renamed")
+        self.repo.remove_entity("s3")
+        self.assertNotIn("s3", self.repo)
+        self.assertNotIn("s3", self.repo.files[subjects])
+
+    def test_remove_and_reload_file(self):
+        subjects = self.temp_dir / "subjects.json"
+        graph = self.repo.graph()
+        self.repo.remove_file(subjects)
+        self.assertEqual((len(self.repo), graph.get("s1")), (2, None))
+        with open(subjects, "w") as f:
+            json.dump([make_item("s9", "Subject 9", "subject")], f)
+        self.repo.reload_file(subjects)
+        self.assertEqual(self.repo.get("s9").name, "Subject 9")
+        self.assertIsNotNone(graph.get("s9"))
+
+
+if __name__ == "__main__":
+    unittest.main()
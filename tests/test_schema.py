@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# @File: tests/test_schema.py
+# @Author: GENEMEDE devs
+# @Date: Sunday, October 18th 2026, 8:02:31 pm
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede.schema import SchemaRegistry, get_registry, is_constraint
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = get_registry()
+
+    def test_resolved_inheritance(self):
+        schema = self.registry.get("subject/human/cogitate")
+        self.assertEqual(schema["lineage"], ["subject", "subject/human", "subject/human/cogitate"])
+        self.assertEqual(schema["components"], ["epilepsy", "visual", "mpi"])
+        for key in ("creator", "sex", "epilepsy_resection", "visual_colorblind", "race"):
+            self.assertIn(key, schema["properties"])
+        self.assertIs(self.registry.get("human"), self.registry.get("subject/human"))
+        self.assertIn("funding_agency", self.registry.get("project/cogitate")["properties"])
+
+    def test_ambiguous_and_unknown_names(self):
+        with self.assertRaises(KeyError):
+            self.registry.get("cogitate")
+        with self.assertRaises(KeyError):
+            self.registry.get("not_an_mtype")
+
+    def test_levels(self):
+        self.assertTrue(is_constraint(["female", "male"]))
+        self.assertFalse(is_constraint(["#TODO"]))
+        self.assertFalse(is_constraint(["name one of experimenters.json"]))
+        self.assertFalse(is_constraint("labs.gnmd"))
+        self.assertFalse(is_constraint([]))
+
+    def test_validate(self):
+        entities = [
+            {"mtype": "human", "properties": {"sex": "male", "handedness": ""}},
+            {"mtype": "human", "properties": {"sex": "robot", "age": 30}},
+            {"mtype": "subject/human/cogitate", "properties": {"visual_correction_method": ["glasses", "monocle"]}},
+            {"mtype": "generic_human_agent", "properties": {}},
+        ]
+        issues = self.registry.validate(entities)
+        self.assertEqual(
+            [(i.index, i.key, i.value) for i in issues],
+            [(1, "sex", "robot"), (2, "visual_correction_method", "monocle")],
+        )
+        strict = self.registry.validate(entities, strict=True)
+        self.assertIn((3, "mtype"), [(i.index, i.key) for i in strict])
+        self.assertEqual(len(self.registry.validate(entities[:1], mtype="human")), 0)
+
+    def test_invalidated_by_mtime(self):
+        root = Path(tempfile.mkdtemp())
+        fpath = root / "thing" / "thing.json"
+        fpath.parent.mkdir()
+        definition = {"name": "thing", "parent": None, "properties": {"color": {"levels": ["red"]}}}
+        fpath.write_text(json.dumps([definition]))
+        registry = SchemaRegistry(root, ttl=0)
+        first = registry.get("thing")
+        self.assertIs(registry.get("thing"), first)
+        definition["properties"]["size"] = {"levels": None}
+        fpath.write_text(json.dumps([definition]))
+        os.utime(fpath, ns=(0, 10**9))
+        self.assertIn("size", registry.get("thing")["properties"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# @File: tests/test_search.py
+# @Author: GENEMEDE devs
+# @Date: Monday, October 19th 2026, 2:02:37 pm
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from genemede.core import Entity
+from genemede.repository import Repository
+from genemede.search import SearchIndex, tokenize
+
+
+def make_item(guid, name, mtype="project", description=None, properties=None):
+    item = dict.fromkeys(Entity.template)
+    item.update(
+        guid=guid,
+        modified_at="2023-01-01T00:00:00",
+        name=name,
+        mtype=mtype,
+        description=description,
+        properties=properties or {},
+    )
+    return item
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.fpath = self.temp_dir / "items.json"
+        items = [
+            make_item("p1", "Cogitate", description="Adversarial collaboration on consciousness"),
+            make_item("s1", "MEG session", "session", properties={"device": "MEG", "site": "Birmingham"}),
+            make_item("s2", "fMRI session", "session", properties={"notes": ["cogitate pilot"]}),
+            make_item("l1", "Cognition lab", "lab"),
+        ]
+        with open(self.fpath, "w") as f:
+            json.dump(items, f)
+        self.repo = Repository(self.temp_dir)
+        self.index = SearchIndex(self.repo)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("MEG-2 (Cogitate)_pilot"), ["meg", "2", "cogitate", "pilot"])
+
+    def test_ranked_search(self):
+        self.assertEqual([g for g, _ in self.index.search("cogitate")], ["p1", "s2"])
+        self.assertEqual([g for g, _ in self.index.search("meg session")], ["s1"])
+        self.assertEqual(self.index.search("meg nothing"), [])
+        self.assertEqual(self.index.search(""), [])
+
+    def test_prefix(self):
+        # Exact matches rank before prefix matches
+        self.assertEqual([g for g, _ in self.index.search("cog")], ["l1", "p1", "s2"])
+        self.assertEqual([g for g, _ in self.index.search("cogn")], ["l1"])
+        self.assertEqual(self.index.search("cog", prefix=False), [])
+        self.assertEqual(len(self.index.search("session", limit=1)), 1)
+
+    def test_incremental_on_save(self):
+        index = SearchIndex.for_repository(self.repo)
+        ef = self.repo.files[self.fpath]
+        ef.add_entity(make_item("s3", "EEG session", "session"))
+        ef.remove_entity("s1")
+        ef.update_entity(make_item("p1", "Renamed"))
+        self.assertEqual(index.search("eeg"), [])
+        ef.save()
+        self.assertEqual([g for g, _ in index.search("eeg")], ["s3"])
+        self.assertEqual(index.search("meg"), [])
+        self.assertEqual([g for g, _ in index.search("cogitate")], ["s2"])
+        self.assertTrue(index.is_current(self.repo.files))
+
+    def test_persistence(self):
+        ipath = self.temp_dir / "search.idx"
+        built = SearchIndex.for_repository(self.repo, ipath)
+        loaded = SearchIndex.for_repository(self.repo, ipath)
+        self.assertEqual(loaded.search("cog"), built.search("cog"))
+        self.assertEqual(loaded.postings, built.postings)
+        # A file edited behind the index's back makes it stale
+        with open(self.fpath, "w") as f:
+            json.dump([make_item("x", "Other")], f)
+        repo = Repository(self.temp_dir)
+        rebuilt = SearchIndex.for_repository(repo, ipath)
+        self.assertEqual(list(rebuilt.docs), ["x"])
+        ipath.write_text("{}")
+        with self.assertRaises(ValueError):
+            SearchIndex.load(ipath)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# @File: tests/test_server.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 11:02:48 am
+import json
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from genemede import io
+from genemede.core import EntityFile
+from genemede.server import Client, MetadataServer
+from tests.test_repository import make_item
+
+
+class TestMetadataServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.subjects = self.temp_dir / "subjects.json"
+        io.write_atomic(self.subjects, [make_item(f"s{i}", f"Subject {i}", "subject") for i in (1, 2)])
+        io.write_atomic(self.temp_dir / "labs.json", [make_item("l1", "Lab", "lab")])
+        # Flushed and synced explicitly by the tests
+        self.server = MetadataServer(self.temp_dir, port=0, flush_interval=3600, poll_interval=None).start()
+        self.client = Client(self.server.address[1])
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_local_only(self):
+        with self.assertRaises(ValueError):
+            MetadataServer(self.temp_dir, host="0.0.0.0", port=0)
+
+    def test_host_header(self):
+        port = self.server.address[1]
+        for host, status in [
+            ("evil.example", 403),
+            (f"evil.example:{port}", 403),
+            (f"localhost:{port + 1}", 403),
+            (f"localhost:{port}", 200),
+            (f"[::1]:{port}", 200),
+        ]:
+            with self.subTest(host=host):
+                self.client.conn.request("GET", "/status", headers={"Host": host})
+                resp = self.client.conn.getresponse()
+                resp.read()
+                self.assertEqual(resp.status, status)
+
+    def test_get(self):
+        self.assertEqual(self.client.get("s2")["name"], "Subject 2")
+        self.assertIsNone(self.client.get("unknown"))
+        self.assertEqual(self.client.status(), {"entities": 3, "files": 2, "pending": 0})
+
+    def test_query(self):
+        self.assertEqual({e["guid"] for e in self.client.query(["eq", "mtype", "subject"])}, {"s1", "s2"})
+        self.assertEqual(len(self.client.query(["isin", "mtype", ["subject", "lab"]], limit=2)), 2)
+        status, body = self.client.request("GET", "/entities?mtype=lab")
+        self.assertEqual((status, [e["guid"] for e in body["entities"]]), (200, ["l1"]))
+        with self.assertRaises(ValueError):
+            self.client.query(["like", "mtype", "sub"])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.request("POST", "/query", [1])[0], 400)
+        with unittest.mock.patch.object(self.server, "query", side_effect=RuntimeError("boom")):
+            status, body = self.client.request("POST", "/query", {"where": []})
+        self.assertEqual((status, body["error"]), (500, "RuntimeError('boom')"))
+        # Still answering on the same connection
+        self.assertEqual(self.client.get("s1")["name"], "Subject 1")
+
+    def test_put_batches_writes(self):
+        self.client.put(make_item("s1", "Renamed", "subject"))
+        self.client.put(make_item("s3", "Subject 3", "subject"), fpath="subjects.json")
+        self.assertEqual(self.client.get("s1")["name"], "Renamed")
+        # Served from memory, not written yet
+        self.assertEqual(len(io.read(self.subjects)), 2)
+        self.assertEqual(self.client.status()["pending"], 1)
+        self.assertEqual(self.client.flush(), [str(self.subjects)])
+        data = {d["guid"]: d for d in io.read(self.subjects)}
+        self.assertEqual((data["s1"]["name"], len(data)), ("Renamed", 3))
+        with self.assertRaises(KeyError):
+            self.client.put(make_item("s4", "Subject 4", "subject"))
+        with self.assertRaises(KeyError):
+            self.client.put(make_item("s4", "Subject 4", "subject"), fpath="../elsewhere.json")
+        with self.assertRaises(ValueError):
+            self.client.put({"guid": "s1", "name": "Not an entity"})
+        status, _ = self.client.request("PUT", "/entities/s2", make_item("s1", "Mismatch", "subject"))
+        self.assertEqual(status, 400)
+
+    def test_flush_writes_outside_lock(self):
+        self.client.put(make_item("s1", "Renamed", "subject"))
+        free = []
+
+        def try_lock():
+            if self.server.lock.acquire(timeout=5):
+                free.append(True)
+                self.server.lock.release()
+
+        def write_snapshot(ef, snap):
+            # Another thread can take the lock while the file is written
+            th = threading.Thread(target=try_lock)
+            th.start()
+            th.join()
+            raise OSError("disk full")
+
+        with unittest.mock.patch.object(EntityFile, "write_snapshot", write_snapshot):
+            with self.assertRaises(OSError):
+                self.server.flush()
+        self.assertEqual(free, [True])
+        # Still pending, written by the next flush
+        self.assertEqual(self.client.status()["pending"], 1)
+        self.assertEqual(self.server.flush(), [self.subjects])
+        self.assertEqual(io.read(self.subjects)[0]["name"], "Renamed")
+
+    def test_sync_external_changes(self):
+        io.write_atomic(self.subjects, [make_item("s9", "Subject 9", "subject")])
+        io.write_atomic(self.temp_dir / "devices.json", [make_item("d1", "Device", "device")])
+        # Backups are not served
+        io.backup(self.temp_dir / "labs.json")
+        self.assertEqual(sorted(f.name for f in self.server.sync()), ["devices.json", "subjects.json"])
+        self.assertIsNone(self.client.get("s1"))
+        self.assertEqual(self.client.get("s9")["name"], "Subject 9")
+        self.assertEqual(self.client.get("d1")["name"], "Device")
+        os.remove(self.temp_dir / "devices.json")
+        self.assertEqual(self.server.sync(), [self.temp_dir / "devices.json"])
+        self.assertIsNone(self.client.get("d1"))
+        self.assertEqual(self.server.sync(), [])
+
+    def test_pending_edits_win(self):
+        self.client.put(make_item("s1", "Renamed", "subject"))
+        with open(self.subjects, "w") as f:
+            json.dump([make_item("s1", "External", "subject")], f)
+        self.assertEqual(self.server.sync(), [])
+        self.server.flush()
+        self.assertEqual([d["name"] for d in io.read(self.subjects)], ["Renamed", "Subject 2"])
+        self.assertEqual(len(io.list_backups(self.subjects)), 1)
+
+    def test_restart_ignores_backups(self):
+        self.client.put(make_item("s1", "Renamed", "subject"))
+        self.client.flush()
+        self.client.close()
+        self.server.stop()
+        self.assertEqual(len(io.list_backups(self.subjects)), 1)
+        self.server = MetadataServer(self.temp_dir, port=0, flush_interval=3600, poll_interval=None).start()
+        self.client = Client(self.server.address[1])
+        self.assertEqual(sorted(f.name for f in self.server.repo.files), ["labs.json", "subjects.json"])
+        self.assertEqual([e["name"] for e in self.client.query(["eq", "guid", "s1"])], ["Renamed"])
+        self.assertEqual(len(self.client.query(["eq", "mtype", "subject"])), 2)
+        self.assertEqual(self.client.status(), {"entities": 3, "files": 2, "pending": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# @File: tests/test_snapshot.py
+# @Author: GENEMEDE devs
+# @Date: Tuesday, October 20th 2026, 3:20:54 pm
+import pickle
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from genemede import io
+from genemede.parallel import pmap
+from genemede.query import eq
+from genemede.repository import Repository
+from genemede.snapshot import Snapshot, build, msgpack
+from tests.test_repository import make_item
+
+
+def _name(args):
+    snap, guid = args
+    return snap.get_entity(guid).name
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.subjects = [make_item(f"s{i}", f"Subject {i}", "subject") for i in range(50)]
+        io.write_atomic(self.temp_dir / "subjects.json", self.subjects)
+        io.write_atomic(self.temp_dir / "labs.json", [make_item("l1", "Lab é", "lab")])
+        self.fpath = build(self.temp_dir, self.temp_dir / "repo.gnmd.snap")
+        self.snap = Snapshot(self.fpath)
+
+    def tearDown(self):
+        self.snap.close()
+
+    def test_read_api(self):
+        repo = Repository(self.temp_dir)
+        self.assertEqual(len(self.snap), len(repo))
+        for e in repo:
+            self.assertEqual(self.snap.get_entity(e.guid), e)
+        self.assertEqual(self.snap.get_entity("l1").name, "Lab é")
+        self.assertIsNone(self.snap.get_entity("unknown"))
+        self.assertNotIn("s", self.snap)
+        self.assertIn("s49", self.snap)
+        self.assertEqual(list(self.snap.guids()), sorted(e.guid for e in repo))
+        self.assertEqual([e.guid for e in self.snap], [e.guid for e in repo])
+        self.assertEqual([e.guid for e in self.snap.query(eq("mtype", "lab"))], ["l1"])
+        self.assertEqual(Path(self.snap.source_of("s3")).name, "subjects.json")
+
+    def test_entities_and_duplicates(self):
+        fpath = build(self.subjects, self.temp_dir / "subjects.gnmd.snap")
+        with Snapshot(fpath) as snap:
+            self.assertEqual([e.to_dict(squeeze=False) for e in snap], self.subjects)
+            self.assertIsNone(snap.source_of("s1"))
+        with self.assertRaises(ValueError):
+            build(self.subjects + self.subjects[:1], self.temp_dir / "dup.gnmd.snap")
+        self.assertFalse((self.temp_dir / "dup.gnmd.snap").exists())
+        build([], fpath)
+        with Snapshot(fpath) as snap:
+            self.assertEqual((len(snap), snap.get_entity("s1")), (0, None))
+
+    def test_build_is_durable(self):
+        with unittest.mock.patch.object(io, "fsync_dir", wraps=io.fsync_dir) as fsync_dir:
+            build(self.temp_dir, self.temp_dir / "again.gnmd.snap")
+        fsync_dir.assert_called_once_with(self.temp_dir)
+        self.assertEqual(oct((self.temp_dir / "again.gnmd.snap").stat().st_mode & 0o777), oct(io.new_file_mode()))
+
+    def test_backups_are_not_compiled(self):
+        io.update(self.temp_dir / "subjects.json", [make_item("s1", "Renamed", "subject")])
+        fpath = build(self.temp_dir, self.temp_dir / "updated.gnmd.snap")
+        with Snapshot(fpath) as snap:
+            sources = sorted(Path(src["path"]).name for src in snap.meta["sources"])
+            self.assertEqual(sources, ["labs.json", "subjects.json"])
+            self.assertEqual((len(snap), snap.get_entity("s1").name), (2, "Renamed"))
+
+    def test_not_a_snapshot(self):
+        with self.assertRaises(ValueError):
+            Snapshot(self.temp_dir / "labs.json")
+        with self.assertRaises(ValueError):
+            build([], self.temp_dir / "x.gnmd.snap", codec="xml")
+
+    def test_is_current(self):
+        self.assertTrue(self.snap.is_current())
+        io.write_atomic(self.temp_dir / "labs.json", [make_item("l2", "Other lab", "lab")])
+        self.assertFalse(self.snap.is_current())
+
+    def test_workers(self):
+        # Pickled as its path, each worker maps the same file
+        self.assertEqual(pickle.loads(pickle.dumps(self.snap)).path, self.fpath)
+        args = [(self.snap, f"s{i}") for i in range(8)]
+        self.assertEqual(pmap(_name, args, workers=2), [f"Subject {i}" for i in range(8)])
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        fpath = build(self.temp_dir, self.temp_dir / "mp.gnmd.snap", codec="msgpack")
+        with Snapshot(fpath) as snap:
+            self.assertEqual(snap.codec, "msgpack")
+            self.assertEqual(snap.get_entity("s7"), self.snap.get_entity("s7"))
+
+
+if __name__ == "__main__":
+    unittest.main()